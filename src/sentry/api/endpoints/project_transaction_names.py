@@ -8,7 +8,7 @@ from sentry.api.base import region_silo_endpoint
 from sentry.api.bases.project import ProjectEndpoint
 from sentry.api.utils import get_date_range_from_stats_period
 from sentry.ingest.transaction_clusterer.datasource import redis, snuba
-from sentry.ingest.transaction_clusterer.tree import TreeClusterer
+from sentry.ingest.transaction_clusterer.tree import CompactTreeClusterer
 
 
 @region_silo_endpoint
@@ -44,7 +44,7 @@ class ProjectTransactionNamesCluster(ProjectEndpoint):
 
         transaction_names = list(transaction_names)
 
-        clusterer = TreeClusterer(merge_threshold=merge_threshold)
+        clusterer = CompactTreeClusterer(merge_threshold=merge_threshold)
         clusterer.add_input(transaction_names)
 
         return Response(
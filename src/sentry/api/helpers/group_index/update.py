@@ -17,6 +17,7 @@ from sentry import analytics, eventstream, features
 from sentry.api.serializers import serialize
 from sentry.api.serializers.models.actor import ActorSerializer
 from sentry.db.models.query import create_or_update
+from sentry.grouping.grouphash_cache import invalidate_grouphash_cache
 from sentry.issues.grouptype import GroupCategory
 from sentry.models import (
     TOMBSTONE_FIELDS_FROM_GROUP,
@@ -103,6 +104,9 @@ def handle_discard(
                     group=None, group_tombstone_id=tombstone.id
                 )
 
+    for project_id in groups_to_delete:
+        invalidate_grouphash_cache(project_id)
+
     for project in projects:
         delete_group_list(
             request, project, groups_to_delete.get(project.id, []), delete_type="discard"
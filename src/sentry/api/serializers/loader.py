@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import functools
+import threading
+from concurrent.futures import Future, wait
+from typing import Any, Callable, List, Optional, TypeVar
+
+import sentry_sdk
+from django.db import close_old_connections, connections
+
+from sentry import options
+from sentry.utils.concurrent import Executor, SynchronousExecutor, ThreadedExecutor
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadedExecutor] = None
+_executor_lock = threading.Lock()
+_worker_state = threading.local()
+
+
+def _get_executor() -> Executor:
+    global _executor
+
+    workers = options.get("api.serializers.concurrent-loader-workers")
+    if workers <= 0 or getattr(_worker_state, "active", False):
+        # Lookups of lookups run in the worker itself, as they could otherwise
+        # wait on a pool that is busy with their parents.
+        return SynchronousExecutor()
+
+    if any(connection.in_atomic_block for connection in connections.all()):
+        # Workers use their own connections, which do not see the uncommitted
+        # changes of the transaction.
+        return SynchronousExecutor()
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadedExecutor(worker_count=workers)
+    return _executor
+
+
+def _run_lookup(fn: Callable[[], T], thread_hub: sentry_sdk.Hub) -> T:
+    _worker_state.active = True
+    # Workers keep their database connections between lookups, and recycle
+    # them the same way as they are at the start and end of requests.
+    close_old_connections()
+    try:
+        with thread_hub:
+            return fn()
+    finally:
+        close_old_connections()
+
+
+class ConcurrentLoader:
+    """
+    Runs the independent lookups of a serializer's ``get_attrs``, such as
+    Postgres and Snuba queries, concurrently on a bounded pool of threads.
+
+    >>> with ConcurrentLoader() as loader:
+    >>>     bookmarks = loader.submit(get_bookmarks, item_list, user)
+    >>>     assignees = loader.submit(get_assignees, item_list)
+    >>> bookmarks.result()
+
+    All lookups are finished when the ``with`` block is left, and errors of
+    lookups are raised by ``result()``. Lookups run in the calling thread if
+    ``api.serializers.concurrent-loader-workers`` is 0, within a transaction,
+    or within another lookup. As they may run in other threads, lookups must
+    not depend on thread locals such as the current request.
+    """
+
+    def __init__(self) -> None:
+        self.executor = _get_executor()
+        self.futures: List[Future[Any]] = []
+
+    def __enter__(self) -> ConcurrentLoader:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        wait(self.futures)
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> Future[T]:
+        call = functools.partial(fn, *args, **kwargs)
+        if isinstance(self.executor, SynchronousExecutor):
+            future = self.executor.submit(call)
+        else:
+            future = self.executor.submit(
+                functools.partial(_run_lookup, call, sentry_sdk.Hub(sentry_sdk.Hub.current))
+            )
+        self.futures.append(future)
+        return future
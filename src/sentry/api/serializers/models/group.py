@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import functools
 import itertools
 import logging
 from abc import ABC, abstractmethod
 from collections import defaultdict
 from datetime import datetime, timedelta
+from hashlib import md5
 from typing import (
     Any,
     Callable,
@@ -15,6 +17,7 @@ from typing import (
     Optional,
     Protocol,
     Sequence,
+    Set,
     Tuple,
     TypedDict,
     Union,
@@ -25,8 +28,9 @@ import sentry_sdk
 from django.conf import settings
 from django.db.models import Min, prefetch_related_objects
 
-from sentry import analytics, tagstore
+from sentry import analytics, options, tagstore
 from sentry.api.serializers import Serializer, register, serialize
+from sentry.api.serializers.loader import ConcurrentLoader
 from sentry.api.serializers.models.actor import ActorSerializer
 from sentry.api.serializers.models.plugin import is_plugin_deprecated
 from sentry.api.serializers.models.user import UserSerializerResponse
@@ -34,6 +38,7 @@ from sentry.app import env
 from sentry.auth.superuser import is_active_superuser
 from sentry.constants import LOG_LEVELS
 from sentry.issues.grouptype import GroupCategory
+from sentry.locks import locks
 from sentry.models import (
     ActorTuple,
     Commit,
@@ -73,8 +78,11 @@ from sentry.services.hybrid_cloud.user import user_service
 from sentry.tagstore.snuba.backend import fix_tag_value_data
 from sentry.tagstore.types import GroupTagValue
 from sentry.tsdb.snuba import SnubaTSDB
+from sentry.utils import json, metrics
 from sentry.utils.cache import cache
+from sentry.utils.dates import to_datetime, to_timestamp
 from sentry.utils.json import JSONData
+from sentry.utils.locking import UnableToAcquireLock
 from sentry.utils.safe import safe_execute
 from sentry.utils.snuba import Dataset, aliased_query, raw_query
 
@@ -92,6 +100,99 @@ def merge_list_dictionaries(
         dict1.setdefault(key, []).extend(val)
 
 
+# How long concurrent identical seen stats queries wait for the first of them
+# to finish, and how long its lock is held at most.
+SEEN_STATS_QUERY_WAIT_TIMEOUT = 10
+SEEN_STATS_QUERY_LOCK_DURATION = 30
+
+
+def coalesce_seen_stats_query(query_func):
+    """
+    Caches the results of a seen stats query for a short time, and lets
+    concurrent identical queries share a single Snuba query.
+
+    Queries are identified by the query function, the groups, environments and
+    conditions, and the time range rounded to
+    ``api.serializers.seen-stats-cache-bucket`` seconds. The rounded time range
+    is also what is queried, so that results match their key. While one
+    process runs a query, others with the same key wait for its result rather
+    than running the query themselves.
+    """
+
+    @functools.wraps(query_func)
+    def wrapper(item_list, start=None, end=None, conditions=None, environment_ids=None):
+        ttl = options.get("api.serializers.seen-stats-cache-ttl")
+        if ttl <= 0:
+            return query_func(
+                item_list,
+                start=start,
+                end=end,
+                conditions=conditions,
+                environment_ids=environment_ids,
+            )
+
+        bucket = options.get("api.serializers.seen-stats-cache-bucket")
+        if start is not None:
+            start = to_datetime(to_timestamp(start) // bucket * bucket)
+        if end is not None:
+            end = to_datetime(-(-to_timestamp(end) // bucket) * bucket)
+
+        key = "seen-stats:{}:{}".format(
+            query_func.__name__,
+            md5(
+                json.dumps(
+                    [
+                        sorted(item.id for item in item_list),
+                        sorted(environment_ids or ()),
+                        start,
+                        end,
+                        conditions,
+                    ]
+                ).encode("utf-8")
+            ).hexdigest(),
+        )
+
+        def execute():
+            result = query_func(
+                item_list,
+                start=start,
+                end=end,
+                conditions=conditions,
+                environment_ids=environment_ids,
+            )
+            cache.set(key, result, ttl)
+            return result
+
+        result = cache.get(key)
+        if result is not None:
+            metrics.incr("serializers.seen_stats_cache", tags={"result": "hit"})
+            return result
+
+        lock = locks.get(
+            f"{key}:lock", duration=SEEN_STATS_QUERY_LOCK_DURATION, name="seen_stats_query"
+        )
+        try:
+            locked = lock.blocking_acquire(
+                initial_delay=0.05, timeout=SEEN_STATS_QUERY_WAIT_TIMEOUT
+            )
+        except UnableToAcquireLock:
+            metrics.incr("serializers.seen_stats_cache", tags={"result": "timeout"})
+            return execute()
+
+        with locked:
+            # Another query with the same key may have finished while this
+            # one was waiting for the lock.
+            result = cache.get(key)
+            if result is not None:
+                metrics.incr("serializers.seen_stats_cache", tags={"result": "coalesced"})
+                return result
+
+            metrics.incr("serializers.seen_stats_cache", tags={"result": "miss"})
+            return execute()
+
+    return wrapper
+
+
 class GroupStatusDetailsResponseOptional(TypedDict, total=False):
     autoResolved: bool
     ignoreCount: int
@@ -206,32 +307,55 @@ class GroupSerializerBase(Serializer, ABC):
         # making unnecessary queries.
         prefetch_related_objects(item_list, "project__organization")
 
-        if user.is_authenticated and item_list:
-            bookmarks = set(
-                GroupBookmark.objects.filter(user_id=user.id, group__in=item_list).values_list(
-                    "group_id", flat=True
-                )
+        # if no groups, then we can't proceed but this seems to be a valid use case
+        if not item_list:
+            return {}
+
+        organization_id_list = list({item.project.organization_id for item in item_list})
+        if len(organization_id_list) > 1:
+            # this should never happen but if it does we should know about it
+            logger.warning(
+                "Found multiple organizations for groups: %s, with orgs: %s"
+                % ([item.id for item in item_list], organization_id_list)
             )
-            seen_groups = dict(
-                GroupSeen.objects.filter(user_id=user.id, group__in=item_list).values_list(
-                    "group_id", "last_seen"
-                )
+
+        # should only have 1 org at this point
+        organization_id = organization_id_list[0]
+
+        # None of these lookups depend on each other.
+        with ConcurrentLoader() as loader:
+            if user.is_authenticated:
+                bookmarks_future = loader.submit(self._get_bookmarks, item_list, user)
+                seen_groups_future = loader.submit(self._get_seen_groups, item_list, user)
+                subscriptions_future = loader.submit(self._get_subscriptions, item_list, user)
+            assignees_future = loader.submit(self._get_assignees, item_list)
+            ignore_items_future = loader.submit(self._get_ignore_items, item_list)
+            resolutions_future = loader.submit(self._resolve_resolutions, item_list, user)
+            share_ids_future = loader.submit(self._get_share_ids, item_list)
+            stats_future = loader.submit(self._get_seen_and_snuba_stats, item_list, user)
+            annotations_future = loader.submit(
+                self._get_annotations_by_group_id, organization_id, item_list
             )
-            subscriptions = self._get_subscriptions(item_list, user)
+
+            # This depends on the current request, so it can't be loaded
+            # in another thread.
+            authorized = self._is_authorized(user, organization_id)
+
+        if user.is_authenticated:
+            bookmarks = bookmarks_future.result()
+            seen_groups = seen_groups_future.result()
+            subscriptions = subscriptions_future.result()
         else:
             bookmarks = set()
             seen_groups = {}
             subscriptions = defaultdict(lambda: (False, False, None))
 
-        assignees: Mapping[int, ActorTuple] = {
-            a.group_id: a.assigned_actor()
-            for a in GroupAssignee.objects.filter(group__in=item_list)
-        }
-        resolved_assignees = self._serialize_assigness(assignees)
-
-        ignore_items = {g.group_id: g for g in GroupSnooze.objects.filter(group__in=item_list)}
-
-        release_resolutions, commit_resolutions = self._resolve_resolutions(item_list, user)
+        resolved_assignees = assignees_future.result()
+        ignore_items = ignore_items_future.result()
+        release_resolutions, commit_resolutions = resolutions_future.result()
+        share_ids = share_ids_future.result()
+        seen_stats, snuba_stats = stats_future.result()
+        annotations_by_group_id = annotations_future.result()
 
         actor_ids = {r[-1] for r in release_resolutions.values()}
         actor_ids.update(r.actor_id for r in ignore_items.values())
@@ -244,39 +368,6 @@ class GroupSerializerBase(Serializer, ABC):
         else:
             actors = {}
 
-        share_ids = dict(
-            GroupShare.objects.filter(group__in=item_list).values_list("group_id", "uuid")
-        )
-
-        seen_stats = self._get_seen_stats(item_list, user)
-
-        organization_id_list = list({item.project.organization_id for item in item_list})
-        # if no groups, then we can't proceed but this seems to be a valid use case
-        if not item_list:
-            return {}
-        if len(organization_id_list) > 1:
-            # this should never happen but if it does we should know about it
-            logger.warning(
-                "Found multiple organizations for groups: %s, with orgs: %s"
-                % ([item.id for item in item_list], organization_id_list)
-            )
-
-        # should only have 1 org at this point
-        organization_id = organization_id_list[0]
-
-        authorized = self._is_authorized(user, organization_id)
-
-        annotations_by_group_id: MutableMapping[int, List[Any]] = defaultdict(list)
-        for annotations_by_group in itertools.chain.from_iterable(
-            [
-                self._resolve_integration_annotations(organization_id, item_list),
-                [self._resolve_external_issue_annotations(item_list)],
-            ]
-        ):
-            merge_list_dictionaries(annotations_by_group_id, annotations_by_group)
-
-        snuba_stats = self._get_group_snuba_stats(item_list, seen_stats)
-
         result = {}
         for item in item_list:
             active_date = item.active_at or item.first_seen
@@ -318,6 +409,56 @@ class GroupSerializerBase(Serializer, ABC):
                 result[item].update(seen_stats.get(item, {}))
         return result
 
+    @staticmethod
+    def _get_bookmarks(item_list: Sequence[Group], user: Any) -> Set[int]:
+        return set(
+            GroupBookmark.objects.filter(user_id=user.id, group__in=item_list).values_list(
+                "group_id", flat=True
+            )
+        )
+
+    @staticmethod
+    def _get_seen_groups(item_list: Sequence[Group], user: Any) -> Mapping[int, datetime]:
+        return dict(
+            GroupSeen.objects.filter(user_id=user.id, group__in=item_list).values_list(
+                "group_id", "last_seen"
+            )
+        )
+
+    def _get_assignees(self, item_list: Sequence[Group]) -> Mapping[int, Union[Team, Any]]:
+        assignees: Mapping[int, ActorTuple] = {
+            a.group_id: a.assigned_actor()
+            for a in GroupAssignee.objects.filter(group__in=item_list)
+        }
+        return self._serialize_assigness(assignees)
+
+    @staticmethod
+    def _get_ignore_items(item_list: Sequence[Group]) -> Mapping[int, GroupSnooze]:
+        return {g.group_id: g for g in GroupSnooze.objects.filter(group__in=item_list)}
+
+    @staticmethod
+    def _get_share_ids(item_list: Sequence[Group]) -> Mapping[int, str]:
+        return dict(GroupShare.objects.filter(group__in=item_list).values_list("group_id", "uuid"))
+
+    def _get_seen_and_snuba_stats(
+        self, item_list: Sequence[Group], user: Any
+    ) -> Tuple[Optional[Mapping[Group, SeenStats]], Mapping[int, Mapping[str, Any]]]:
+        seen_stats = self._get_seen_stats(item_list, user)
+        return seen_stats, self._get_group_snuba_stats(item_list, seen_stats)
+
+    def _get_annotations_by_group_id(
+        self, organization_id: int, item_list: Sequence[Group]
+    ) -> Mapping[int, List[Any]]:
+        annotations_by_group_id: MutableMapping[int, List[Any]] = defaultdict(list)
+        for annotations_by_group in itertools.chain.from_iterable(
+            [
+                self._resolve_integration_annotations(organization_id, item_list),
+                [self._resolve_external_issue_annotations(item_list)],
+            ]
+        ):
+            merge_list_dictionaries(annotations_by_group_id, annotations_by_group)
+        return annotations_by_group_id
+
     def serialize(
         self, obj: Group, attrs: MutableMapping[str, Any], user: Any, **kwargs: Any
     ) -> BaseGroupSerializerResponse:
@@ -989,6 +1130,7 @@ class GroupSerializerSnuba(GroupSerializerBase):
         )
 
     @staticmethod
+    @coalesce_seen_stats_query
     def _execute_error_seen_stats_query(
         item_list, start=None, end=None, conditions=None, environment_ids=None
     ):
@@ -1015,6 +1157,7 @@ class GroupSerializerSnuba(GroupSerializerBase):
         )
 
     @staticmethod
+    @coalesce_seen_stats_query
     def _execute_perf_seen_stats_query(
         item_list, start=None, end=None, conditions=None, environment_ids=None
     ):
@@ -1045,6 +1188,7 @@ class GroupSerializerSnuba(GroupSerializerBase):
         )
 
     @staticmethod
+    @coalesce_seen_stats_query
     def _execute_generic_seen_stats_query(
         item_list, start=None, end=None, conditions=None, environment_ids=None
     ):
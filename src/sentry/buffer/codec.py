@@ -0,0 +1,95 @@
+"""
+Compact binary encoding of the filters and extra values stored in buffers.
+
+Values used to be written as pickles, which are large and slow to load on the
+hot path of flushing buffers. This codec writes them as msgpack instead,
+prefixed with a magic header and a version byte. Datetimes are stored as
+msgpack timestamps, and model instances as references to their primary key.
+
+Pickled values remain readable, so that buffers written by older versions can
+still be flushed while the new format is rolled out.
+"""
+import pickle
+from typing import Any
+
+import msgpack
+from django.apps import apps
+from django.db import models
+
+from sentry.utils.codecs import Codec
+
+# Neither pickles nor JSON documents can start with a null byte.
+MAGIC = b"\x00b"
+VERSION = 1
+HEADER = MAGIC + bytes([VERSION])
+
+EXT_MODEL = 1
+EXT_TUPLE = 2
+
+
+def _encode_ext(obj: Any) -> Any:
+    # Packing uses ``strict_types``, so subclasses of builtin types end up
+    # here as well.
+    if isinstance(obj, models.Model):
+        return msgpack.ExtType(EXT_MODEL, _packb([obj._meta.label, obj.pk]))
+    elif isinstance(obj, tuple):
+        return msgpack.ExtType(EXT_TUPLE, _packb(list(obj)))
+    elif isinstance(obj, int):
+        return int(obj)
+    elif isinstance(obj, str):
+        return str(obj)
+    elif isinstance(obj, dict):
+        return dict(obj)
+    elif isinstance(obj, list):
+        return list(obj)
+    raise TypeError(f"Cannot encode {type(obj)} in buffers")
+
+
+def _decode_ext(code: int, data: bytes) -> Any:
+    if code == EXT_MODEL:
+        # Only the primary key is stored, which is all that is needed to use
+        # the instance in filters or as foreign key value.
+        label, pk = _unpackb(data)
+        return apps.get_model(label)(pk=pk)
+    elif code == EXT_TUPLE:
+        return tuple(_unpackb(data))
+    return msgpack.ExtType(code, data)
+
+
+def _packb(value: Any) -> bytes:
+    return msgpack.packb(value, default=_encode_ext, strict_types=True, datetime=True)
+
+
+def _unpackb(value: bytes) -> Any:
+    return msgpack.unpackb(value, ext_hook=_decode_ext, timestamp=3, strict_map_key=False)
+
+
+class BufferValueCodec(Codec[Any, bytes]):
+    """
+    Encodes buffered filters and extra values.
+
+    Values that msgpack can't represent, such as naive datetimes, are written
+    as pickles instead when ``fallback_to_pickle`` is set.
+    """
+
+    def __init__(self, fallback_to_pickle: bool = True) -> None:
+        self.fallback_to_pickle = fallback_to_pickle
+
+    def encode(self, value: Any) -> bytes:
+        try:
+            return HEADER + _packb(value)
+        except (TypeError, ValueError, OverflowError):
+            if not self.fallback_to_pickle:
+                raise
+            return pickle.dumps(value)
+
+    def decode(self, value: bytes) -> Any:
+        if value.startswith(MAGIC):
+            version = value[len(MAGIC)]
+            if version != VERSION:
+                raise ValueError(f"Unknown buffer value version: {version}")
+            return _unpackb(value[len(HEADER) :])
+
+        # TODO: legacy pickle support - remove once all buffers are written
+        # with this codec.
+        return pickle.loads(value)
@@ -1,20 +1,27 @@
 import pickle
 import threading
+from collections import defaultdict
 from datetime import datetime
 from time import time
 
-from django.db import models
+from django.db import connections, models, router
+from django.db.models.signals import post_save
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_text
 
+from sentry import options
 from sentry.buffer import Buffer
+from sentry.buffer.codec import BufferValueCodec
 from sentry.exceptions import InvalidConfiguration
+from sentry.signals import buffer_incr_complete
 from sentry.tasks.process_buffer import process_incr, process_pending
 from sentry.utils import json, metrics
 from sentry.utils.compat import crc32
 from sentry.utils.hashlib import md5_text
 from sentry.utils.imports import import_string
-from sentry.utils.redis import get_cluster_from_options
+from sentry.utils.redis import get_cluster_from_options, load_script
+
+claim_keys = load_script("buffer/claim_keys.lua")
 
 _local_buffers = None
 _local_buffers_lock = threading.Lock()
@@ -50,6 +57,7 @@ class PendingBuffer:
 class RedisBuffer(Buffer):
     key_expire = 60 * 60  # 1 hour
     pending_key = "b:p"
+    value_codec = BufferValueCodec()
 
     def __init__(self, pending_partitions=1, incr_batch_size=2, **options):
         self.cluster, options = get_cluster_from_options("SENTRY_BUFFER_OPTIONS", options)
@@ -180,11 +188,16 @@ class RedisBuffer(Buffer):
         # keys (one per Redis partition)
         conn = self.cluster.get_local_client_for_key(key)
 
+        # All readers understand both formats, the option only switches which
+        # one is written. Pickle support can go once it's enabled everywhere.
+        if options.get("buffer.compact-codec.enabled"):
+            dumps = self.value_codec.encode
+        else:
+            dumps = pickle.dumps
+
         pipe = conn.pipeline()
         pipe.hsetnx(key, "m", f"{model.__module__}.{model.__name__}")
-        # TODO(dcramer): once this goes live in production, we can kill the pickle path
-        # (this is to ensure a zero downtime deploy where we can transition event processing)
-        pipe.hsetnx(key, "f", pickle.dumps(filters))
+        pipe.hsetnx(key, "f", dumps(filters))
         # pipe.hsetnx(key, 'f', json.dumps(self._dump_values(filters)))
         for column, amount in columns.items():
             pipe.hincrby(key, "i+" + column, amount)
@@ -194,9 +207,7 @@ class RedisBuffer(Buffer):
             # hook here
             # e.g. "update score if last_seen or times_seen is changed"
             for column, value in extra.items():
-                # TODO(dcramer): once this goes live in production, we can kill the pickle path
-                # (this is to ensure a zero downtime deploy where we can transition event processing)
-                pipe.hset(key, "e+" + column, pickle.dumps(value))
+                pipe.hset(key, "e+" + column, dumps(value))
                 # pipe.hset(key, 'e+' + column, json.dumps(self._dump_value(value)))
 
         if signal_only is True:
@@ -229,7 +240,11 @@ class RedisBuffer(Buffer):
         if not client.set(lock_key, "1", nx=True, ex=60):
             return
 
-        pending_buffer = PendingBuffer(self.incr_batch_size)
+        if options.get("buffer.bulk-flush.enabled"):
+            batch_size = options.get("buffer.bulk-flush.batch-size")
+        else:
+            batch_size = self.incr_batch_size
+        pending_buffer = PendingBuffer(batch_size)
 
         try:
             keycount = 0
@@ -262,6 +277,10 @@ class RedisBuffer(Buffer):
         if key is not None:
             batch_keys = [key]
 
+        if options.get("buffer.bulk-flush.enabled"):
+            self._process_batch(batch_keys)
+            return
+
         for key in batch_keys:
             self._process_single_incr(key)
 
@@ -298,32 +317,178 @@ class RedisBuffer(Buffer):
                 self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
                 return
 
-            # XXX(py3): Note that ``import_string`` explicitly wants a str in
-            # python2, so we'll decode (for python3) and then translate back to
-            # a byte string (in python2) for import_string.
-            model = import_string(str(values.pop("m").decode("utf-8")))
-
-            if values["f"].startswith(b"{"):
-                filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
-            else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(values.pop("f"))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in values.items():
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith(b"["):
-                        extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(v)
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
+            model, incr_values, filters, extra_values, signal_only = self._decode_values(values)
             self._process(model, incr_values, filters, extra_values, signal_only)
         finally:
             client.delete(lock_key)
+
+    def _decode_values(self, values):
+        # XXX(py3): Note that ``import_string`` explicitly wants a str in
+        # python2, so we'll decode (for python3) and then translate back to
+        # a byte string (in python2) for import_string.
+        model = import_string(str(values.pop("m").decode("utf-8")))
+
+        if values["f"].startswith(b"{"):
+            filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
+        else:
+            filters = self.value_codec.decode(values.pop("f"))
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in values.items():
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                if v.startswith(b"["):
+                    extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
+                else:
+                    extra_values[k[2:]] = self.value_codec.decode(v)
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        return model, incr_values, filters, extra_values, signal_only
+
+    def _claim_keys(self, keys):
+        """
+        Reads and deletes the given keys, and removes them from their pending
+        sets. Claiming is atomic per host, so unlike the single key path no
+        lock is needed: a key can only ever be claimed by one worker, and
+        increments that arrive after the claim start a new key.
+        """
+        host_router = self.cluster.get_router()
+        keys_by_host = defaultdict(list)
+        for key in keys:
+            keys_by_host[host_router.get_host_for_key(key)].append(key)
+
+        claimed = {}
+        for host_id, host_keys in keys_by_host.items():
+            client = self.cluster.get_local_client(host_id)
+            pending_keys = [self._make_pending_key_from_key(key) for key in host_keys]
+            for key, result in zip(host_keys, claim_keys(client, host_keys, pending_keys)):
+                claimed[key] = result
+
+        return claimed
+
+    def _process_batch(self, batch_keys):
+        """
+        Flushes a batch of keys at once: all keys are claimed with one script
+        call per Redis host, and increments of ``Group`` rows are applied with
+        a single ``UPDATE`` per set of updated columns. Everything else goes
+        through ``Buffer.process`` one key at a time, as before.
+        """
+        with metrics.timer("buffer.bulk-flush.claim"):
+            claimed = self._claim_keys(batch_keys)
+
+        metrics.timing("buffer.bulk-flush.keys", len(claimed))
+
+        group_updates = defaultdict(list)
+        for result in claimed.values():
+            values = {force_text(k): v for k, v in zip(result[::2], result[1::2])}
+            if not values:
+                metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
+                continue
+
+            model, incr_values, filters, extra_values, signal_only = self._decode_values(values)
+            if self._can_bulk_update(model, incr_values, filters, extra_values, signal_only):
+                columns = (tuple(sorted(incr_values)), tuple(sorted(extra_values)))
+                group_updates[columns].append((incr_values, filters, extra_values))
+            else:
+                self._process(model, incr_values, filters, extra_values, signal_only)
+
+        for (incr_columns, extra_columns), updates in group_updates.items():
+            with metrics.timer("buffer.bulk-flush.update"):
+                self._bulk_update_groups(incr_columns, extra_columns, updates)
+
+    def _can_bulk_update(self, model, columns, filters, extra, signal_only):
+        from sentry.models import Group
+
+        return (
+            model is Group
+            and not signal_only
+            and bool(columns or extra)
+            and len(filters) == 1
+            and next(iter(filters)) in ("id", "pk")
+        )
+
+    def _bulk_update_groups(self, incr_columns, extra_columns, updates):
+        """
+        Applies buffered increments to many groups with a single
+        ``UPDATE ... FROM (VALUES ...)`` statement. This is equivalent to the
+        ``Group`` case of ``Buffer.process``, including the score update and
+        the signals that are sent for every updated group.
+        """
+        from sentry.models import Group
+
+        using = router.db_for_write(Group)
+        connection = connections[using]
+        qn = connection.ops.quote_name
+
+        incr_fields = [Group._meta.get_field(column) for column in incr_columns]
+        extra_fields = [Group._meta.get_field(column) for column in extra_columns]
+        fields = incr_fields + extra_fields
+
+        assignments = [
+            f"{qn(field.column)} = g.{qn(field.column)} + v.{qn(field.column)}"
+            for field in incr_fields
+        ]
+        assignments.extend(f"{qn(field.column)} = v.{qn(field.column)}" for field in extra_fields)
+        if "times_seen" in incr_columns and "last_seen" in extra_columns:
+            # Same as the ``ScoreClause`` used by ``Buffer.process``.
+            assignments.append(
+                "score = log(g.times_seen + v.times_seen) * 600"
+                " + trunc(extract(epoch from v.last_seen))"
+            )
+
+        # Types can't be inferred from the parameters for all fields, so cast
+        # them explicitly.
+        row_template = "(%s, {})".format(
+            ", ".join(f"%s::{field.db_type(connection)}" for field in fields)
+        )
+        group_ids = []
+        rows = []
+        params = []
+        # Update rows in a consistent order, so that concurrent flushes can't
+        # deadlock each other.
+        for incr_values, filters, extra_values in sorted(
+            updates, key=lambda update: next(iter(update[1].values()))
+        ):
+            group_id = next(iter(filters.values()))
+            group_ids.append(group_id)
+            rows.append(row_template)
+            params.append(group_id)
+            params.extend(incr_values[field.name] for field in incr_fields)
+            params.extend(
+                field.get_db_prep_save(extra_values[field.name], connection=connection)
+                for field in extra_fields
+            )
+
+        sql = """
+            UPDATE {table} AS g
+            SET {assignments}
+            FROM (VALUES {rows}) AS v (id, {columns})
+            WHERE g.id = v.id
+        """.format(
+            table=qn(Group._meta.db_table),
+            assignments=", ".join(assignments),
+            rows=", ".join(rows),
+            columns=", ".join(qn(field.column) for field in fields),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+        # Groups that were deleted in the meantime are skipped, just like
+        # ``Buffer.process`` does. ``post_save`` pushes the new values into
+        # the model cache.
+        for group in Group.objects.using(using).filter(id__in=group_ids):
+            post_save.send(sender=Group, instance=group, created=False)
+
+        for incr_values, filters, extra_values in updates:
+            buffer_incr_complete.send_robust(
+                model=Group,
+                columns=incr_values,
+                filters=filters,
+                extra=extra_values,
+                created=False,
+                sender=Group,
+            )
@@ -38,6 +38,18 @@ class BaseCache(local):
     def get(self, key, version=None, raw=False):
         raise NotImplementedError
 
+    def get_many(self, keys, version=None, raw=False):
+        """
+        Fetch multiple keys, returning a mapping of key to value for all keys
+        that were found.
+        """
+        rv = {}
+        for key in keys:
+            value = self.get(key, version=version, raw=raw)
+            if value is not None:
+                rv[key] = value
+        return rv
+
     def _mark_transaction(self, op):
         """
         Mark transaction with a tag so we can identify system components that rely
@@ -44,6 +44,24 @@ class CommonRedisCache(BaseCache):
 
         return result
 
+    def get_many(self, keys, version=None, raw=False):
+        keys = list(keys)
+        with self.client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(self.make_key(key, version=version))
+            results = pipe.execute()
+
+        self._mark_transaction("get")
+
+        return self._decode_many(keys, results, raw)
+
+    def _decode_many(self, keys, results, raw):
+        rv = {}
+        for key, result in zip(keys, results):
+            if result is not None:
+                rv[key] = json.loads(result) if not raw else result
+        return rv
+
 
 class RbCache(CommonRedisCache):
     def __init__(self, **options):
@@ -51,6 +69,17 @@ class RbCache(CommonRedisCache):
         client = cluster.get_routing_client()
         CommonRedisCache.__init__(self, client, **options)
 
+    def get_many(self, keys, version=None, raw=False):
+        # The routing client does not support pipelines, fan out through a
+        # mapping client instead.
+        keys = list(keys)
+        with self.client.map() as client:
+            promises = [client.get(self.make_key(key, version=version)) for key in keys]
+
+        self._mark_transaction("get")
+
+        return self._decode_many(keys, [promise.value for promise in promises], raw)
+
 
 # Confusing legacy name for RbCache.  We don't actually have a pure redis cache
 RedisCache = RbCache
@@ -2758,6 +2758,10 @@ SENTRY_SYNTHETIC_MONITORING_PROJECT_ID = None
 SENTRY_SIMILARITY_INDEX_REDIS_CLUSTER = "default"
 # Similarity-v2: uses grouping components for diffing (None = fallback to setting for v1)
 SENTRY_SIMILARITY2_INDEX_REDIS_CLUSTER = None
+# Build similarity signatures with NumPy, which requires the `similarity` extra.
+# These signatures are not comparable to the default ones, so they are indexed
+# in separate namespaces.
+SENTRY_SIMILARITY_VECTORIZED_SIGNATURES = False
 
 # The grouping strategy to use for driving similarity-v2. You can add multiple
 # strategies here to index them all. This is useful for transitioning a
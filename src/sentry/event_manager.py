@@ -52,6 +52,7 @@ from sentry.constants import (
     DataCategory,
 )
 from sentry.culprit import generate_culprit
+from sentry.db.models import NodeData
 from sentry.dynamic_sampling import LatestReleaseBias, LatestReleaseParams
 from sentry.eventstore.processing import event_processing_store
 from sentry.eventtypes import (
@@ -75,6 +76,7 @@ from sentry.grouping.api import (
     get_grouping_config_dict_for_project,
     load_grouping_config,
 )
+from sentry.grouping.grouphash_cache import grouphash_cache
 from sentry.grouping.result import CalculatedHashes
 from sentry.ingest.inbound_filters import FilterStatKeys
 from sentry.issues.grouptype import GroupCategory, GroupType
@@ -122,10 +124,12 @@ from sentry.signals import (
     first_transaction_received,
     issue_unresolved,
 )
+from sentry.spans.grouping.api import load_span_grouping_config
 from sentry.tasks.commits import fetch_commits
 from sentry.tasks.integrations import kick_off_status_syncs
 from sentry.tasks.process_buffer import buffer_incr
 from sentry.tasks.relay import schedule_invalidate_project_config
+from sentry.tsdb.base import TSDBWriteBatch
 from sentry.types.activity import ActivityType
 from sentry.utils import json, metrics, redis
 from sentry.utils.cache import cache_key_for_event
@@ -1148,12 +1152,13 @@ def _get_or_create_group_release(
 @metrics.wraps("save_event.tsdb_record_all_metrics")
 def _tsdb_record_all_metrics(jobs: Sequence[Job]) -> None:
     """
-    Do all tsdb-related things for save_event in here s.t. we can potentially
-    put everything in a single redis pipeline someday.
+    Do all tsdb-related things for save_event in here, so that they are written
+    together in a single batch.
     """
 
     # XXX: validate whether anybody actually uses those metrics
 
+    batch = TSDBWriteBatch()
     for job in jobs:
         incrs = []
         frequencies = []
@@ -1193,34 +1198,53 @@ def _tsdb_record_all_metrics(jobs: Sequence[Job]) -> None:
             records.append((tsdb.models.users_affected_by_project, project_id, (user.tag_value,)))
 
         if incrs:
-            tsdb.incr_multi(incrs, timestamp=event.datetime, environment_id=environment.id)
+            batch.incr_multi(incrs, timestamp=event.datetime, environment_id=environment.id)
 
         if records:
-            tsdb.record_multi(records, timestamp=event.datetime, environment_id=environment.id)
+            batch.record_multi(records, timestamp=event.datetime, environment_id=environment.id)
 
         if frequencies:
-            tsdb.record_frequency_multi(frequencies, timestamp=event.datetime)
+            batch.record_frequency_multi(frequencies, timestamp=event.datetime)
+
+    if batch:
+        tsdb.write_batch(batch)
 
 
 @metrics.wraps("save_event.nodestore_save_many")
 def _nodestore_save_many(jobs: Sequence[Job]) -> None:
     inserted_time = datetime.utcnow().replace(tzinfo=UTC).timestamp()
+
+    # We only care about `unprocessed` for error events
+    unprocessed_keys = {}
+    for job in jobs:
+        event = job["event"]
+        if event.get_event_type() not in ("transaction", "generic") and job["groups"]:
+            unprocessed_keys[event.event_id] = cache_key_for_event(
+                {"project": event.project_id, "event_id": event.event_id}
+            )
+
+    unprocessed_events = (
+        event_processing_store.get_multi(list(unprocessed_keys.values()), unprocessed=True)
+        if unprocessed_keys
+        else {}
+    )
+
+    nodes = []
     for job in jobs:
         # Write the event to Nodestore
         subkeys = {}
 
         event = job["event"]
-        # We only care about `unprocessed` for error events
-        if event.get_event_type() not in ("transaction", "generic") and job["groups"]:
-            unprocessed = event_processing_store.get(
-                cache_key_for_event({"project": event.project_id, "event_id": event.event_id}),
-                unprocessed=True,
-            )
+        unprocessed_key = unprocessed_keys.get(event.event_id)
+        if unprocessed_key is not None:
+            unprocessed = unprocessed_events.get(unprocessed_key)
             if unprocessed is not None:
                 subkeys["unprocessed"] = unprocessed
 
-        job["event"].data["nodestore_insert"] = inserted_time
-        job["event"].data.save(subkeys=subkeys)
+        event.data["nodestore_insert"] = inserted_time
+        nodes.append((event.data, subkeys))
+
+    NodeData.save_many(nodes)
 
 
 @metrics.wraps("save_event.eventstream_insert_many")
@@ -1436,9 +1460,28 @@ def _save_aggregate(
 ) -> Optional[GroupInfo]:
     project = event.project
 
-    flat_grouphashes = [
-        GroupHash.objects.get_or_create(project=project, hash=hash)[0] for hash in hashes.hashes
-    ]
+    # Read before the grouphashes, so that they are not cached under an epoch
+    # that was bumped after they were read.
+    grouphash_epoch = None
+    if not hashes.hierarchical_hashes:
+        grouphash_epoch = grouphash_cache.get_epoch(project.id)
+
+    if grouphash_epoch is not None:
+        group = _get_cached_group(project, hashes.hashes, grouphash_epoch)
+        if group is not None:
+            kwargs["data"] = materialize_metadata(event.data, get_event_type(event.data), metadata)
+            kwargs["data"]["last_received"] = received_timestamp
+            is_regression = _process_existing_aggregate(
+                group=group, event=event, data=kwargs, release=release
+            )
+            return GroupInfo(group, False, is_regression)
+
+    # Resolve flat hashes (creating the missing ones) and look up existing
+    # hierarchical hashes in one go, instead of one round-trip per hash.
+    known_grouphashes = _bulk_get_or_create_grouphashes(
+        project, hashes.hashes, lookup_only_hashes=hashes.hierarchical_hashes or ()
+    )
+    flat_grouphashes = [known_grouphashes[hash] for hash in hashes.hashes]
 
     # The root_hierarchical_hash is the least specific hash within the tree, so
     # typically hierarchical_hashes[0], unless a hash `n` has been split in
@@ -1447,13 +1490,18 @@ def _save_aggregate(
     # when groups are created and also relieves contention by locking a more
     # specific hash than `hierarchical_hashes[0]`.
     existing_grouphash, root_hierarchical_hash = _find_existing_grouphash(
-        project, flat_grouphashes, hashes.hierarchical_hashes
+        project,
+        flat_grouphashes,
+        hashes.hierarchical_hashes,
+        hierarchical_grouphashes=known_grouphashes,
     )
 
     if root_hierarchical_hash is not None:
-        root_hierarchical_grouphash = GroupHash.objects.get_or_create(
-            project=project, hash=root_hierarchical_hash
-        )[0]
+        root_hierarchical_grouphash = known_grouphashes.get(root_hierarchical_hash)
+        if root_hierarchical_grouphash is None:
+            root_hierarchical_grouphash = _bulk_get_or_create_grouphashes(
+                project, [root_hierarchical_hash]
+            )[root_hierarchical_hash]
 
         metadata.update(
             hashes.group_metadata_from_hash(
@@ -1595,6 +1643,8 @@ def _save_aggregate(
         GroupHash.objects.filter(id__in=[h.id for h in new_hashes]).exclude(
             state=GroupHash.State.LOCKED_IN_MIGRATION
         ).update(group=group)
+    elif grouphash_epoch is not None:
+        _cache_flat_grouphashes(project, flat_grouphashes, grouphash_epoch)
 
     is_regression = _process_existing_aggregate(
         group=group, event=event, data=kwargs, release=release
@@ -1603,10 +1653,91 @@ def _save_aggregate(
     return GroupInfo(group, is_new, is_regression)
 
 
+def _get_cached_group(project: Project, hashes: Sequence[str], epoch: str) -> Optional[Group]:
+    """
+    Look up the group for flat hashes in the process-local grouphash cache,
+    skipping the `GroupHash` lookup for hot issues. Returns `None` whenever
+    the regular lookup needs to run.
+    """
+    group_id = grouphash_cache.get_group_id(project.id, hashes, epoch)
+    if group_id is None:
+        return None
+
+    group = Group.objects.filter(id=group_id).first()
+    if (
+        group is None
+        or group.status
+        in (
+            GroupStatus.PENDING_DELETION,
+            GroupStatus.DELETION_IN_PROGRESS,
+            GroupStatus.PENDING_MERGE,
+        )
+        or group.issue_category != GroupCategory.ERROR
+    ):
+        metrics.incr("event_manager.grouphash_cache", tags={"result": "stale"})
+        grouphash_cache.discard(project.id, hashes)
+        return None
+
+    return group
+
+
+def _cache_flat_grouphashes(
+    project: Project, flat_grouphashes: Sequence[GroupHash], epoch: str
+) -> None:
+    # Only cache hashes that are fully resolved, every other state requires
+    # the regular lookup to run.
+    if all(
+        h.group_id is not None and h.group_tombstone_id is None and h.state is None
+        for h in flat_grouphashes
+    ):
+        grouphash_cache.set_group_ids(
+            project.id, {h.hash: h.group_id for h in flat_grouphashes}, epoch
+        )
+
+
+def _bulk_get_or_create_grouphashes(
+    project: Project,
+    hashes: Sequence[str],
+    lookup_only_hashes: Sequence[str] = (),
+    select_related_group: bool = False,
+) -> dict[str, GroupHash]:
+    """
+    Resolve `hashes` to their `GroupHash` rows, creating the missing ones.
+    `lookup_only_hashes` are returned if they exist but never created.
+
+    All hashes are fetched with a single query. Missing rows are created with
+    a single `bulk_create`, tolerating rows that concurrent workers create in
+    the meantime, and then fetched in one more query.
+    """
+    all_hashes = list(dict.fromkeys([*hashes, *lookup_only_hashes]))
+    if not all_hashes:
+        return {}
+
+    queryset = GroupHash.objects.filter(project=project)
+    if select_related_group:
+        queryset = queryset.select_related("group")
+
+    grouphashes = {h.hash: h for h in queryset.filter(hash__in=all_hashes)}
+
+    missing_hashes = [hash for hash in dict.fromkeys(hashes) if hash not in grouphashes]
+    if missing_hashes:
+        metrics.incr("event_manager.grouphashes_created", amount=len(missing_hashes))
+        GroupHash.objects.bulk_create(
+            [GroupHash(project=project, hash=hash) for hash in missing_hashes],
+            ignore_conflicts=True,
+        )
+        # `bulk_create` does not return primary keys when ignoring conflicts,
+        # and rows may have been created by another worker, so fetch them.
+        grouphashes.update({h.hash: h for h in queryset.filter(hash__in=missing_hashes)})
+
+    return grouphashes
+
+
 def _find_existing_grouphash(
     project: Project,
     flat_grouphashes: Sequence[GroupHash],
     hierarchical_hashes: Optional[Sequence[str]],
+    hierarchical_grouphashes: Optional[Mapping[str, GroupHash]] = None,
 ) -> tuple[Optional[GroupHash], Optional[str]]:
     all_grouphashes = []
     root_hierarchical_hash = None
@@ -1614,10 +1745,11 @@ def _find_existing_grouphash(
     found_split = False
 
     if hierarchical_hashes:
-        hierarchical_grouphashes = {
-            h.hash: h
-            for h in GroupHash.objects.filter(project=project, hash__in=hierarchical_hashes)
-        }
+        if hierarchical_grouphashes is None:
+            hierarchical_grouphashes = {
+                h.hash: h
+                for h in GroupHash.objects.filter(project=project, hash__in=hierarchical_hashes)
+            }
 
         # Look for splits:
         # 1. If we find a hash with SPLIT state at `n`, we want to use
@@ -2211,13 +2343,16 @@ def _calculate_event_grouping(
 
 @metrics.wraps("save_event.calculate_span_grouping")
 def _calculate_span_grouping(jobs: Sequence[Job], projects: ProjectsMapping) -> None:
+    # All transactions of the batch share a cache, so that spans repeating
+    # across transactions are only grouped once.
+    span_group_cache = load_span_grouping_config().strategy.get_cache()
     for job in jobs:
         # Make sure this snippet doesn't crash ingestion
         # as the feature is under development.
         try:
             event = job["event"]
             with metrics.timer("event_manager.save.get_span_groupings.default"):
-                groupings = event.get_span_groupings()
+                groupings = event.get_span_groupings(cache=span_group_cache)
             groupings.write_to_event(event.data)
 
             metrics.timing("save_event.transaction.span_count", len(groupings.results))
@@ -2230,6 +2365,8 @@ def _calculate_span_grouping(jobs: Sequence[Job], projects: ProjectsMapping) ->
         except Exception:
             sentry_sdk.capture_exception()
 
+    span_group_cache.report()
+
 
 @metrics.wraps("save_event.detect_performance_problems")
 def _detect_performance_problems(jobs: Sequence[Job], projects: ProjectsMapping) -> None:
@@ -2311,9 +2448,14 @@ def _save_aggregate_performance(jobs: Sequence[PerformanceJob], projects: Projec
             all_group_hashes = [problem.fingerprint for problem in performance_problems]
             group_hashes = all_group_hashes[:MAX_GROUPS]
 
-            existing_grouphashes = GroupHash.objects.filter(
-                project=project, hash__in=group_hashes
-            ).select_related("group")
+            # New grouphashes are not bulk-created here: a performance grouphash
+            # may only be created in the same transaction as its group, see
+            # `_save_grouphash_and_group`.
+            existing_grouphashes = list(
+                _bulk_get_or_create_grouphashes(
+                    project, [], lookup_only_hashes=group_hashes, select_related_group=True
+                ).values()
+            )
 
             new_grouphashes = set(group_hashes) - {hash.hash for hash in existing_grouphashes}
 
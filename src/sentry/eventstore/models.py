@@ -38,6 +38,7 @@ if TYPE_CHECKING:
     from sentry.models.organization import Organization
     from sentry.models.project import Project
     from sentry.spans.grouping.result import SpanGroupingResults
+    from sentry.spans.grouping.strategy.base import SpanGroupCache
 
 
 def ref_func(x: Event) -> int:
@@ -466,10 +467,12 @@ class BaseEvent(metaclass=abc.ABCMeta):
         return None
 
     def get_span_groupings(
-        self, force_config: str | Mapping[str, Any] | None = None
+        self,
+        force_config: str | Mapping[str, Any] | None = None,
+        cache: SpanGroupCache | None = None,
     ) -> SpanGroupingResults:
         config = load_span_grouping_config(force_config)
-        return config.execute_strategy(self.data)
+        return config.execute_strategy(self.data, cache=cache)
 
     @property
     def organization(self) -> Organization:
@@ -0,0 +1,121 @@
+"""
+Process-local cache of ``(project_id, hash) -> group_id`` mappings.
+
+For hot issues the mapping of a grouphash to its group practically never
+changes, so event ingestion can skip the ``GroupHash`` lookup in Postgres.
+Only flat hashes that are assigned to a group, and that are neither locked nor
+tombstoned, are ever cached.
+
+Since the cache lives in every ingest process, operations that move hashes
+between groups (merge, unmerge, tombstoning) invalidate all entries of a
+project by bumping a per-project epoch stored in the shared Django cache.
+Local entries are only valid for the epoch they were cached in. The epoch is
+itself cached locally for a few seconds, which bounds how long an invalidation
+takes to reach all processes.
+
+Only group ids are cached. The group itself is still loaded on every hit, so
+that ingestion always sees its current status.
+"""
+from __future__ import annotations
+
+from typing import Mapping, Optional, Sequence, Tuple
+from uuid import uuid4
+
+from django.core.cache import cache
+
+from sentry import options
+from sentry.utils import metrics
+from sentry.utils.lru import LRUCache
+
+CACHE_SIZE = 50000
+EPOCH_CACHE_SIZE = 10000
+
+# Seconds for which epochs are cached in process.
+LOCAL_EPOCH_TTL = 5
+
+# The epoch must outlive local entries by far. Should it get evicted anyway a
+# new epoch is created, which only invalidates more than necessary.
+EPOCH_TIMEOUT = 60 * 60 * 24
+
+
+def _get_epoch_key(project_id: int) -> str:
+    return f"grouphash-cache-epoch:{project_id}"
+
+
+class GroupHashCache:
+    def __init__(self, maxsize: int = CACHE_SIZE) -> None:
+        self.local: LRUCache[Tuple[int, str], Tuple[int, str]] = LRUCache(maxsize=maxsize)
+        self.epochs: LRUCache[int, str] = LRUCache(maxsize=EPOCH_CACHE_SIZE)
+
+    def is_enabled(self) -> bool:
+        return bool(options.get("store.grouphash-cache.enabled"))
+
+    def get_epoch(self, project_id: int) -> Optional[str]:
+        """
+        Return the current epoch of the project, or `None` if the cache is
+        disabled. The epoch needs to be read before the grouphashes that are
+        cached under it, or an invalidation in between would be missed.
+        """
+        if not self.is_enabled():
+            return None
+
+        epoch = self.epochs.get(project_id)
+        if epoch is None:
+            key = _get_epoch_key(project_id)
+            epoch = cache.get(key)
+            if epoch is None:
+                epoch = uuid4().hex
+                if not cache.add(key, epoch, EPOCH_TIMEOUT):
+                    epoch = cache.get(key)
+            self.epochs.set(project_id, epoch, ttl=LOCAL_EPOCH_TTL)
+        return epoch
+
+    def get_group_id(self, project_id: int, hashes: Sequence[str], epoch: str) -> Optional[int]:
+        """
+        Return the group of the first hash, but only if every hash is cached.
+        If any hash is unknown the full lookup needs to run anyway, since it
+        may need to be associated with the group.
+        """
+        if not hashes:
+            return None
+
+        group_ids = []
+        for hash in hashes:
+            entry = self.local.get((project_id, hash))
+            if entry is None or entry[1] != epoch:
+                metrics.incr("event_manager.grouphash_cache", tags={"result": "miss"})
+                return None
+            group_ids.append(entry[0])
+
+        metrics.incr("event_manager.grouphash_cache", tags={"result": "hit"})
+        return group_ids[0]
+
+    def set_group_ids(self, project_id: int, group_ids: Mapping[str, int], epoch: str) -> None:
+        if not group_ids:
+            return
+
+        ttl = options.get("store.grouphash-cache.ttl")
+        for hash, group_id in group_ids.items():
+            self.local.set((project_id, hash), (group_id, epoch), ttl=ttl)
+
+    def discard(self, project_id: int, hashes: Sequence[str]) -> None:
+        """
+        Drop entries from the cache of this process only.
+        """
+        for hash in hashes:
+            self.local.delete((project_id, hash))
+
+    def invalidate(self, project_id: int) -> None:
+        """
+        Invalidate all entries of the project, in all processes.
+        """
+        epoch = uuid4().hex
+        cache.set(_get_epoch_key(project_id), epoch, EPOCH_TIMEOUT)
+        self.epochs.set(project_id, epoch, ttl=LOCAL_EPOCH_TTL)
+
+
+grouphash_cache = GroupHashCache()
+
+
+def invalidate_grouphash_cache(project_id: int) -> None:
+    grouphash_cache.invalidate(project_id)
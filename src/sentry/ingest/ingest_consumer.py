@@ -2,7 +2,7 @@ import functools
 import logging
 import random
 import time
-from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
 from typing import (
     Any,
     Callable,
@@ -57,7 +57,24 @@ Message = Any
 
 
 class IngestConsumerWorker(AbstractBatchWorker):
-    def __init__(self, process_event_executor: Optional[ThreadPoolExecutor] = None) -> None:
+    """
+    By default, attachment chunks, attachments and user reports are processed
+    serially on the main thread, and only storing events may be offloaded to
+    ``process_event_executor``.
+
+    If a ``partition_executor`` is provided, messages are instead partitioned
+    by ``(project_id, event_id)``. Messages within a partition are processed
+    in order (attachment chunks first, then all other messages in the order
+    they were received), while independent partitions are processed
+    concurrently on the executor.
+    """
+
+    def __init__(
+        self,
+        process_event_executor: Optional[ThreadPoolExecutor] = None,
+        partition_executor: Optional[ThreadPoolExecutor] = None,
+    ) -> None:
+        self.__partition_executor = partition_executor
         self.__process_event_executor = process_event_executor
         if self.__process_event_executor is None:
             self.__process_event = process_event
@@ -76,6 +93,9 @@ class IngestConsumerWorker(AbstractBatchWorker):
             return self._flush_batch(batch)
 
     def _flush_batch(self, batch: Sequence[Message]):
+        if self.__partition_executor is not None:
+            return self._flush_batch_partitioned(batch, self.__partition_executor)
+
         attachment_chunks = []
 
         # Processing functions may be either synchronous or asynchronous.
@@ -148,9 +168,81 @@ class IngestConsumerWorker(AbstractBatchWorker):
                     (time.monotonic() - other_messages_flush_start) / len(other_messages),
                 )
 
+    def _flush_batch_partitioned(
+        self, batch: Sequence[Message], executor: ThreadPoolExecutor
+    ) -> None:
+        partitions: MutableMapping[Tuple[int, Optional[str]], Partition] = {}
+        projects_to_fetch = set()
+
+        with metrics.timer("ingest_consumer.prepare_messages"):
+            for message in batch:
+                message_type = message["type"]
+                projects_to_fetch.add(message["project_id"])
+
+                partition = partitions.setdefault(
+                    (message["project_id"], message.get("event_id")), Partition([], [])
+                )
+
+                if message_type == "event":
+                    partition.messages.append((process_event, message))
+                elif message_type == "attachment_chunk":
+                    partition.attachment_chunks.append(message)
+                elif message_type == "attachment":
+                    partition.messages.append((process_individual_attachment, message))
+                elif message_type == "user_report":
+                    partition.messages.append((process_userreport, message))
+                else:
+                    raise ValueError(f"Unknown message type: {message_type}")
+                metrics.incr(
+                    "ingest_consumer.flush.messages_seen", tags={"message_type": message_type}
+                )
+
+        with metrics.timer("ingest_consumer.fetch_projects"):
+            projects = {p.id: p for p in Project.objects.get_many_from_cache(projects_to_fetch)}
+
+        metrics.timing("ingest_consumer.partitions", len(partitions))
+
+        with metrics.timer("ingest_consumer.process_partitions_batch"):
+            futures = [
+                executor.submit(process_partition, partition, projects)
+                for partition in partitions.values()
+            ]
+
+            # Wait for all partitions before raising, such that no work of
+            # this batch is still running when the batch is retried.
+            wait(futures)
+
+            for future in futures:
+                future.result()
+
     def shutdown(self):
         if self.__process_event_executor is not None:
             self.__process_event_executor.shutdown()
+        if self.__partition_executor is not None:
+            self.__partition_executor.shutdown()
+
+
+class Partition(NamedTuple):
+    """
+    All messages of a batch that belong to the same ``(project_id, event_id)``.
+    """
+
+    attachment_chunks: MutableSequence[Message]
+    messages: MutableSequence[Tuple[Callable[[Message, Mapping[int, Project]], Any], Message]]
+
+
+@metrics.wraps("ingest_consumer.process_partition")
+def process_partition(partition: Partition, projects: Mapping[int, Project]) -> None:
+    # attachment_chunk messages need to be processed before attachment/event messages.
+    if partition.attachment_chunks:
+        with metrics.timer("ingest_consumer.process_partition.attachment_chunks"):
+            for attachment_chunk in partition.attachment_chunks:
+                process_attachment_chunk(attachment_chunk, projects=projects)
+
+    if partition.messages:
+        with metrics.timer("ingest_consumer.process_partition.other_messages"):
+            for processing_func, message in partition.messages:
+                processing_func(message, projects)
 
 
 def trace_func(**span_kwargs):
@@ -424,7 +516,11 @@ def process_userreport(message, projects) -> None:
 
 
 def get_ingest_consumer(
-    consumer_types, once=False, executor: Optional[ThreadPoolExecutor] = None, **options
+    consumer_types,
+    once=False,
+    executor: Optional[ThreadPoolExecutor] = None,
+    partition_executor: Optional[ThreadPoolExecutor] = None,
+    **options,
 ):
     """
     Handles events coming via a kafka queue.
@@ -433,5 +529,7 @@ def get_ingest_consumer(
     """
     topic_names = {ConsumerType.get_topic_name(consumer_type) for consumer_type in consumer_types}
     return create_batching_kafka_consumer(
-        topic_names=topic_names, worker=IngestConsumerWorker(executor), **options
+        topic_names=topic_names,
+        worker=IngestConsumerWorker(executor, partition_executor=partition_executor),
+        **options,
     )
@@ -1,6 +1,8 @@
 """ Write transactions into redis sets """
+import base64
 import logging
-from typing import Any, Iterator, Mapping
+import zlib
+from typing import Any, Iterator, Mapping, Optional
 
 import sentry_sdk
 from django.conf import settings
@@ -26,6 +28,14 @@ SET_TTL = 24 * 60 * 60
 
 REDIS_KEY_PREFIX = "txnames:"
 
+#: Prefix of the keys of clusterer snapshots. Must not start with
+#: ``REDIS_KEY_PREFIX``, since those keys are used to find active projects.
+SNAPSHOT_KEY_PREFIX = "txsnapshot:"
+
+#: Retention of a snapshot.
+#: Projects that haven't sent transaction names for a week start from scratch.
+SNAPSHOT_TTL = 7 * 24 * 60 * 60
+
 add_to_set = redis.load_script("utils/sadd_capped.lua")
 logger = logging.getLogger(__name__)
 
@@ -75,6 +85,39 @@ def get_transaction_names(project: Project) -> Iterator[str]:
     return client.sscan_iter(redis_key)  # type: ignore
 
 
+def pop_transaction_names(project: Project) -> Iterator[str]:
+    """Remove and return the transaction names stored for the given project.
+
+    Unlike reading and clearing the set, names that are stored in the
+    meantime are not lost.
+    """
+    client = get_redis_client()
+    redis_key = _get_redis_key(project)
+
+    return iter(client.spop(redis_key, MAX_SET_SIZE) or ())
+
+
+def _get_snapshot_key(project: Project) -> str:
+    return f"{SNAPSHOT_KEY_PREFIX}o:{project.organization_id}:p:{project.id}"
+
+
+def get_clusterer_snapshot(project: Project) -> Optional[bytes]:
+    client = get_redis_client()
+    snapshot = client.get(_get_snapshot_key(project))
+    if snapshot is None:
+        return None
+
+    return zlib.decompress(base64.b64decode(snapshot))
+
+
+def store_clusterer_snapshot(project: Project, snapshot: bytes) -> None:
+    # Clients of the cluster decode responses, so the snapshot is stored as
+    # text.
+    client = get_redis_client()
+    value = base64.b64encode(zlib.compress(snapshot)).decode("ascii")
+    client.set(_get_snapshot_key(project), value, ex=SNAPSHOT_TTL)
+
+
 def clear_transaction_names(project: Project) -> None:
     client = get_redis_client()
     redis_key = _get_redis_key(project)
@@ -1,20 +1,23 @@
+import logging
 from itertools import islice
 from typing import Any, Sequence
 
 import sentry_sdk
 from django.conf import settings
 
-from sentry import features
+from sentry import features, options
 from sentry.models import Project
 from sentry.tasks.base import instrumented_task
 from sentry.utils import metrics
 
 from . import rules
 from .datasource import redis
-from .tree import TreeClusterer
+from .tree import CompactTreeClusterer
+
+logger = logging.getLogger(__name__)
 
 #: Minimum number of children in the URL tree which triggers a merge.
-#: See ``TreeClusterer`` for more information.
+#: See ``CompactTreeClusterer`` for more information.
 #: NOTE: We could make this configurable through django settings or even per-project in the future.
 #: Minimum number of children in the URL tree which triggers a merge.
 #: See TreeClusterer for more information.
@@ -62,7 +65,11 @@ def cluster_projects(projects: Sequence[Project]) -> None:
         if features.has("organizations:transaction-name-clusterer", project.organization):
             with sentry_sdk.start_span(op="txcluster_project") as span:
                 span.set_data("project_id", project.id)
-                clusterer = TreeClusterer(merge_threshold=MERGE_THRESHOLD)
+                if options.get("txnames.clusterer.incremental"):
+                    _cluster_project_incrementally(project)
+                    continue
+
+                clusterer = CompactTreeClusterer(merge_threshold=MERGE_THRESHOLD)
                 clusterer.add_input(redis.get_transaction_names(project))
                 new_rules = clusterer.get_rules()
                 rules.update_rules(project, new_rules)
@@ -70,3 +77,32 @@ def cluster_projects(projects: Sequence[Project]) -> None:
                 # Clear transaction names to prevent the set from picking up
                 # noise over a long time range.
                 redis.clear_transaction_names(project)
+
+
+def _load_clusterer(project: Project) -> CompactTreeClusterer:
+    snapshot = redis.get_clusterer_snapshot(project)
+    if snapshot is not None:
+        try:
+            clusterer = CompactTreeClusterer.loads(snapshot)
+        except Exception:
+            logger.warning("Could not load clusterer snapshot", exc_info=True)
+        else:
+            if clusterer.merge_threshold == MERGE_THRESHOLD:
+                metrics.incr("txcluster.snapshot", tags={"result": "hit"})
+                return clusterer
+
+    metrics.incr("txcluster.snapshot", tags={"result": "miss"})
+    return CompactTreeClusterer(merge_threshold=MERGE_THRESHOLD)
+
+
+def _cluster_project_incrementally(project: Project) -> None:
+    """Add the names stored since the last run to the tree of the previous
+    run, and only update rules that are affected by the new names."""
+    transaction_names = list(redis.pop_transaction_names(project))
+    if not transaction_names:
+        return
+
+    clusterer = _load_clusterer(project)
+    clusterer.add_input(transaction_names)
+    rules.update_rules(project, clusterer.get_rules())
+    redis.store_clusterer_snapshot(project, clusterer.dumps())
@@ -47,15 +47,16 @@ The replacement rules are interpreted by Relay to match and replace `*`, and to
 
 import logging
 from collections import UserDict, defaultdict
-from typing import Iterable, List, Optional, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
+import msgpack
 import sentry_sdk
 from typing_extensions import TypeAlias
 
 from .base import Clusterer, ReplacementRule
 from .rule_validator import RuleValidator
 
-__all__ = ["TreeClusterer"]
+__all__ = ["CompactTreeClusterer", "TreeClusterer"]
 
 
 class Merged:
@@ -159,3 +160,208 @@ class Node(UserDict):  # type: ignore
         return Node(
             {name: cls._merge_nodes(children) for name, children in children_by_name.items()}
         )
+
+
+#: Symbol of merged nodes in ``CompactTreeClusterer``
+MERGED_SYMBOL = -1
+
+#: Id of the root node in ``CompactTreeClusterer``
+ROOT = 0
+
+#: Version of the format of ``CompactTreeClusterer.dumps``
+SNAPSHOT_VERSION = 1
+
+
+class CompactTreeClusterer(Clusterer):
+    """Memory efficient variant of ``TreeClusterer`` with identical rules.
+
+    Path segments are interned, and nodes are stored in a table indexed by
+    node id. Every node only holds a mapping from segment symbols to the ids
+    of its children, or nothing at all for leaves, which make up the majority
+    of nodes.
+
+    Nodes are merged in place: the subtrees of all other children are moved
+    into the first child, and only overlapping nodes are visited further.
+    Rules are extracted in a single walk over the merged tree.
+
+    The clusterer can be used incrementally. The merged tree can be saved with
+    ``dumps`` and restored with ``loads``, and new names added to a restored
+    tree. Names are added below the merged node wherever the tree has been
+    merged already, and ``get_rules`` only revisits the nodes that names have
+    been added to since the last call. Only the rules of these nodes are
+    returned.
+    """
+
+    def __init__(self, *, merge_threshold: int) -> None:
+        self._merge_threshold = merge_threshold
+        self._symbols: Dict[str, int] = {}
+        self._segments: List[str] = []
+        self._children: List[Optional[Dict[int, int]]] = [None]
+        self._touched: Set[int] = set()
+        self._rules: Optional[List[ReplacementRule]] = None
+
+    def __len__(self) -> int:
+        """Number of nodes, including the root node and detached nodes."""
+        return len(self._children)
+
+    @property
+    def merge_threshold(self) -> int:
+        return self._merge_threshold
+
+    def _intern(self, segment: str) -> int:
+        symbol = self._symbols.get(segment)
+        if symbol is None:
+            symbol = self._symbols[segment] = len(self._segments)
+            self._segments.append(segment)
+        return symbol
+
+    def _add_child(self, node: int, symbol: int) -> int:
+        children = self._children[node]
+        if children is None:
+            children = self._children[node] = {}
+
+        child = children.get(MERGED_SYMBOL)
+        if child is not None:
+            return child
+
+        child = children.get(symbol)
+        if child is None:
+            child = children[symbol] = len(self._children)
+            self._children.append(None)
+        return child
+
+    def add_input(self, transaction_names: Iterable[str]) -> None:
+        touched = self._touched
+        touched.add(ROOT)
+        for tx_name in transaction_names:
+            node = ROOT
+            for part in tx_name.split(SEP):
+                node = self._add_child(node, self._intern(part))
+                touched.add(node)
+
+    def get_rules(self) -> List[ReplacementRule]:
+        """Computes the rules for the nodes that received input."""
+        with sentry_sdk.start_span(op="txcluster_merge"):
+            self._merge()
+
+        self._rules = [rule for rule in self._iter_rules() if RuleValidator(rule).is_valid()]
+        self._rules.sort(key=len, reverse=True)
+        self._touched.clear()
+        return self._rules
+
+    def _merge(self) -> None:
+        """Merge children of high-cardinality nodes, top-down.
+
+        Only nodes that received input are visited, as well as everything
+        below nodes that are merged in this pass.
+        """
+        if ROOT not in self._touched:
+            return
+
+        touched = self._touched
+        stack = [(ROOT, False)]
+        while stack:
+            node, visit_all = stack.pop()
+            children = self._children[node]
+            if not children:
+                continue
+
+            if len(children) >= self._merge_threshold:
+                nodes = iter(children.values())
+                merged = next(nodes)
+                for other in nodes:
+                    self._merge_into(merged, other)
+                children.clear()
+                children[MERGED_SYMBOL] = merged
+                visit_all = True
+
+            for child in children.values():
+                if visit_all:
+                    touched.add(child)
+                    stack.append((child, True))
+                elif child in touched:
+                    stack.append((child, False))
+
+    def _merge_into(self, target: int, source: int) -> None:
+        """Move the subtree of ``source`` into ``target``."""
+        stack = [(target, source)]
+        while stack:
+            target, source = stack.pop()
+            source_children = self._children[source]
+            if not source_children:
+                continue
+
+            self._children[source] = None
+            target_children = self._children[target]
+            if target_children is None:
+                self._children[target] = source_children
+                continue
+
+            for symbol, child in source_children.items():
+                existing = target_children.get(symbol)
+                if existing is None:
+                    target_children[symbol] = child
+                else:
+                    stack.append((existing, child))
+
+    def _iter_children(self, node: int) -> Iterator[Tuple[int, int]]:
+        children = self._children[node]
+        if not children:
+            return iter(())
+        touched = self._touched
+        return ((symbol, child) for symbol, child in children.items() if child in touched)
+
+    def _iter_rules(self) -> Iterator[ReplacementRule]:
+        """Yield a rule for every merged node that received input, in the
+        order of ``Node.paths``."""
+        parts: List[str] = []
+        stack = [self._iter_children(ROOT)]
+        while stack:
+            entry = next(stack[-1], None)
+            if entry is None:
+                stack.pop()
+                if parts:
+                    parts.pop()
+                continue
+
+            symbol, child = entry
+            if symbol == MERGED_SYMBOL:
+                parts.append("*")
+                yield ReplacementRule(SEP.join(parts) + "/**")
+            else:
+                parts.append(self._segments[symbol])
+            stack.append(self._iter_children(child))
+
+    def dumps(self) -> bytes:
+        """Serialize the tree, without nodes that were detached by merges."""
+        segments: List[str] = []
+        symbols: Dict[int, int] = {MERGED_SYMBOL: MERGED_SYMBOL}
+        nodes: List[List[int]] = []
+
+        # Nodes are renumbered in breadth-first order.
+        queue = [ROOT]
+        for node in queue:
+            entries: List[int] = []
+            for symbol, child in (self._children[node] or {}).items():
+                if symbol not in symbols:
+                    symbols[symbol] = len(segments)
+                    segments.append(self._segments[symbol])
+                entries.extend((symbols[symbol], len(queue)))
+                queue.append(child)
+            nodes.append(entries)
+
+        return msgpack.packb([SNAPSHOT_VERSION, self._merge_threshold, segments, nodes])
+
+    @classmethod
+    def loads(cls, data: bytes) -> "CompactTreeClusterer":
+        version, merge_threshold, segments, nodes = msgpack.unpackb(data)
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unknown snapshot version: {version}")
+
+        clusterer = cls(merge_threshold=merge_threshold)
+        clusterer._segments = segments
+        clusterer._symbols = {segment: symbol for symbol, segment in enumerate(segments)}
+        clusterer._children = [
+            dict(zip(entries[::2], entries[1::2])) if entries else None for entries in nodes
+        ]
+        return clusterer
@@ -1,8 +1,13 @@
+from hashlib import sha1
+
 from symbolic import SourceView
 
+from sentry import options
+from sentry.utils import metrics
+from sentry.utils.lru import LRUCache
 from sentry.utils.strings import codec_lookup
 
-__all__ = ["SourceCache", "SourceMapCache"]
+__all__ = ["SourceCache", "SourceMapCache", "ArtifactViewCache"]
 
 
 def is_utf8(codec):
@@ -10,6 +15,20 @@ def is_utf8(codec):
     return name in ("utf-8", "ascii")
 
 
+def make_source_view(source, encoding=None):
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    # If an encoding is provided and it's not utf-8 compatible
+    # we try to re-encoding the source and create a source view
+    # from it.
+    elif encoding is not None and not is_utf8(encoding):
+        try:
+            source = source.decode(encoding).encode("utf-8")
+        except UnicodeError:
+            pass
+    return SourceView.from_bytes(source)
+
+
 class SourceCache:
     def __init__(self):
         self._cache = {}
@@ -40,17 +59,7 @@ class SourceCache:
         url = self._get_canonical_url(url)
 
         if not isinstance(source, SourceView):
-            if isinstance(source, str):
-                source = source.encode("utf-8")
-            # If an encoding is provided and it's not utf-8 compatible
-            # we try to re-encoding the source and create a source view
-            # from it.
-            elif encoding is not None and not is_utf8(encoding):
-                try:
-                    source = source.decode(encoding).encode("utf-8")
-                except UnicodeError:
-                    pass
-            source = SourceView.from_bytes(source)
+            source = make_source_view(source, encoding)
         self._cache[url] = source
 
     def add_error(self, url, error):
@@ -90,3 +99,67 @@ class SourceMapCache:
             sourcemap = self.get(sourcemap_url)
             return (sourcemap_url, sourcemap)
         return (None, None)
+
+
+class ArtifactViewCache:
+    """
+    Process-wide cache of parsed release artifacts, such as source views and
+    source maps, shared by all events processed in the process.
+
+    Entries are keyed by release, dist and URL of the artifact along with a
+    checksum of its contents, so a re-uploaded artifact is parsed again. The
+    cache is bounded by the total size of the parsed contents, which serves
+    as an estimate of the memory held by the parsed artifacts. Its size is
+    controlled by the ``processing.javascript-view-cache-size`` option, and a
+    size of 0 disables the cache.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self._cache = LRUCache(maxsize=0, sizeof=lambda entry: entry[1])
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get_or_parse(self, release, dist, url, contents, parse_fn):
+        """
+        Return the cached artifact for the given contents, or parse it with
+        ``parse_fn`` and cache the result. Errors raised while parsing are
+        not cached.
+        """
+
+        maxsize = options.get("processing.javascript-view-cache-size")
+        if not maxsize:
+            return parse_fn()
+
+        checksum = sha1()
+        size = 0
+        for content in contents:
+            checksum.update(b"%d:" % len(content))
+            checksum.update(content)
+            size += len(content)
+
+        key = (release and release.id, dist and dist.name, url, checksum.hexdigest())
+        tags = {"kind": self.kind}
+
+        entry = self._cache.get(key)
+        if entry is not None:
+            metrics.incr("sourcemaps.view_cache", tags={**tags, "result": "hit"})
+            metrics.incr("sourcemaps.view_cache.bytes", amount=size, tags={**tags, "result": "hit"})
+            return entry[0]
+
+        view = parse_fn()
+
+        self._cache.maxsize = maxsize
+        self._cache.set(key, (view, size))
+        metrics.incr("sourcemaps.view_cache", tags={**tags, "result": "miss"})
+        metrics.incr("sourcemaps.view_cache.bytes", amount=size, tags={**tags, "result": "miss"})
+        metrics.gauge("sourcemaps.view_cache.size", self._cache.currsize, tags=tags)
+        return view
+
+    def clear(self):
+        self._cache.clear()
+
+
+source_view_cache = ArtifactViewCache("source")
+sourcemap_view_cache = ArtifactViewCache("sourcemap")
@@ -1,22 +1,26 @@
 import base64
 import errno
+import functools
 import logging
 import re
 import sys
+import threading
 import time
 import zlib
 from datetime import datetime
 from io import BytesIO
 from itertools import groupby
 from os.path import splitext
-from typing import IO, Optional, Tuple
+from typing import IO, Dict, Optional, Tuple
 from urllib.parse import urlsplit
 
 import sentry_sdk
 from django.conf import settings
+from django.db import close_old_connections
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_text
 from requests.utils import get_encoding_from_headers
+from sentry_sdk import Hub
 from symbolic import SourceMapCache as SmCache
 
 from sentry import features, http, options
@@ -30,14 +34,22 @@ from sentry.utils import json, metrics
 # holding the results of attempting to fetch both kinds of files, either from the
 # database or from the internet
 from sentry.utils.cache import cache
+from sentry.utils.concurrent import ThreadedExecutor
 from sentry.utils.files import compress_file
 from sentry.utils.hashlib import md5_text
 from sentry.utils.http import is_valid_origin
+from sentry.utils.lru import LRUCache
 from sentry.utils.retries import ConditionalRetryPolicy, exponential_delay
 from sentry.utils.safe import get_path
 from sentry.utils.urls import non_standard_url_join
 
-from .cache import SourceCache, SourceMapCache
+from .cache import (
+    SourceCache,
+    SourceMapCache,
+    make_source_view,
+    source_view_cache,
+    sourcemap_view_cache,
+)
 
 __all__ = ["JavaScriptStacktraceProcessor"]
 
@@ -444,8 +456,70 @@ def get_artifact_index(release, dist):
     return index
 
 
-def get_index_entry(release, dist, url) -> Optional[dict]:
+class ArtifactIndexLookup:
+    """
+    Compact lookup of the archives containing the files of an artifact index.
+
+    Only the URLs of the files and the idents of their archives are kept,
+    which is all that is needed to find the archive of a URL. Archive idents
+    are shared by all files of an archive.
+    """
+
+    __slots__ = ("_archive_idents", "_files")
+
+    def __init__(self, index: Optional[dict]):
+        archive_idents: Dict[str, int] = {}
+        self._files: Dict[str, int] = {}
+        for url, info in ((index or {}).get("files") or {}).items():
+            if info:
+                self._files[url] = archive_idents.setdefault(
+                    info["archive_ident"], len(archive_idents)
+                )
+        self._archive_idents = list(archive_idents)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def get_archive_ident(self, url: str) -> Optional[str]:
+        for candidate in ReleaseFile.normalize(url):
+            archive = self._files.get(candidate)
+            if archive is not None:
+                return self._archive_idents[archive]
+
+        return None
+
+
+# Lookups are bounded by the total number of files they contain.
+ARTIFACT_INDEX_LOOKUP_CACHE_SIZE = 1000000
+
+_artifact_index_lookups: "LRUCache[Tuple[int, Optional[str]], ArtifactIndexLookup]" = LRUCache(
+    maxsize=ARTIFACT_INDEX_LOOKUP_CACHE_SIZE, sizeof=lambda lookup: len(lookup) + 1
+)
+
+
+def get_artifact_index_lookup(release, dist, ttl: int) -> ArtifactIndexLookup:
+    """
+    Returns the lookup of the artifact index of a release and dist, which is
+    shared in-process for ``ttl`` seconds.
+    """
+    key = (release.id, dist and dist.name or None)
+    lookup = _artifact_index_lookups.get(key)
+    if lookup is not None:
+        metrics.incr("sourcemaps.artifact_index_lookup", tags={"result": "hit"})
+        return lookup
+
+    lookup = ArtifactIndexLookup(get_artifact_index(release, dist))
+    _artifact_index_lookups.set(key, lookup, ttl=ttl)
+    metrics.incr("sourcemaps.artifact_index_lookup", tags={"result": "miss"})
+    return lookup
+
+
+def get_index_archive_ident(release, dist, url) -> Optional[str]:
     try:
+        ttl = options.get("processing.artifact-index-lookup-ttl")
+        if ttl:
+            return get_artifact_index_lookup(release, dist, ttl).get_archive_ident(url)
+
         index = get_artifact_index(release, dist)
     except Exception as exc:
         logger.error("sourcemaps.index_read_failed", exc_info=exc)
@@ -455,7 +529,7 @@ def get_index_entry(release, dist, url) -> Optional[dict]:
         for candidate in ReleaseFile.normalize(url):
             entry = index.get("files", {}).get(candidate)
             if entry:
-                return entry
+                return entry["archive_ident"]
 
     return None
 
@@ -469,15 +543,13 @@ def fetch_release_archive_for_url(release, dist, url) -> Optional[IO]:
 
     If return value is not empty, the caller is responsible for closing the stream.
     """
-    with sentry_sdk.start_span(op="fetch_release_archive_for_url.get_index_entry"):
-        info = get_index_entry(release, dist, url)
-    if info is None:
+    with sentry_sdk.start_span(op="fetch_release_archive_for_url.get_index_archive_ident"):
+        archive_ident = get_index_archive_ident(release, dist, url)
+    if archive_ident is None:
         # Cannot write negative cache entry here because ID of release archive
         # is not yet known
         return None
 
-    archive_ident = info["archive_ident"]
-
     # TODO(jjbayer): Could already extract filename from info and return
     # it later
 
@@ -794,7 +866,14 @@ def fetch_sourcemap(url, source=b"", project=None, release=None, dist=None, allo
         with sentry_sdk.start_span(
             op="JavaScriptStacktraceProcessor.fetch_sourcemap.SmCache.from_bytes"
         ):
-            return SmCache.from_bytes(source, body)
+            # Data URLs are already covered by the checksum of the contents.
+            return sourcemap_view_cache.get_or_parse(
+                release,
+                dist,
+                None if is_data_uri(url) else url,
+                (source, body),
+                lambda: SmCache.from_bytes(source, body),
+            )
 
     except Exception as exc:
         # This is in debug because the product shows an error already.
@@ -898,6 +977,50 @@ def fold_function_name(function_name):
     return f'{".".join(map(format_groups, grouped))}.{tail}'
 
 
+_fetch_executors = {}
+_fetch_executors_lock = threading.Lock()
+
+
+def _get_fetch_executor(concurrency):
+    """
+    Return the pool of threads for fetching with the given concurrency. Pools
+    live as long as the process, so that their threads can keep their database
+    connections between events.
+    """
+    executor = _fetch_executors.get(concurrency)
+    if executor is None:
+        with _fetch_executors_lock:
+            executor = _fetch_executors.get(concurrency)
+            if executor is None:
+                executor = _fetch_executors[concurrency] = ThreadedExecutor(
+                    worker_count=concurrency
+                )
+    return executor
+
+
+def _fetch_concurrently(executor, fetch_fn, items):
+    """
+    Call ``fetch_fn`` for all items on the executor. Returns a list of
+    ``(result, exc)`` tuples in the order of ``items``, where ``exc`` is the
+    ``BadSource`` error raised for the item, if any. Other errors are raised.
+    """
+
+    def fetch(item, thread_hub):
+        # Threads keep their database connections between fetches, and
+        # recycle them the same way as they are at the start and end of tasks.
+        close_old_connections()
+        try:
+            with thread_hub:
+                return fetch_fn(item), None
+        except http.BadSource as exc:
+            return None, exc
+        finally:
+            close_old_connections()
+
+    futures = [executor.submit(functools.partial(fetch, item, Hub(Hub.current))) for item in items]
+    return [future.result() for future in futures]
+
+
 class JavaScriptStacktraceProcessor(StacktraceProcessor):
     """
     Modern SourceMap processor using symbolic-sourcemapcache.
@@ -1254,64 +1377,25 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
         map (if any).
         """
 
-        sourcemaps = self.sourcemaps
-        cache = self.cache
-
-        self.fetch_count += 1
-
-        if self.fetch_count > self.max_fetches:
-            cache.add_error(filename, {"type": EventError.JS_TOO_MANY_REMOTE_SOURCES})
+        if not self._reserve_fetch(filename):
             return
 
         # TODO: respect cache-control/max-age headers to some extent
         logger.debug("Attempting to cache source %r", filename)
         try:
             # this both looks in the database and tries to scrape the internet
-            with sentry_sdk.start_span(
-                op="JavaScriptStacktraceProcessor.cache_source.fetch_file"
-            ) as span:
-                span.set_data("filename", filename)
-                result = fetch_file(
-                    filename,
-                    project=self.project,
-                    release=self.release,
-                    dist=self.dist,
-                    allow_scraping=self.allow_scraping,
-                )
+            result = self._fetch_file(filename)
         except http.BadSource as exc:
-            if not fetch_error_should_be_silienced(exc.data, filename):
-                cache.add_error(filename, exc.data)
-            # either way, there's no more for us to do here, since we don't have
-            # a valid file to cache
+            self._add_file_error(filename, exc)
             return
-        cache.add(filename, result.body, result.encoding)
-        cache.alias(result.url, filename)
 
-        sourcemap_url = discover_sourcemap(result)
+        sourcemap_url = self._cache_file(filename, result)
         if not sourcemap_url:
             return
 
-        logger.debug(
-            "Found sourcemap URL %r for minified script %r", sourcemap_url[:256], result.url
-        )
-        sourcemaps.link(filename, sourcemap_url)
-        if sourcemap_url in sourcemaps:
-            return
-
         # pull down sourcemap
         try:
-            with sentry_sdk.start_span(
-                op="JavaScriptStacktraceProcessor.cache_source.fetch_sourcemap"
-            ) as span:
-                span.set_data("sourcemap_url", sourcemap_url)
-                sourcemap_view = fetch_sourcemap(
-                    sourcemap_url,
-                    source=result.body,
-                    project=self.project,
-                    release=self.release,
-                    dist=self.dist,
-                    allow_scraping=self.allow_scraping,
-                )
+            sourcemap_view = self._fetch_sourcemap(sourcemap_url, result.body)
         except http.BadSource as exc:
             # we don't perform the same check here as above, because if someone has
             # uploaded a node_modules file, which has a sourceMappingURL, they
@@ -1319,13 +1403,138 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
             # working, if that's the case). If they're not looking for it to be
             # mapped, then they shouldn't be uploading the source file in the
             # first place.
-            cache.add_error(filename, exc.data)
+            self.cache.add_error(filename, exc.data)
             return
 
+        self._cache_sourcemap(sourcemap_url, sourcemap_view)
+
+    def prefetch_sources(self, filenames, concurrency):
+        """
+        Fetch and cache the given source files and their source maps using a
+        pool of threads.
+
+        All source files are fetched at once, followed by all source maps
+        discovered in them. The results are added to the caches in the order
+        of ``filenames``, with the same fetch limit and errors as
+        ``cache_source``.
+        """
+
+        filenames = [filename for filename in filenames if self._reserve_fetch(filename)]
+        if not filenames:
+            return
+
+        executor = _get_fetch_executor(concurrency)
+
+        # Source maps shared by several files are only fetched once, along
+        # with the body of the first file linking to them.
+        pending_sourcemaps = {}
+        for filename, (result, exc) in zip(
+            filenames, _fetch_concurrently(executor, self._fetch_file, filenames)
+        ):
+            if exc is not None:
+                self._add_file_error(filename, exc)
+                continue
+
+            sourcemap_url = self._cache_file(filename, result)
+            if not sourcemap_url:
+                continue
+            if sourcemap_url in pending_sourcemaps:
+                pending_sourcemaps[sourcemap_url][1].append(filename)
+            else:
+                pending_sourcemaps[sourcemap_url] = (result.body, [filename])
+
+        sourcemap_urls = list(pending_sourcemaps)
+        for sourcemap_url, (sourcemap_view, exc) in zip(
+            sourcemap_urls,
+            _fetch_concurrently(
+                executor,
+                lambda url: self._fetch_sourcemap(url, pending_sourcemaps[url][0]),
+                sourcemap_urls,
+            ),
+        ):
+            if exc is not None:
+                for filename in pending_sourcemaps[sourcemap_url][1]:
+                    self.cache.add_error(filename, exc.data)
+                continue
+
+            self._cache_sourcemap(sourcemap_url, sourcemap_view)
+
+    def _reserve_fetch(self, filename):
+        self.fetch_count += 1
+
+        if self.fetch_count > self.max_fetches:
+            self.cache.add_error(filename, {"type": EventError.JS_TOO_MANY_REMOTE_SOURCES})
+            return False
+
+        return True
+
+    def _fetch_file(self, filename):
         with sentry_sdk.start_span(
-            op="JavaScriptStacktraceProcessor.cache_source.cache_sourcemap_view"
+            op="JavaScriptStacktraceProcessor.cache_source.fetch_file"
+        ) as span:
+            span.set_data("filename", filename)
+            return fetch_file(
+                filename,
+                project=self.project,
+                release=self.release,
+                dist=self.dist,
+                allow_scraping=self.allow_scraping,
+            )
+
+    def _add_file_error(self, filename, exc):
+        if not fetch_error_should_be_silienced(exc.data, filename):
+            self.cache.add_error(filename, exc.data)
+        # either way, there's no more for us to do here, since we don't have
+        # a valid file to cache
+
+    def _cache_file(self, filename, result):
+        """
+        Cache a fetched source file and return the URL of its source map, if
+        the source map still needs to be fetched.
+        """
+
+        source_view = source_view_cache.get_or_parse(
+            self.release,
+            self.dist,
+            result.url,
+            (result.body, (result.encoding or "").encode()),
+            lambda: make_source_view(result.body, result.encoding),
+        )
+        self.cache.add(filename, source_view)
+        self.cache.alias(result.url, filename)
+
+        sourcemap_url = discover_sourcemap(result)
+        if not sourcemap_url:
+            return None
+
+        logger.debug(
+            "Found sourcemap URL %r for minified script %r", sourcemap_url[:256], result.url
+        )
+        self.sourcemaps.link(filename, sourcemap_url)
+        if sourcemap_url in self.sourcemaps:
+            return None
+
+        return sourcemap_url
+
+    def _fetch_sourcemap(self, sourcemap_url, source):
+        with sentry_sdk.start_span(
+            op="JavaScriptStacktraceProcessor.cache_source.fetch_sourcemap"
         ) as span:
-            sourcemaps.add(sourcemap_url, sourcemap_view)
+            span.set_data("sourcemap_url", sourcemap_url)
+            return fetch_sourcemap(
+                sourcemap_url,
+                source=source,
+                project=self.project,
+                release=self.release,
+                dist=self.dist,
+                allow_scraping=self.allow_scraping,
+            )
+
+    def _cache_sourcemap(self, sourcemap_url, sourcemap_view):
+        with sentry_sdk.start_span(
+            op="JavaScriptStacktraceProcessor.cache_source.cache_sourcemap_view"
+        ):
+            self.sourcemaps.add(sourcemap_url, sourcemap_view)
 
     def populate_source_cache(self, frames):
         """
@@ -1348,6 +1557,15 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 continue
             pending_file_list.add(f["abs_path"])
 
+        concurrency = options.get("processing.javascript-fetch-concurrency")
+        if concurrency > 1 and len(pending_file_list) > 1:
+            with sentry_sdk.start_span(
+                op="JavaScriptStacktraceProcessor.populate_source_cache.prefetch_sources"
+            ) as span:
+                span.set_data("files", len(pending_file_list))
+                self.prefetch_sources(list(pending_file_list), concurrency)
+            return
+
         for idx, filename in enumerate(pending_file_list):
             with sentry_sdk.start_span(
                 op="JavaScriptStacktraceProcessor.populate_source_cache.cache_source"
@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Trains a zstd dictionary for nodestore payloads from a sample of existing nodes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--platform", dest="platform", default="other"),
+        parser.add_argument(
+            "--samples",
+            dest="samples",
+            type=int,
+            default=5000,
+            help="Number of nodes of the platform to train the dictionary on.",
+        ),
+        parser.add_argument(
+            "--scan-limit",
+            dest="scan_limit",
+            type=int,
+            default=100000,
+            help="Maximum number of recent nodes to scan for samples.",
+        ),
+        parser.add_argument(
+            "--size", dest="size", type=int, default=112640, help="Dictionary size in bytes."
+        ),
+        parser.add_argument(
+            "--activate",
+            dest="activate",
+            action="store_true",
+            default=False,
+            help="Use the new dictionary for new nodes of the platform.",
+        )
+
+    def handle(self, **options):
+        import zstandard
+
+        from sentry import nodestore
+        from sentry import options as sentry_options
+        from sentry.nodestore.base import NodeStorage
+        from sentry.nodestore.codecs import dictionary_store
+        from sentry.nodestore.django.backend import DjangoNodeStorage
+        from sentry.nodestore.django.models import Node
+        from sentry.utils.functional import extract_lazy_object
+
+        ns = extract_lazy_object(nodestore.backend)
+        if not isinstance(ns, DjangoNodeStorage):
+            raise CommandError("Dictionaries can only be trained for the Django nodestore backend")
+
+        platform = options["platform"]
+        samples = []
+        queryset = Node.objects.order_by("-timestamp").values_list("data", flat=True)
+        for data in queryset[: options["scan_limit"]].iterator():
+            try:
+                value = ns.codecs.decode(data)
+                payload = NodeStorage._decode(ns, value, subkey=None)
+            except Exception:
+                # Legacy pickled nodes are not worth training on
+                continue
+
+            if isinstance(payload, dict) and (payload.get("platform") or "other") == platform:
+                samples.append(value)
+                if len(samples) >= options["samples"]:
+                    break
+
+        if not samples:
+            raise CommandError(f"No nodes found for platform {platform!r}")
+
+        dictionary = zstandard.train_dictionary(options["size"], samples)
+        dict_id = dictionary_store.store(platform, dictionary)
+        self.stdout.write(
+            f"Trained dictionary {dict_id} for platform {platform!r} from {len(samples)} nodes"
+        )
+
+        if options["activate"]:
+            dictionaries = dict(sentry_options.get("nodestore.zstd-dictionaries"))
+            dictionaries[platform] = dict_id
+            sentry_options.set("nodestore.zstd-dictionaries", dictionaries)
+            self.stdout.write(f"Dictionary {dict_id} is now used for platform {platform!r}")
@@ -1,8 +1,10 @@
+import struct
 from threading import local
 
 import sentry_sdk
 from django.core.cache import InvalidCacheBackendError, caches
 
+from sentry import options
 from sentry.utils import json
 from sentry.utils.cache import memoize
 from sentry.utils.services import Service
@@ -22,6 +24,18 @@ json_dumps = json.JSONEncoder(
 
 json_loads = json._default_decoder.decode
 
+# Blobs in the subkey-indexed format start with this magic sequence. Neither
+# JSON nor pickle payloads written by older versions can start with a NUL byte,
+# which allows both formats to be stored side by side.
+INDEXED_BLOB_MAGIC = b"\x00ns"
+INDEXED_BLOB_VERSION = 1
+
+# Header: format version, number of index entries.
+_indexed_blob_header = struct.Struct("<BH")
+# Index entry: payload offset, payload length, subkey length. Followed by the
+# ASCII subkey itself, the default subkey (`None`) is stored as empty string.
+_indexed_blob_entry = struct.Struct("<IIB")
+
 
 class NodeStorage(local, Service):
     """
@@ -64,7 +78,9 @@ class NodeStorage(local, Service):
         "get",
         "get_multi",
         "set",
+        "set_multi",
         "set_subkeys",
+        "set_subkeys_multi",
         "cleanup",
         "validate",
         "bootstrap",
@@ -92,6 +108,9 @@ class NodeStorage(local, Service):
         if value is None:
             return None
 
+        if value.startswith(INDEXED_BLOB_MAGIC):
+            return self._decode_indexed(value, subkey)
+
         lines_iter = iter(value.splitlines())
         try:
             if subkey is not None:
@@ -112,6 +131,31 @@ class NodeStorage(local, Service):
         except StopIteration:
             return None
 
+    def _decode_indexed(self, value, subkey):
+        """
+        Decode a single subkey from a blob written by `_encode_indexed`. Only
+        the payload of the requested subkey is sliced out and deserialized.
+        """
+        # See comment in `_decode` on why subkeys are ASCII only.
+        subkey = subkey.encode("ascii") if subkey is not None else b""
+
+        view = memoryview(value)
+        pos = len(INDEXED_BLOB_MAGIC)
+        version, count = _indexed_blob_header.unpack_from(view, pos)
+        if version != INDEXED_BLOB_VERSION:
+            raise ValueError(f"Unsupported nodestore blob version: {version}")
+
+        pos += _indexed_blob_header.size
+        for _ in range(count):
+            offset, length, key_length = _indexed_blob_entry.unpack_from(view, pos)
+            pos += _indexed_blob_entry.size
+            key = view[pos : pos + key_length]
+            pos += key_length
+            if key == subkey:
+                return json_loads(bytes(view[offset : offset + length]))
+
+        return None
+
     def _get_bytes(self, id):
         """
         >>> nodestore._get_bytes('key1')
@@ -201,6 +245,9 @@ class NodeStorage(local, Service):
         >>> _encode({"unprocessed": {}, None: {"stacktrace": {}}})
         b'{"stacktrace": {}}\nunprocessed\n{}'
         """
+        if len(data) > 1 and options.get("nodestore.write-indexed-subkeys"):
+            return self._encode_indexed(data)
+
         lines = [json_dumps(data.pop(None)).encode("utf8")]
         for key, value in data.items():
             lines.append(key.encode("ascii"))
@@ -208,6 +255,37 @@ class NodeStorage(local, Service):
 
         return b"\n".join(lines)
 
+    def _encode_indexed(self, data):
+        """
+        Encode data dict into a versioned blob with a header that maps every
+        subkey to the offset and length of its payload, so that a single
+        subkey can be read without scanning the others.
+
+        >>> _encode_indexed({"unprocessed": {}, None: {"stacktrace": {}}})
+        b'\x00ns\x01\x02\x00...{"stacktrace":{}}{}'
+        """
+        keys = [b""]
+        payloads = [json_dumps(data.pop(None)).encode("utf8")]
+        for key, value in data.items():
+            keys.append(key.encode("ascii"))
+            payloads.append(json_dumps(value).encode("utf8"))
+
+        header_size = (
+            len(INDEXED_BLOB_MAGIC)
+            + _indexed_blob_header.size
+            + sum(_indexed_blob_entry.size + len(key) for key in keys)
+        )
+
+        parts = [INDEXED_BLOB_MAGIC, _indexed_blob_header.pack(INDEXED_BLOB_VERSION, len(keys))]
+        offset = header_size
+        for key, payload in zip(keys, payloads):
+            parts.append(_indexed_blob_entry.pack(offset, len(payload), len(key)))
+            parts.append(key)
+            offset += len(payload)
+
+        parts.extend(payloads)
+        return b"".join(parts)
+
     def _set_bytes(self, id, data, ttl=None):
         """
         >>> nodestore.set('key1', b"{'foo': 'bar'}")
@@ -246,6 +324,50 @@ class NodeStorage(local, Service):
             # set cache only after encoding and write to nodestore has succeeded
             self._set_cache_item(id, cache_item)
 
+    def _set_bytes_multi(self, items, ttl=None):
+        """
+        >>> nodestore._set_bytes_multi({
+        ...     'key1': b"{'foo': 'bar'}",
+        ...     'key2': b"{'foo': 'baz'}",
+        ... })
+        """
+        for id, data in items.items():
+            self._set_bytes(id, data, ttl=ttl)
+
+    def set_multi(self, items, ttl=None):
+        """
+        Set values for multiple ids at once. Like `set`, this deletes existing
+        subkeys for each id.
+
+        >>> nodestore.set_multi({'key1': {'foo': 'bar'}, 'key2': {'foo': 'baz'}})
+        """
+        return self.set_subkeys_multi({id: {None: data} for id, data in items.items()}, ttl=ttl)
+
+    def set_subkeys_multi(self, items, ttl=None):
+        """
+        Set values and subkeys for multiple ids at once. Backends that support
+        batched writes store all nodes in as few round-trips as possible.
+
+        Note: This is not guaranteed to be atomic and may result in a partial
+        write.
+
+        >>> nodestore.set_subkeys_multi({
+        ...     'key1': {None: {'foo': 'bar'}, "reprocessing": {'foo': 'bam'}},
+        ...     'key2': {None: {'foo': 'baz'}},
+        ... })
+        """
+        with sentry_sdk.start_span(op="nodestore.set_subkeys_multi") as span:
+            span.set_tag("num_ids", len(items))
+            cache_items = {}
+            bytes_items = {}
+            for id, data in items.items():
+                cache_items[id] = data.get(None)
+                bytes_items[id] = self._encode(data)
+
+            self._set_bytes_multi(bytes_items, ttl=ttl)
+            # set cache only after encoding and write to nodestore has succeeded
+            self._set_cache_items({id: data for id, data in cache_items.items() if data})
+
     def cleanup(self, cutoff_timestamp):
         raise NotImplementedError
 
@@ -0,0 +1,184 @@
+"""
+Compression codecs for nodestore payloads.
+
+Payloads are stored together with the id of the codec that encoded them, which
+allows payloads written with different codecs to live side by side. The zstd
+codec can additionally compress payloads with a dictionary trained on events
+of the same platform (see the ``train_nodestore_dictionary`` management
+command). The id of the dictionary is embedded in the zstd frame header, so
+readers always know which dictionary to load.
+"""
+import base64
+import zlib
+from io import BytesIO
+from threading import Lock
+from typing import Dict, Mapping, MutableMapping, Optional
+
+import zstandard
+
+from sentry import options
+from sentry.utils import metrics
+
+DICTIONARY_FILE_TYPE = "nodestore.zstd-dictionary"
+
+# Separates the codec id from the payload. Legacy payloads are plain base64
+# without a codec id, and the base64 alphabet does not contain this character.
+CODEC_SEPARATOR = ":"
+
+
+class ZstdDictionaryStore:
+    """
+    Loads trained zstd dictionaries from the file store. Dictionaries are
+    immutable once created, so they are cached for the lifetime of the process.
+    """
+
+    def __init__(self) -> None:
+        self.__dictionaries: MutableMapping[int, zstandard.ZstdCompressionDict] = {}
+        self.__lock = Lock()
+
+    def get(self, dict_id: int) -> zstandard.ZstdCompressionDict:
+        try:
+            return self.__dictionaries[dict_id]
+        except KeyError:
+            pass
+
+        with self.__lock:
+            if dict_id not in self.__dictionaries:
+                with metrics.timer("nodestore.codecs.load_dictionary"):
+                    self.__dictionaries[dict_id] = self._load(dict_id)
+            return self.__dictionaries[dict_id]
+
+    def _load(self, dict_id: int) -> zstandard.ZstdCompressionDict:
+        from sentry.models import File
+
+        file = File.objects.filter(type=DICTIONARY_FILE_TYPE, name=str(dict_id)).get()
+        with file.getfile() as fp:
+            return zstandard.ZstdCompressionDict(fp.read())
+
+    def store(self, platform: str, dictionary: zstandard.ZstdCompressionDict) -> int:
+        from sentry.models import File
+
+        dict_id = dictionary.dict_id()
+        file = File.objects.create(
+            name=str(dict_id), type=DICTIONARY_FILE_TYPE, headers={"platform": platform}
+        )
+        file.putfile(BytesIO(dictionary.as_bytes()))
+
+        with self.__lock:
+            self.__dictionaries[dict_id] = dictionary
+
+        return dict_id
+
+
+dictionary_store = ZstdDictionaryStore()
+
+
+class NodeCodec:
+    id: str
+
+    def encode(self, value: bytes, platform: Optional[str] = None) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, value: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class ZlibNodeCodec(NodeCodec):
+    id = "zlib"
+
+    def encode(self, value: bytes, platform: Optional[str] = None) -> bytes:
+        return zlib.compress(value)
+
+    def decode(self, value: bytes) -> bytes:
+        return zlib.decompress(value)
+
+
+class ZstdNodeCodec(NodeCodec):
+    """
+    zstd compression, using the dictionary configured for the event platform
+    in the ``nodestore.zstd-dictionaries`` option if there is one.
+
+    Compression contexts are not thread-safe. This codec is meant to be owned
+    by a ``NodeStorage`` instance, which is already thread-local.
+    """
+
+    id = "zstd"
+
+    def __init__(self, dictionaries: ZstdDictionaryStore = dictionary_store) -> None:
+        self.dictionaries = dictionaries
+        self.__compressors: Dict[int, zstandard.ZstdCompressor] = {}
+        self.__decompressors: Dict[int, zstandard.ZstdDecompressor] = {}
+
+    def _get_dict_id(self, platform: Optional[str]) -> int:
+        dictionaries: Mapping[str, int] = options.get("nodestore.zstd-dictionaries")
+        return int(dictionaries.get(platform or "other", 0))
+
+    def encode(self, value: bytes, platform: Optional[str] = None) -> bytes:
+        dict_id = self._get_dict_id(platform)
+        compressor = self.__compressors.get(dict_id)
+        if compressor is None:
+            if dict_id:
+                dict_data = self.dictionaries.get(dict_id)
+                compressor = zstandard.ZstdCompressor(dict_data=dict_data, write_dict_id=True)
+            else:
+                compressor = zstandard.ZstdCompressor()
+            self.__compressors[dict_id] = compressor
+
+        metrics.incr(
+            "nodestore.codecs.encode",
+            tags={"codec": self.id, "dictionary": "true" if dict_id else "false"},
+            sample_rate=0.1,
+        )
+        return compressor.compress(value)
+
+    def decode(self, value: bytes) -> bytes:
+        dict_id = zstandard.get_frame_parameters(value).dict_id
+        decompressor = self.__decompressors.get(dict_id)
+        if decompressor is None:
+            if dict_id:
+                decompressor = zstandard.ZstdDecompressor(dict_data=self.dictionaries.get(dict_id))
+            else:
+                decompressor = zstandard.ZstdDecompressor()
+            self.__decompressors[dict_id] = decompressor
+
+        return decompressor.decompress(value)
+
+
+class NodeCodecs:
+    """
+    Encodes node payloads into the text representation stored by the Django
+    backend, tagged with the id of the codec used.
+
+    >>> codecs = NodeCodecs()  # with `nodestore.codec` set to "zstd"
+    >>> codecs.encode(b'{"foo":"bar"}', platform="python")
+    'zstd:KLUv/SANaQAAeyJmb28iOiJiYXIifQ=='
+    """
+
+    def __init__(self) -> None:
+        self.codecs: Mapping[str, NodeCodec] = {
+            codec.id: codec for codec in (ZlibNodeCodec(), ZstdNodeCodec())
+        }
+
+    def encode(self, value: bytes, platform: Optional[str] = None) -> str:
+        codec_id = options.get("nodestore.codec")
+        codec = self.codecs[codec_id]
+        payload = base64.b64encode(codec.encode(value, platform=platform)).decode("utf-8")
+
+        # zlib payloads are written without codec id to remain readable by
+        # older versions.
+        if codec_id == ZlibNodeCodec.id:
+            return payload
+
+        return f"{codec_id}{CODEC_SEPARATOR}{payload}"
+
+    def decode(self, value: str) -> bytes:
+        codec_id, separator, payload = value.partition(CODEC_SEPARATOR)
+        if not separator:
+            codec_id, payload = ZlibNodeCodec.id, value
+
+        try:
+            codec = self.codecs[codec_id]
+        except KeyError:
+            raise ValueError(f"Unknown nodestore codec: {codec_id}")
+
+        return codec.decode(base64.b64decode(payload))
@@ -2,11 +2,13 @@ import logging
 import math
 import pickle
 
+from django.db import connections, router
 from django.utils import timezone
 
 from sentry.db.models import create_or_update
-from sentry.nodestore.base import NodeStorage
-from sentry.utils.strings import compress, decompress
+from sentry.nodestore.base import INDEXED_BLOB_MAGIC, NodeStorage
+from sentry.nodestore.codecs import NodeCodecs
+from sentry.utils.cache import memoize
 
 from .models import Node
 
@@ -14,6 +16,16 @@ logger = logging.getLogger("sentry")
 
 
 class DjangoNodeStorage(NodeStorage):
+    """
+    Stores nodes in the `nodestore_node` table. Payloads are compressed with
+    the codec configured in the `nodestore.codec` option, see
+    `sentry.nodestore.codecs`.
+    """
+
+    @memoize
+    def codecs(self):
+        return NodeCodecs()
+
     def delete(self, id):
         Node.objects.filter(id=id).delete()
         self._delete_cache_item(id)
@@ -23,7 +35,9 @@ class DjangoNodeStorage(NodeStorage):
             return None
 
         try:
-            if value.startswith(b"{"):
+            value = self.codecs.decode(value)
+
+            if value.startswith((b"{", INDEXED_BLOB_MAGIC)):
                 return NodeStorage._decode(self, value, subkey=subkey)
 
             if subkey is None:
@@ -34,22 +48,54 @@ class DjangoNodeStorage(NodeStorage):
             logger.exception(e)
             return {}
 
+    def _encode(self, data):
+        # The platform selects the compression dictionary, pick it before
+        # `_encode` consumes the payload.
+        payload = data.get(None)
+        platform = payload.get("platform") if isinstance(payload, dict) else None
+        return self.codecs.encode(NodeStorage._encode(self, data), platform=platform)
+
     def _get_bytes(self, id):
+        # Payloads are returned still encoded, decompression happens in
+        # `_decode`.
         try:
-            data = Node.objects.get(id=id).data
-            return decompress(data)
+            return Node.objects.get(id=id).data
         except Node.DoesNotExist:
             return None
 
     def _get_bytes_multi(self, id_list):
-        return {n.id: decompress(n.data) for n in Node.objects.filter(id__in=id_list)}
+        return {n.id: n.data for n in Node.objects.filter(id__in=id_list)}
 
     def delete_multi(self, id_list):
         Node.objects.filter(id__in=id_list).delete()
         self._delete_cache_items(id_list)
 
     def _set_bytes(self, id, data, ttl=None):
-        create_or_update(Node, id=id, values={"data": compress(data), "timestamp": timezone.now()})
+        create_or_update(Node, id=id, values={"data": data, "timestamp": timezone.now()})
+
+    def _set_bytes_multi(self, items, ttl=None):
+        if not items:
+            return
+
+        timestamp = timezone.now()
+        values = []
+        params = []
+        # Sort ids so concurrent writers always lock rows in the same order.
+        for id in sorted(items):
+            values.append("(%s, %s, %s)")
+            params.extend([id, items[id], timestamp])
+
+        connection = connections[router.db_for_write(Node)]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Node._meta.db_table} (id, data, timestamp)
+                VALUES {", ".join(values)}
+                ON CONFLICT (id) DO UPDATE
+                SET data = EXCLUDED.data, timestamp = EXCLUDED.timestamp
+                """,
+                params,
+            )
 
     def cleanup(self, cutoff_timestamp):
         from sentry.db.deletion import BulkDeleteQuery
@@ -138,6 +138,16 @@ register(
 
 
 register("api.rate-limit.org-create", default=5, flags=FLAG_ALLOW_EMPTY | FLAG_PRIORITIZE_DISK)
+# Number of threads running the independent lookups of serializers, such as
+# the ones of issues, concurrently. The pool is created with the number of
+# threads at the time of first use. Set to 0 to run lookups one after another.
+register("api.serializers.concurrent-loader-workers", default=0, flags=FLAG_PRIORITIZE_DISK)
+# Seconds for which the seen stats of issues are cached and shared by identical
+# queries, such as the ones of users polling the same issue stream. Time ranges
+# are rounded to the bucket size so that polls of relative ranges match.
+# Set the TTL to 0 to disable the cache.
+register("api.serializers.seen-stats-cache-ttl", default=0, flags=FLAG_PRIORITIZE_DISK)
+register("api.serializers.seen-stats-cache-bucket", default=60, flags=FLAG_PRIORITIZE_DISK)
 
 # Beacon
 register("beacon.anonymous", type=Bool, flags=FLAG_REQUIRED)
@@ -265,6 +275,12 @@ register("snuba.search.chunk-growth-rate", default=1.5)
 register("snuba.search.max-chunk-size", default=2000)
 register("snuba.search.max-total-chunk-time-seconds", default=30.0)
 register("snuba.search.hits-sample-size", default=100)
+# Size the chunks of Snuba results that are post-filtered in Postgres by the
+# share of results that passed the filters in earlier searches of the project.
+register("snuba.search.adaptive-chunk-size", type=Bool, default=False)
+register("snuba.search.chunk-hit-ratio-ttl", default=60 * 60)
+# Query the next chunk of Snuba results while the current one is post-filtered.
+register("snuba.search.prefetch-chunks", type=Bool, default=False)
 register("snuba.track-outcomes-sample-rate", default=0.0)
 
 # The percentage of tagkeys that we want to cache. Set to 1.0 in order to cache everything, <=0.0 to stop caching
@@ -328,6 +344,28 @@ register("outcomes.tsdb-in-consumer-sample-rate", default=0.0)  # unused
 register("nodedata.cache-sample-rate", default=0.0, flags=FLAG_PRIORITIZE_DISK)
 register("nodedata.cache-on-save", default=False, flags=FLAG_PRIORITIZE_DISK)
 
+# Write nodes with subkeys in the subkey-indexed blob format
+register("nodestore.write-indexed-subkeys", default=False, flags=FLAG_PRIORITIZE_DISK)
+# Codec used by the Django nodestore backend to compress new nodes ("zlib" or "zstd")
+register("nodestore.codec", default="zlib", flags=FLAG_PRIORITIZE_DISK)
+# Mapping of event platform to the id of the trained zstd dictionary used for it
+register("nodestore.zstd-dictionaries", type=Dict, default={}, flags=FLAG_PRIORITIZE_DISK)
+
+# Flush buffered counters in batches, with one UPDATE statement per batch for groups
+register("buffer.bulk-flush.enabled", default=False, flags=FLAG_PRIORITIZE_DISK)
+# Number of buffer keys processed by one task when bulk flushing is enabled
+register("buffer.bulk-flush.batch-size", default=100, flags=FLAG_PRIORITIZE_DISK)
+
+# Write buffered filters and values with the compact msgpack codec instead of pickle
+register("buffer.compact-codec.enabled", default=False, flags=FLAG_PRIORITIZE_DISK)
+
+# Seconds for which results of event frequency rule conditions are shared between events of
+# the same group. 0 disables the shared cache.
+register("rules.event-frequency.cache-ttl", default=0, flags=FLAG_PRIORITIZE_DISK)
+
+# Cluster transaction names incrementally, on top of a stored snapshot of the tree per project
+register("txnames.clusterer.incremental", default=False, flags=FLAG_PRIORITIZE_DISK)
+
 # Use nodestore for eventstore.get_events
 register("eventstore.use-nodestore", default=False, flags=FLAG_PRIORITIZE_DISK)
 
@@ -352,6 +390,15 @@ register("processing.can-use-scrubbers", default=True)
 # Set this value of the fraction of projects that you want to use it for.
 register("processing.sourcemapcache-processor", default=0.0)  # unused
 
+# Number of threads used to fetch the minified sources and source maps of a
+# JavaScript event concurrently. Set to 1 to fetch them one after another.
+register("processing.javascript-fetch-concurrency", default=1, flags=FLAG_PRIORITIZE_DISK)
+
+# Approximate number of bytes of parsed JavaScript sources and source maps kept
+# in memory by each processing process, to be reused by later events of the
+# same release. Set to 0 to disable the cache.
+register("processing.javascript-view-cache-size", default=0, flags=FLAG_PRIORITIZE_DISK)
+
 # Killswitch for sending internal errors to the internal project or
 # `SENTRY_SDK_CONFIG.relay_dsn`. Set to `0` to only send to
 # `SENTRY_SDK_CONFIG.dsn` (the "upstream transport") and nothing else.
@@ -373,6 +420,10 @@ register("store.reprocessing-force-disable", default=False)
 
 register("store.race-free-group-creation-force-disable", default=False)
 
+# Process-local cache of grouphash to group mappings in front of GroupHash lookups
+register("store.grouphash-cache.enabled", default=False, flags=FLAG_PRIORITIZE_DISK)
+register("store.grouphash-cache.ttl", default=300, flags=FLAG_PRIORITIZE_DISK)
+
 
 # ## sentry.killswitches
 #
@@ -409,6 +460,10 @@ register("processing.release-archive-min-files", default=10)
 # Try to read release artifacts from zip archives
 register("processing.use-release-archives-sample-rate", default=0.0)  # unused
 
+# Number of seconds lookups of release artifact indexes are shared in-process,
+# instead of loading the index again for every URL. Set to 0 to disable.
+register("processing.artifact-index-lookup-ttl", default=0, flags=FLAG_PRIORITIZE_DISK)
+
 # All Relay options (statically authenticated Relays can be registered here)
 register("relay.static_auth", default={}, flags=FLAG_NOSTORE)
 
@@ -552,6 +607,13 @@ register("sentry-metrics.cardinality-limiter.limits.releasehealth.per-org", defa
 register("sentry-metrics.cardinality-limiter.orgs-rollout-rate", default=0.0)
 register("sentry-metrics.cardinality-limiter-rh.orgs-rollout-rate", default=0.0)
 
+# Number of strings cached in-process by each string indexer, in front of the
+# shared indexer cache. Set to 0 to disable the in-process cache.
+register("sentry-metrics.indexer.local-cache-size", default=0, flags=FLAG_PRIORITIZE_DISK)
+# Base TTL of strings in the in-process indexer cache, in seconds. Up to 25%
+# jitter is added so that entries cached together do not expire together.
+register("sentry-metrics.indexer.local-cache-ttl", default=600, flags=FLAG_PRIORITIZE_DISK)
+
 # Flag to determine whether abnormal_mechanism tag should be extracted
 register("sentry-metrics.releasehealth.abnormal-mechanism-extraction-rate", default=0.0)
 
@@ -5,13 +5,13 @@ import contextlib
 import logging
 import re
 from datetime import datetime, timedelta
-from typing import Any, Dict, Mapping, Tuple
+from typing import Any, Mapping, MutableMapping, Optional, Tuple
 
 from django import forms
 from django.core.cache import cache
 from django.utils import timezone
 
-from sentry import release_health, tsdb
+from sentry import options, release_health, tsdb
 from sentry.eventstore.models import GroupEvent
 from sentry.issues.constants import get_issue_tsdb_group_model, get_issue_tsdb_user_group_model
 from sentry.receivers.rules import DEFAULT_RULE_LABEL
@@ -20,9 +20,11 @@ from sentry.rules.conditions.base import EventCondition
 from sentry.types.condition_activity import (
     FREQUENCY_CONDITION_BUCKET_SIZE,
     ConditionActivity,
-    round_to_five_minute,
+    FrequencyBuckets,
 )
 from sentry.utils import metrics
+from sentry.utils.dates import to_timestamp
+from sentry.utils.hashlib import hash_values
 from sentry.utils.snuba import options_override
 
 standard_intervals = {
@@ -49,6 +51,9 @@ comparison_types = {
     COMPARISON_TYPE_PERCENT: COMPARISON_TYPE_PERCENT,
 }
 
+# (condition id, group id, environment id, duration, offset from now) -> result
+QueryCache = MutableMapping[Tuple[str, int, Optional[int], int, int], int]
+
 
 class EventFrequencyForm(forms.Form):  # type: ignore
     intervals = standard_intervals
@@ -95,6 +100,8 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self.tsdb = kwargs.pop("tsdb", tsdb)
+        # Shared by all conditions evaluated for the same event, see `RuleProcessor`.
+        self.query_cache: QueryCache | None = kwargs.pop("query_cache", None)
         self.form_fields = {
             "value": {"type": "number", "placeholder": 100},
             "interval": {
@@ -131,7 +138,7 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
         return current_value > value
 
     def passes_activity_frequency(
-        self, activity: ConditionActivity, buckets: Dict[datetime, int]
+        self, activity: ConditionActivity, buckets: FrequencyBuckets
     ) -> bool:
         interval, value = self._get_options()
         if not (interval and value is not None):
@@ -146,15 +153,13 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
                 value *= int(FREQUENCY_CONDITION_BUCKET_SIZE / interval_delta)
             interval_delta = FREQUENCY_CONDITION_BUCKET_SIZE
 
-        result = bucket_count(activity.timestamp - interval_delta, activity.timestamp, buckets)
+        result = buckets.count(activity.timestamp - interval_delta, activity.timestamp)
 
         if comparison_type == COMPARISON_TYPE_PERCENT:
             comparison_interval = comparison_intervals[self.get_option("comparisonInterval")][1]
             comparison_end = activity.timestamp - comparison_interval
 
-            comparison_result = bucket_count(
-                comparison_end - interval_delta, comparison_end, buckets
-            )
+            comparison_result = buckets.count(comparison_end - interval_delta, comparison_end)
             result = percent_increase(result, comparison_result)
 
         return result > value
@@ -188,21 +193,66 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
         if duration >= timedelta(hours=1):
             option_override_cm = options_override({"consistent": False})
         with option_override_cm:
-            result: int = self.query(event, end - duration, end, environment_id=environment_id)
+            result: int = self.cached_query(event, end, duration, timedelta(), environment_id)
             comparison_type = self.get_option("comparisonType", COMPARISON_TYPE_COUNT)
             if comparison_type == COMPARISON_TYPE_PERCENT:
                 comparison_interval = comparison_intervals[self.get_option("comparisonInterval")][1]
-                comparison_end = end - comparison_interval
-                # TODO: Figure out if there's a way we can do this less frequently. All queries are
-                # automatically cached for 10s. We could consider trying to cache this and the main
-                # query for 20s to reduce the load.
-                comparison_result = self.query(
-                    event, comparison_end - duration, comparison_end, environment_id=environment_id
+                comparison_result = self.cached_query(
+                    event, end, duration, comparison_interval, environment_id
                 )
                 result = percent_increase(result, comparison_result)
 
         return result
 
+    def cached_query(
+        self,
+        event: GroupEvent,
+        end: datetime,
+        duration: timedelta,
+        offset: timedelta,
+        environment_id: str,
+    ) -> int:
+        """
+        Queries the window of `duration` that ends `offset` before `end`.
+
+        Results are shared with all conditions of the same kind that are
+        evaluated for the event, and for `rules.event-frequency.cache-ttl`
+        seconds with all other events of the group.
+        """
+        key = (
+            self.id,
+            event.group_id,
+            environment_id,
+            int(duration.total_seconds()),
+            int(offset.total_seconds()),
+        )
+        if self.query_cache is not None and key in self.query_cache:
+            metrics.incr("rules.conditions.query_cache", tags={"result": "hit", "cache": "local"})
+            return self.query_cache[key]
+
+        end = end - offset
+        start = end - duration
+        ttl = options.get("rules.event-frequency.cache-ttl")
+        if ttl:
+            # All windows ending within the same bucket share a result.
+            bucket = int(to_timestamp(end)) // ttl
+            cache_key = "r.c.efq:{}".format(hash_values([*key, bucket]))
+            result = cache.get(cache_key)
+            if result is None:
+                metrics.incr("rules.conditions.query_cache", tags={"result": "miss"})
+                result = self.query(event, start, end, environment_id=environment_id)
+                cache.set(cache_key, result, ttl)
+            else:
+                metrics.incr(
+                    "rules.conditions.query_cache", tags={"result": "hit", "cache": "shared"}
+                )
+        else:
+            result = self.query(event, start, end, environment_id=environment_id)
+
+        if self.query_cache is not None:
+            self.query_cache[key] = result
+        return result
+
     @property
     def is_guessed_to_be_created_on_project_creation(self) -> bool:
         """
@@ -381,18 +431,11 @@ class EventFrequencyPercentCondition(BaseEventFrequencyCondition):
         return 0
 
     def passes_activity_frequency(
-        self, activity: ConditionActivity, buckets: Dict[datetime, int]
+        self, activity: ConditionActivity, buckets: FrequencyBuckets
     ) -> bool:
         raise NotImplementedError
 
 
-def bucket_count(start: datetime, end: datetime, buckets: Dict[datetime, int]) -> int:
-    rounded_end = round_to_five_minute(end)
-    rounded_start = round_to_five_minute(start)
-    count = buckets.get(rounded_end, 0) - buckets.get(rounded_start, 0)
-    return count
-
-
 def percent_increase(result: int, comparison_result: int) -> int:
     return (
         int(max(0, ((result - comparison_result) / comparison_result * 100)))
@@ -21,7 +21,7 @@ from sentry.types.condition_activity import (
     FREQUENCY_CONDITION_BUCKET_SIZE,
     ConditionActivity,
     ConditionActivityType,
-    round_to_five_minute,
+    FrequencyBuckets,
 )
 from sentry.utils.snuba import SnubaQueryParams, bulk_raw_query, parse_snuba_datetime, raw_query
 
@@ -424,7 +424,7 @@ def apply_frequency_conditions(
                     # to base our frequency condition queries off of. Instead, we take the first frequency condition and
                     # create the initial activities from that
                     init_activities_from_freq_cond = skip_first = True
-                    for bucket_time in buckets.keys():
+                    for bucket_time in buckets:
                         activity = ConditionActivity(
                             group,
                             ConditionActivityType.FREQUENCY_CONDITION,
@@ -469,7 +469,7 @@ def apply_frequency_conditions(
                 except NotImplementedError:
                     raise PreviewException
                 for condition in conditions:
-                    for bucket_time in buckets.keys():
+                    for bucket_time in buckets:
                         activity = ConditionActivity(
                             group,
                             ConditionActivityType.FREQUENCY_CONDITION,
@@ -499,12 +499,12 @@ def get_frequency_buckets(
     group_id: int,
     dataset: Dataset,
     aggregate: Tuple[str, str],
-) -> Dict[datetime, int]:
+) -> FrequencyBuckets:
     """
     Puts the events of a group into buckets, and returns the bucket counts.
     """
     if dataset not in UPDATE_KWARGS_FOR_GROUP:
-        return {}
+        return FrequencyBuckets(start, end, [])
 
     kwargs = UPDATE_KWARGS_FOR_GROUP[dataset](
         group_id,
@@ -517,7 +517,7 @@ def get_frequency_buckets(
                 ("toStartOfFiveMinute", "timestamp", "roundedTime"),
                 (*aggregate, "bucketCount"),
             ],
-            "orderby": ["-roundedTime"],
+            "orderby": ["roundedTime"],
             "groupby": ["roundedTime"],
             "selected_columns": ["roundedTime", "bucketCount"],
             "limit": PREVIEW_TIME_RANGE // FREQUENCY_CONDITION_BUCKET_SIZE + 1,  # at most ~4k
@@ -527,22 +527,16 @@ def get_frequency_buckets(
         **kwargs, use_cache=True, referrer="preview.get_frequency_buckets"
     ).get("data", [])
 
-    for bucket in bucket_counts:
-        bucket["roundedTime"] = parse_snuba_datetime(bucket["roundedTime"])
-
-    rounded_time = round_to_five_minute(start)
-    rounded_end = round_to_five_minute(end)
-    cumulative_sum = 0
-    buckets = {}
-    # the query result only contains buckets that have a positive count
-    # here we fill in the empty buckets and accumulate the sum
-    while rounded_time <= rounded_end:
-        if bucket_counts and bucket_counts[-1]["roundedTime"] == rounded_time:
-            cumulative_sum += bucket_counts.pop()["bucketCount"]
-        buckets[rounded_time] = cumulative_sum
-        rounded_time += FREQUENCY_CONDITION_BUCKET_SIZE
-
-    return buckets
+    # the query result only contains buckets that have a positive count, which
+    # is all the index needs
+    return FrequencyBuckets(
+        start,
+        end,
+        [
+            (parse_snuba_datetime(bucket["roundedTime"]), bucket["bucketCount"])
+            for bucket in bucket_counts
+        ],
+    )
 
 
 class PreviewException(Exception):
@@ -12,6 +12,7 @@ from sentry import analytics
 from sentry.eventstore.models import GroupEvent
 from sentry.models import GroupRuleStatus, Rule
 from sentry.rules import EventState, history, rules
+from sentry.rules.conditions.event_frequency import BaseEventFrequencyCondition, QueryCache
 from sentry.types.rules import RuleFuture
 from sentry.utils.hashlib import hash_values
 from sentry.utils.safe import safe_execute
@@ -52,6 +53,8 @@ class RuleProcessor:
         self.grouped_futures: MutableMapping[
             str, Tuple[Callable[[GroupEvent, Sequence[RuleFuture]], None], List[RuleFuture]]
         ] = {}
+        # Rules that share a frequency condition only query it once.
+        self.frequency_query_cache: QueryCache = {}
 
     def get_rules(self) -> Sequence[Rule]:
         """Get all of the rules for this project from the DB (or cache)."""
@@ -127,7 +130,11 @@ class RuleProcessor:
             self.logger.warning("Unregistered condition %r", condition["id"])
             return None
 
-        condition_inst = condition_cls(self.project, data=condition, rule=rule)
+        kwargs: MutableMapping[str, Any] = {}
+        if issubclass(condition_cls, BaseEventFrequencyCondition):
+            kwargs["query_cache"] = self.frequency_query_cache
+
+        condition_inst = condition_cls(self.project, data=condition, rule=rule, **kwargs)
         passes: bool = safe_execute(
             condition_inst.passes, self.event, state, _with_transaction=False
         )
@@ -261,6 +268,7 @@ class RuleProcessor:
             return {}.values()
 
         self.grouped_futures.clear()
+        self.frequency_query_cache.clear()
         rules = self.get_rules()
         rule_statuses = self.bulk_get_rule_status(rules)
         for rule in rules:
@@ -539,6 +539,13 @@ def batching_kafka_options(
     default=None,
     help="Thread pool size (only utilitized for message types that support concurrent processing)",
 )
+@click.option(
+    "--partition-concurrency",
+    type=int,
+    default=None,
+    help="Process messages of independent events concurrently on a thread pool of this size. "
+    "Messages of the same event (e.g. attachments) are still processed in order.",
+)
 @configuration
 def ingest_consumer(consumer_types, all_consumer_types, **options):
     """
@@ -567,10 +574,21 @@ def ingest_consumer(consumer_types, all_consumer_types, **options):
     else:
         executor = None
 
+    partition_concurrency = options.pop("partition_concurrency", None)
+    if partition_concurrency is not None:
+        partition_executor = ThreadPoolExecutor(partition_concurrency)
+    else:
+        partition_executor = None
+
     with metrics.global_tags(
         ingest_consumer_types=",".join(sorted(consumer_types)), _all_threads=True
     ):
-        consumer = get_ingest_consumer(consumer_types=consumer_types, executor=executor, **options)
+        consumer = get_ingest_consumer(
+            consumer_types=consumer_types,
+            executor=executor,
+            partition_executor=partition_executor,
+            **options,
+        )
         run_processor_with_signals(consumer)
 
 
@@ -0,0 +1,14 @@
+-- Claim buffered counters for processing: read and delete every key and
+-- remove it from its pending set, all in one atomic step.
+-- KEYS: the buffer keys to claim
+-- ARGV: the pending set of each key, in the same order as KEYS
+assert(#KEYS == #ARGV, "provide exactly one pending key per key")
+
+local results = {}
+for i, key in ipairs(KEYS) do
+    results[i] = redis.call("HGETALL", key)
+    redis.call("DEL", key)
+    redis.call("ZREM", ARGV[i], key)
+end
+
+return results
@@ -605,31 +605,63 @@ local function search(configuration, parameters, limit)
 end
 
 
+local function record(configuration, key, signatures)
+    return table_imap(
+        signatures,
+        function (signature)
+            set_frequencies(configuration, signature.index, key, signature.frequencies)
+            for band, buckets in ipairs(signature.frequencies) do
+                for bucket in pairs(buckets) do
+                    get_bucket_membership_set(configuration, signature.index, band, bucket):add(key)
+                end
+            end
+        end
+    )
+end
+
+
 -- Command Parsing
 
+local function signature_argument_parser(configuration)
+    return object_argument_parser({
+        {"index", argument_parser(validate_value)},
+        {"frequencies", frequencies_argument_parser(configuration)},
+    })
+end
+
 local commands = {
     RECORD = function (configuration, cursor, arguments)
         local cursor, key, signatures = multiple_argument_parser(
             argument_parser(validate_value),
-            variadic_argument_parser(
-                object_argument_parser({
-                    {"index", argument_parser(validate_value)},
-                    {"frequencies", frequencies_argument_parser(configuration)},
-                })
-            )
+            variadic_argument_parser(signature_argument_parser(configuration))
         )(cursor, arguments)
 
-        return table_imap(
-            signatures,
-            function (signature)
-                set_frequencies(configuration, signature.index, key, signature.frequencies)
-                for band, buckets in ipairs(signature.frequencies) do
-                    for bucket in pairs(buckets) do
-                        get_bucket_membership_set(configuration, signature.index, band, bucket):add(key)
-                    end
-                end
+        return record(configuration, key, signatures)
+    end,
+    RECORD_MANY = function (configuration, cursor, arguments)
+        --[[
+        Record multiple keys within the scope. Each record consists of its own
+        timestamp, the key, the number of signatures, and the signatures in the
+        same format as used by RECORD.
+        ]]--
+        local cursor, records = variadic_argument_parser(
+            object_argument_parser({
+                {"timestamp", argument_parser(validate_number)},
+                {"key", argument_parser(validate_value)},
+                {"signatures", repeated_argument_parser(signature_argument_parser(configuration))},
+            })
+        )(cursor, arguments)
+
+        local timestamp = configuration.timestamp
+        local results = table_imap(
+            records,
+            function (r)
+                configuration.timestamp = r.timestamp
+                return record(configuration, r.key, r.signatures)
             end
         )
+        configuration.timestamp = timestamp
+        return results
     end,
     CLASSIFY = function (configuration, cursor, arguments)
         local cursor, limit, parameters = multiple_argument_parser(
@@ -2,14 +2,18 @@ from __future__ import annotations
 
 import functools
 import logging
+import math
 import time
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import replace
 from datetime import datetime, timedelta
 from hashlib import md5
 from typing import Any, List, Mapping, Optional, Sequence, Set, Tuple, cast
 
 import sentry_sdk
+from django.core.cache import cache
+from django.db import close_old_connections
 from django.db.models import Q
 from django.utils import timezone
 from snuba_sdk import (
@@ -52,6 +56,8 @@ from sentry.utils import json, metrics, snuba
 from sentry.utils.cursors import Cursor, CursorResult
 from sentry.utils.snuba import SnubaQueryParams, aliased_query_params, bulk_raw_query
 
+_chunk_prefetch_pool = ThreadPoolExecutor(max_workers=10)
+
 
 def get_search_filter(
     search_filters: Optional[Sequence[SearchFilter]], name: str, operator: str
@@ -415,6 +421,99 @@ def trend_aggregation(start: datetime, end: datetime) -> Sequence[str]:
     ]
 
 
+class SearchChunkPlanner:
+    """
+    Picks the sizes of the chunks of Snuba results that are post-filtered in
+    Postgres.
+
+    Without history, chunks start at the limit of the search and grow by
+    ``snuba.search.chunk-growth-rate`` each time. With
+    ``snuba.search.adaptive-chunk-size``, the share of Snuba results that
+    passed the Postgres filters (the hit ratio) is remembered per project, and
+    chunks are sized to contain the missing results at the hit ratio observed
+    so far in the search, or in earlier searches of the projects. Searches with
+    a low hit ratio thereby need far fewer chunks.
+    """
+
+    # Lower bound of hit ratios, so that chunks of searches that found nothing
+    # remain finite (they are capped by the max chunk size anyway.)
+    MIN_HIT_RATIO = 0.001
+
+    def __init__(self, project_ids: Sequence[int], limit: int, adaptive: bool) -> None:
+        self.project_ids = project_ids
+        self.limit = limit
+        self.adaptive = adaptive
+        self.chunk_growth = options.get("snuba.search.chunk-growth-rate")
+        self.max_chunk_size = options.get("snuba.search.max-chunk-size")
+
+        self.chunk_limit = limit
+        self.scanned = 0
+        self.hits = 0
+        self.history: Mapping[str, float] = {}
+        if adaptive:
+            self.history = cache.get_many([self._make_key(p) for p in project_ids])
+
+    def _make_key(self, project_id: int) -> str:
+        return f"search:chunk-hit-ratio:{project_id}"
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        if self.scanned:
+            return max(self.hits / self.scanned, self.MIN_HIT_RATIO)
+        elif self.history:
+            # Be conservative with searches across several projects and
+            # assume they are as sparse as the sparsest project.
+            return min(self.history.values())
+        return None
+
+    def next_chunk_limit(self, num_results: int) -> int:
+        """
+        Size of the next chunk, given the number of results found so far.
+        """
+        chunk_limit = int(self.chunk_limit * self.chunk_growth)
+
+        hit_ratio = self.hit_ratio if self.adaptive else None
+        if hit_ratio is not None:
+            missing = max(self.limit - num_results, 1)
+            estimate = math.ceil(missing / hit_ratio * self.chunk_growth)
+            chunk_limit = max(chunk_limit, estimate)
+
+        self.chunk_limit = min(chunk_limit, self.max_chunk_size)
+        return self.chunk_limit
+
+    def record(self, scanned: int, hits: int) -> None:
+        self.scanned += scanned
+        self.hits += hits
+
+    def save(self) -> None:
+        """
+        Remember the hit ratio of the search for later searches of its projects.
+        """
+        if not self.adaptive or not self.scanned:
+            return
+
+        hit_ratio = max(self.hits / self.scanned, self.MIN_HIT_RATIO)
+        ratios = {}
+        for project_id in self.project_ids:
+            key = self._make_key(project_id)
+            previous = self.history.get(key)
+            # Average with earlier searches, as the ratio also depends on the
+            # filters of the search.
+            ratios[key] = hit_ratio if previous is None else (previous + hit_ratio) / 2
+        cache.set_many(ratios, options.get("snuba.search.chunk-hit-ratio-ttl"))
+
+
+def _prefetch_chunk(search_chunk: Any, thread_hub: sentry_sdk.Hub, **kwargs: Any) -> Any:
+    # The threads of the pool keep their database connections between chunks,
+    # and recycle them the same way as they are at the start and end of requests.
+    close_old_connections()
+    try:
+        with thread_hub:
+            return search_chunk(**kwargs)
+    finally:
+        close_old_connections()
+
+
 class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
     ISSUE_FIELD_NAME = "group_id"
 
@@ -580,9 +679,6 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             group_ids = []
 
         sort_field = self.sort_strategies[sort_by]
-        chunk_growth = options.get("snuba.search.chunk-growth-rate")
-        max_chunk_size = options.get("snuba.search.max-chunk-size")
-        chunk_limit = limit
         offset = 0
         num_chunks = 0
         hits = self.calculate_hits(
@@ -613,6 +709,29 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
         time_start = time.time()
         more_results = False
 
+        # Hit ratios and prefetching only apply to post-filtering, since
+        # pre-filtered candidates are always searched in a single chunk.
+        planner = SearchChunkPlanner(
+            [p.id for p in projects],
+            limit,
+            adaptive=not group_ids and options.get("snuba.search.adaptive-chunk-size"),
+        )
+        prefetch = not group_ids and options.get("snuba.search.prefetch-chunks")
+        # (chunk_limit, future) of the chunk queried ahead of time, if any
+        prefetched: Optional[Tuple[int, Future[Tuple[List[Tuple[int, Any]], int]]]] = None
+        search_chunk = functools.partial(
+            self.snuba_search,
+            start=start,
+            end=end,
+            project_ids=[p.id for p in projects],
+            environment_ids=environments and [environment.id for environment in environments],
+            organization=projects[0].organization,
+            sort_field=sort_field,
+            cursor=cursor,
+            group_ids=group_ids,
+            search_filters=search_filters,
+        )
+
         # Do smaller searches in chunks until we have enough results
         # to answer the query (or hit the end of possible results). We do
         # this because a common case for search is to return 100 groups
@@ -622,26 +741,19 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
         while (time.time() - time_start) < max_time:
             num_chunks += 1
 
-            # grow the chunk size on each iteration to account for huge projects
-            # and weird queries, up to a max size
-            chunk_limit = min(int(chunk_limit * chunk_growth), max_chunk_size)
-            # but if we have group_ids always query for at least that many items
-            chunk_limit = max(chunk_limit, len(group_ids))
-
-            # {group_id: group_score, ...}
-            snuba_groups, total = self.snuba_search(
-                start=start,
-                end=end,
-                project_ids=[p.id for p in projects],
-                environment_ids=environments and [environment.id for environment in environments],
-                organization=projects[0].organization,
-                sort_field=sort_field,
-                cursor=cursor,
-                group_ids=group_ids,
-                limit=chunk_limit,
-                offset=offset,
-                search_filters=search_filters,
-            )
+            if prefetched is not None:
+                chunk_limit, future = prefetched
+                prefetched = None
+                snuba_groups, total = future.result()
+            else:
+                # grow the chunk size on each iteration to account for huge projects
+                # and weird queries, up to a max size
+                chunk_limit = planner.next_chunk_limit(len(result_groups))
+                # but if we have group_ids always query for at least that many items
+                chunk_limit = max(chunk_limit, len(group_ids))
+
+                # {group_id: group_score, ...}
+                snuba_groups, total = search_chunk(limit=chunk_limit, offset=offset)
             metrics.timing("snuba.search.num_snuba_results", len(snuba_groups))
             count = len(snuba_groups)
             more_results = count >= limit and (offset + limit) < total
@@ -650,6 +762,21 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             if not snuba_groups:
                 break
 
+            if prefetch and more_results:
+                # Query the next chunk while this one is being post-filtered.
+                # It is wasted if this chunk turns out to be enough.
+                next_chunk_limit = planner.next_chunk_limit(len(result_groups))
+                prefetched = (
+                    next_chunk_limit,
+                    _chunk_prefetch_pool.submit(
+                        _prefetch_chunk,
+                        search_chunk,
+                        sentry_sdk.Hub(sentry_sdk.Hub.current),
+                        limit=next_chunk_limit,
+                        offset=offset,
+                    ),
+                )
+
             if group_ids:
                 # pre-filtered candidates were passed down to Snuba, so we're
                 # finished with filtering and these are the only results. Note
@@ -679,6 +806,8 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
                     result_group_ids.add(group_id)
                     result_groups.append((group_id, group_score))
 
+                planner.record(len(snuba_groups), len(filtered_group_ids))
+
             # break the query loop for one of three reasons:
             # * we started with Postgres candidates and so only do one Snuba query max
             # * the paginator is returning enough results to satisfy the query (>= the limit)
@@ -692,6 +821,11 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             if group_ids or len(paginator_results.results) >= limit or not more_results:
                 break
 
+        if prefetched is not None:
+            prefetched[1].cancel()
+            metrics.incr("snuba.search.prefetched_chunk_unused", skip_internal=False)
+        planner.save()
+
         # HACK: We're using the SequencePaginator to mask the complexities of going
         # back and forth between two databases. This causes a problem with pagination
         # because we're 'lying' to the SequencePaginator (it thinks it has the entire
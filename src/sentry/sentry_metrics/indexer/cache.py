@@ -1,10 +1,11 @@
 import logging
 import random
-from typing import Mapping, MutableMapping, Optional, Sequence, Set
+from typing import Mapping, MutableMapping, Optional, Sequence, Set, Tuple
 
 from django.conf import settings
 from django.core.cache import caches
 
+from sentry import options
 from sentry.sentry_metrics.configuration import UseCaseKey
 from sentry.sentry_metrics.indexer.base import (
     FetchType,
@@ -15,27 +16,65 @@ from sentry.sentry_metrics.indexer.base import (
 )
 from sentry.utils import metrics
 from sentry.utils.hashlib import md5_text
+from sentry.utils.lru import LRUCache
 
 logger = logging.getLogger(__name__)
 
 _INDEXER_CACHE_METRIC = "sentry_metrics.indexer.memcache"
 # only used to compare to the older version of the PGIndexer
 _INDEXER_CACHE_FETCH_METRIC = "sentry_metrics.indexer.memcache.fetch"
+_INDEXER_CACHE_TIER_METRIC = "sentry_metrics.indexer.cache_tier"
+
+
+def _jittered(ttl: int) -> int:
+    # introduce jitter in the cache_ttl so that when we have large
+    # amount of new keys written into the cache, they don't expire all at once
+    jitter = random.uniform(0, 0.25) * ttl
+    return int(ttl + jitter)
 
 
 class StringIndexerCache:
+    """
+    Cache of indexed strings, stored in the Django cache named ``cache_name``.
+
+    Optionally, strings are also cached in-process in front of the shared
+    cache, see the ``sentry-metrics.indexer.local-cache-size`` option. Since
+    the ID of a string never changes once it has been indexed, the local tier
+    is only ever stale for deleted strings, which expire from other processes
+    with the TTL of the local tier.
+    """
+
     def __init__(self, cache_name: str, partition_key: str):
         self.version = 1
         self.cache = caches[cache_name]
         self.partition_key = partition_key
+        self.local: LRUCache[Tuple[str, str], int] = LRUCache(maxsize=0)
 
     @property
     def randomized_ttl(self) -> int:
-        # introduce jitter in the cache_ttl so that when we have large
-        # amount of new keys written into the cache, they don't expire all at once
-        cache_ttl = settings.SENTRY_METRICS_INDEXER_CACHE_TTL
-        jitter = random.uniform(0, 0.25) * cache_ttl
-        return int(cache_ttl + jitter)
+        return _jittered(settings.SENTRY_METRICS_INDEXER_CACHE_TTL)
+
+    @property
+    def local_randomized_ttl(self) -> int:
+        return _jittered(options.get("sentry-metrics.indexer.local-cache-ttl"))
+
+    def _local_cache_enabled(self) -> bool:
+        # The size is read on every access, so that the local tier can be
+        # resized or disabled at runtime.
+        self.local.maxsize = options.get("sentry-metrics.indexer.local-cache-size")
+        if not self.local.maxsize:
+            if len(self.local):
+                self.local.clear()
+            return False
+        return True
+
+    def _record_tier_metrics(self, tier: str, hits: int, misses: int) -> None:
+        metrics.incr(
+            _INDEXER_CACHE_TIER_METRIC, tags={"tier": tier, "cache_hit": "true"}, amount=hits
+        )
+        metrics.incr(
+            _INDEXER_CACHE_TIER_METRIC, tags={"tier": tier, "cache_hit": "false"}, amount=misses
+        )
 
     def make_cache_key(self, key: str, cache_namespace: str) -> str:
         hashed = md5_text(key).hexdigest()
@@ -60,9 +99,21 @@ class StringIndexerCache:
         return formatted
 
     def get(self, key: str, cache_namespace: str) -> int:
+        local_enabled = self._local_cache_enabled()
+        if local_enabled:
+            local_result = self.local.get((cache_namespace, key))
+            self._record_tier_metrics(
+                "local", int(local_result is not None), int(local_result is None)
+            )
+            if local_result is not None:
+                return local_result
+
         result: int = self.cache.get(
             self.make_cache_key(key, cache_namespace), version=self.version
         )
+        self._record_tier_metrics("memcache", int(result is not None), int(result is None))
+        if local_enabled and result is not None:
+            self.local.set((cache_namespace, key), result, ttl=self.local_randomized_ttl)
         return result
 
     def set(self, key: str, value: int, cache_namespace: str) -> None:
@@ -72,15 +123,40 @@ class StringIndexerCache:
             timeout=self.randomized_ttl,
             version=self.version,
         )
+        if self._local_cache_enabled():
+            self.local.set((cache_namespace, key), value, ttl=self.local_randomized_ttl)
 
     def get_many(
         self, keys: Sequence[str], cache_namespace: str
     ) -> MutableMapping[str, Optional[int]]:
+        local_results: MutableMapping[str, Optional[int]] = {}
+        local_enabled = self._local_cache_enabled()
+        if local_enabled:
+            for key in keys:
+                local_result = self.local.get((cache_namespace, key))
+                if local_result is not None:
+                    local_results[key] = local_result
+            self._record_tier_metrics("local", len(local_results), len(keys) - len(local_results))
+            if len(local_results) == len(keys):
+                return local_results
+            keys = [key for key in keys if key not in local_results]
+
         cache_keys = {self.make_cache_key(key, cache_namespace): key for key in keys}
         results: Mapping[str, Optional[int]] = self.cache.get_many(
             cache_keys.keys(), version=self.version
         )
-        return self._format_results(keys, results, cache_namespace)
+        formatted = self._format_results(keys, results, cache_namespace)
+        memcache_hits = sum(1 for value in formatted.values() if value is not None)
+        self._record_tier_metrics("memcache", memcache_hits, len(formatted) - memcache_hits)
+
+        if local_enabled:
+            ttl = self.local_randomized_ttl
+            for key, value in formatted.items():
+                if value is not None:
+                    self.local.set((cache_namespace, key), value, ttl=ttl)
+            formatted.update(local_results)
+
+        return formatted
 
     def set_many(self, key_values: Mapping[str, int], cache_namespace: str) -> None:
         cache_key_values = {
@@ -88,13 +164,21 @@ class StringIndexerCache:
         }
         self.cache.set_many(cache_key_values, timeout=self.randomized_ttl, version=self.version)
 
+        if self._local_cache_enabled():
+            ttl = self.local_randomized_ttl
+            for key, value in key_values.items():
+                self.local.set((cache_namespace, key), value, ttl=ttl)
+
     def delete(self, key: str, cache_namespace: str) -> None:
         cache_key = self.make_cache_key(key, cache_namespace)
         self.cache.delete(cache_key, version=self.version)
+        self.local.delete((cache_namespace, key))
 
     def delete_many(self, keys: Sequence[str], cache_namespace: str) -> None:
         cache_keys = [self.make_cache_key(key, cache_namespace) for key in keys]
         self.cache.delete_many(cache_keys, version=self.version)
+        for key in keys:
+            self.local.delete((cache_namespace, key))
 
 
 class CachingIndexer(StringIndexer):
@@ -16,7 +16,7 @@ from sentry.similarity.features import (
     get_application_chunks,
 )
 from sentry.similarity.featuresv2 import GroupingBasedFeatureSet
-from sentry.similarity.signatures import MinHashSignatureBuilder
+from sentry.similarity.signatures import MinHashSignatureBuilder, VectorizedMinHashSignatureBuilder
 from sentry.utils import redis
 from sentry.utils.datastructures import BidirectionalMapping
 from sentry.utils.iterators import shingle
@@ -69,9 +69,15 @@ def _make_index_backend(cluster, namespace="sim:1"):
             logger.info(f"No redis cluster provided for similarity, using {index!r}.")
             return index
 
+    if getattr(settings, "SENTRY_SIMILARITY_VECTORIZED_SIGNATURES", False):
+        signature_builder = VectorizedMinHashSignatureBuilder(16, 0xFFFF)
+        namespace = f"{namespace}:vectorized"
+    else:
+        signature_builder = MinHashSignatureBuilder(16, 0xFFFF)
+
     return MetricsWrapper(
         RedisScriptMinHashIndexBackend(
-            cluster, namespace, MinHashSignatureBuilder(16, 0xFFFF), 8, 60 * 60 * 24 * 30, 3, 5000
+            cluster, namespace, signature_builder, 8, 60 * 60 * 24 * 30, 3, 5000
         ),
         scope_tag_name=None,
     )
@@ -136,6 +142,27 @@ def _build_dispatcher(methodname):
     return inner
 
 
+def record_many(events):
+    """
+    Record events of any number of projects and groups. Projects are checked
+    for the similarity feature flags individually.
+    """
+    # TODO: Delete when features2 supersedes features.
+    v1_events = []
+    v2_events = []
+    for event in events:
+        if feature_flags.has("projects:similarity-indexing", event.project):
+            v1_events.append(event)
+        if feature_flags.has("projects:similarity-indexing-v2", event.project):
+            v2_events.append(event)
+
+    if v1_events:
+        features.record_many(v1_events)
+
+    if v2_events:
+        features2.record_many(v2_events)
+
+
 merge = _build_dispatcher("merge")
 record = _build_dispatcher("record")
 delete = _build_dispatcher("delete")
@@ -14,6 +14,10 @@ class AbstractIndexBackend(metaclass=ABCMeta):
     def record(self, scope, key, items, timestamp=None):
         pass
 
+    def record_many(self, requests):
+        for scope, key, items, timestamp in requests:
+            self.record(scope, key, items, timestamp=timestamp)
+
     @abstractmethod
     def merge(self, scope, destination, items, timestamp=None):
         pass
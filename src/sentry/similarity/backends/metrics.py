@@ -22,6 +22,11 @@ class MetricsWrapper(AbstractIndexBackend):
     def record(self, *args, **kwargs):
         return self.__instrumented_method_call("record", *args, **kwargs)
 
+    def record_many(self, requests):
+        # Requests span many scopes, so there is no scope to tag.
+        with timer(self.template.format("record_many")):
+            return self.backend.record_many(requests)
+
     def classify(self, *args, **kwargs):
         return self.__instrumented_method_call("classify", *args, **kwargs)
 
@@ -1,7 +1,9 @@
 import itertools
 import time
+from collections import defaultdict
 
 from django.utils.encoding import force_text
+from rediscluster import RedisCluster
 
 from sentry.similarity.backends.abstract import AbstractIndexBackend
 from sentry.utils.iterators import chunked
@@ -47,6 +49,13 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
         # all redis operations.
         return index(self.cluster, [scope], args)
 
+    def __pipeline(self):
+        # redis-py-cluster does not support running scripts in pipelines, so
+        # scripts are sent one by one there.
+        if isinstance(self.cluster, RedisCluster):
+            return None
+        return self.cluster.pipeline(transaction=False)
+
     def _as_search_result(self, results):
         score_replacements = {
             -1.0: None,  # both items don't have the feature (no comparison)
@@ -142,6 +151,52 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
 
         return self.__index(scope, arguments)
 
+    def record_many(self, requests):
+        """
+        Record keys of many scopes at once. ``requests`` is a sequence of
+        ``(scope, key, items, timestamp)`` tuples.
+
+        All keys of a scope are recorded by a single script invocation, since
+        the scope is the hashtag for all keys the script touches. Invocations
+        for different scopes are pipelined, if the client supports it.
+        """
+        now = int(time.time())
+        scopes = defaultdict(list)
+        for scope, key, items, timestamp in requests:
+            if not items:
+                continue
+
+            record = [timestamp if timestamp is not None else now, key, len(items)]
+            for idx, features in items:
+                record.append(idx)
+                record.extend(self._build_signature_arguments(features))
+            scopes[scope].extend(record)
+
+        if not scopes:
+            return  # nothing to do
+
+        pipeline = self.__pipeline()
+        for scope, records in scopes.items():
+            arguments = [
+                "RECORD_MANY",
+                now,
+                self.namespace,
+                self.bands,
+                self.interval,
+                self.retention,
+                self.candidate_set_limit,
+                scope,
+            ]
+            arguments.extend(records)
+
+            if pipeline is None:
+                self.__index(scope, arguments)
+            else:
+                index(pipeline, [scope], arguments)
+
+        if pipeline is not None:
+            pipeline.execute()
+
     def merge(self, scope, destination, items, timestamp=None):
         if timestamp is None:
             timestamp = int(time.time())
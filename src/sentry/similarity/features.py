@@ -120,26 +120,61 @@ class FeatureSet:
                         self.__get_key(event.group) == key
                     ), "all events must be associated with the same group"
 
-                try:
-                    features = [self.encoder.dumps(feature) for feature in features]
-                except Exception as error:
-                    log = (
-                        logger.debug
-                        if isinstance(error, self.expected_encoding_errors)
-                        else functools.partial(logger.warning, exc_info=True)
-                    )
-                    log(
-                        "Could not encode features from %r for %r due to error: %r",
-                        event,
-                        label,
-                        error,
-                    )
-                else:
-                    if features:
-                        items.append((self.aliases[label], features))
+                features = self.__encode(event, label, features)
+                if features:
+                    items.append((self.aliases[label], features))
 
         return self.index.record(scope, key, items, timestamp=int(to_timestamp(event.datetime)))  # type: ignore
 
+    def record_many(self, events):
+        """
+        Record events that may belong to different projects and groups. Every
+        event is recorded with its own timestamp, but all of them are sent to
+        the index at once.
+        """
+        requests = []
+        for event in events:
+            if not event.group_id:
+                continue
+
+            items = []
+            for label, features in self.extract(event).items():
+                features = self.__encode(event, label, features)
+                if features:
+                    items.append((self.aliases[label], features))
+
+            if items:
+                requests.append(
+                    (
+                        self.__get_scope(event.project),
+                        self.__get_key(event.group),
+                        items,
+                        int(to_timestamp(event.datetime)),
+                    )
+                )
+
+        if not requests:
+            return
+
+        return self.index.record_many(requests)
+
+    def __encode(self, event, label, features):
+        try:
+            return [self.encoder.dumps(feature) for feature in features]
+        except Exception as error:
+            log = (
+                logger.debug
+                if isinstance(error, self.expected_encoding_errors)
+                else functools.partial(logger.warning, exc_info=True)
+            )
+            log(
+                "Could not encode features from %r for %r due to error: %r",
+                event,
+                label,
+                error,
+            )
+            return None
+
     def classify(self, events, limit=None, thresholds=None):
         if not events:
             return []
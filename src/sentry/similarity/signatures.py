@@ -11,3 +11,60 @@ class MinHashSignatureBuilder:
             min(mmh3.hash(feature, column) % self.rows for feature in features)
             for column in range(self.columns)
         ]
+
+
+class VectorizedMinHashSignatureBuilder:
+    """
+    Builds MinHash signatures with NumPy, which is only installed with the
+    ``similarity`` extra.
+
+    By default, every feature is hashed only once with a 64-bit hash, and the
+    hashes for all columns are derived from it with multiply-add-shift
+    universal hashing. These signatures are not comparable to the ones built
+    by ``MinHashSignatureBuilder``, so an index needs a new namespace when
+    switching.
+
+    With ``compatible`` set, signatures are built by ``MinHashSignatureBuilder``
+    instead. That still requires one hash per feature and column, since the
+    column is the seed of the hash.
+    """
+
+    def __init__(self, columns, rows, compatible=False):
+        import numpy as np
+
+        self.columns = columns
+        self.rows = rows
+        self.compatible = compatible
+        self.compatible_builder = MinHashSignatureBuilder(columns, rows)
+
+        # Odd multipliers and offsets of the universal hash functions. They
+        # need to be stable across processes and versions, so they are
+        # derived from the column rather than drawn from a random generator.
+        self.multipliers = []
+        self.offsets = []
+        for column in range(columns):
+            multiplier, offset = mmh3.hash64(f"minhash:{column}", signed=False)
+            self.multipliers.append(multiplier | 1)
+            self.offsets.append(offset)
+
+        self.__multipliers = np.array(self.multipliers, dtype=np.uint64)
+        self.__offsets = np.array(self.offsets, dtype=np.uint64)
+
+    def __call__(self, features):
+        if self.compatible:
+            return self.compatible_builder(features)
+
+        import numpy as np
+
+        hashes = np.fromiter(
+            (mmh3.hash64(feature, signed=False)[0] for feature in features), dtype=np.uint64
+        )
+        if not len(hashes):
+            raise ValueError("min() arg is an empty sequence")
+
+        # (features, columns) matrix. Unsigned 64-bit arithmetic wraps around,
+        # which is the modulo 2**64 the hash functions rely on.
+        with np.errstate(over="ignore"):
+            values = np.multiply.outer(hashes, self.__multipliers) + self.__offsets
+        values = (values >> np.uint64(32)) % np.uint64(self.rows)
+        return values.min(axis=0).tolist()
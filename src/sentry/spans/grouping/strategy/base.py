@@ -1,9 +1,11 @@
 import re
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, Optional, Sequence, TypedDict, Union
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple, TypedDict, Union
 from urllib.parse import urlparse
 
 from sentry.spans.grouping.utils import Hash, parse_fingerprint_var
+from sentry.utils import metrics
+from sentry.utils.lru import LRUCache
 
 
 class Span(TypedDict):
@@ -28,20 +30,85 @@ class Span(TypedDict):
 CallableStrategy = Callable[[Span], Optional[Sequence[str]]]
 
 
+SPAN_GROUP_CACHE_SIZE = 10000
+
+SpanGroupCacheKey = Tuple[Hashable, ...]
+
+
+class SpanGroupCache:
+    """
+    Caches span groups for a batch of transactions, in front of the
+    process-wide cache of the strategy.
+
+    The same span descriptions repeat across most transactions of an
+    application, and normalizing them is expensive. Lookups in the batch are
+    served from a plain dictionary first, which avoids the lock of the shared
+    cache. Hits and misses are reported once per batch.
+    """
+
+    def __init__(self, shared: "LRUCache[SpanGroupCacheKey, str]") -> None:
+        self.shared = shared
+        self.local: Dict[SpanGroupCacheKey, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: SpanGroupCacheKey) -> Optional[str]:
+        value = self.local.get(key)
+        if value is None:
+            value = self.shared.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.local[key] = value
+        self.hits += 1
+        return value
+
+    def set(self, key: SpanGroupCacheKey, value: str) -> None:
+        self.local[key] = value
+        self.shared.set(key, value)
+
+    def report(self) -> None:
+        if self.hits:
+            metrics.incr("spans.grouping.cache", amount=self.hits, tags={"result": "hit"})
+        if self.misses:
+            metrics.incr("spans.grouping.cache", amount=self.misses, tags={"result": "miss"})
+
+
 @dataclass(frozen=True)
 class SpanGroupingStrategy:
     name: str
     # The strategies to use with the default fingerprint
     strategies: Sequence[CallableStrategy]
+    # Span groups by op, description and fingerprint. All strategies must only
+    # depend on these attributes of a span.
+    cache: "LRUCache[SpanGroupCacheKey, str]" = field(
+        default_factory=lambda: LRUCache(maxsize=SPAN_GROUP_CACHE_SIZE),
+        compare=False,
+        repr=False,
+    )
+
+    def get_cache(self) -> SpanGroupCache:
+        return SpanGroupCache(self.cache)
+
+    def execute(self, event_data: Any, cache: Optional[SpanGroupCache] = None) -> Dict[str, str]:
+        """
+        Pass a ``cache`` to share it between the transactions of a batch. It
+        is up to the caller to report its metrics then.
+        """
+        batch_cache = cache if cache is not None else self.get_cache()
 
-    def execute(self, event_data: Any) -> Dict[str, str]:
         spans = event_data.get("spans", [])
-        span_groups = {span["span_id"]: self.get_span_group(span) for span in spans}
+        span_groups = {
+            span["span_id"]: self.get_span_group(span, cache=batch_cache) for span in spans
+        }
 
         # make sure to get the group id for the transaction root span
         span_id = event_data["contexts"]["trace"]["span_id"]
         span_groups[span_id] = self.get_transaction_span_group(event_data)
 
+        if cache is None:
+            batch_cache.report()
+
         return span_groups
 
     def get_transaction_span_group(self, event_data: Any) -> str:
@@ -49,9 +116,25 @@ class SpanGroupingStrategy:
         result.update(event_data["transaction"])
         return result.hexdigest()
 
-    def get_span_group(self, span: Span) -> str:
+    def get_span_group(self, span: Span, cache: Optional[SpanGroupCache] = None) -> str:
         fingerprints = span.get("fingerprint") or ["{{ default }}"]
 
+        if cache is None:
+            return self._get_span_group(span, fingerprints)
+
+        try:
+            key = (span.get("op"), span.get("description"), *fingerprints)
+            span_group = cache.get(key)
+        except TypeError:
+            # Not all values of malformed spans can be used as keys.
+            return self._get_span_group(span, fingerprints)
+
+        if span_group is None:
+            span_group = self._get_span_group(span, fingerprints)
+            cache.set(key, span_group)
+        return span_group
+
+    def _get_span_group(self, span: Span, fingerprints: Sequence[str]) -> str:
         result = Hash()
 
         for fingerprint in fingerprints:
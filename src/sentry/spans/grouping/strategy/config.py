@@ -1,9 +1,10 @@
 from dataclasses import dataclass
-from typing import Any, Dict, Sequence
+from typing import Any, Dict, Optional, Sequence
 
 from sentry.spans.grouping.result import SpanGroupingResults
 from sentry.spans.grouping.strategy.base import (
     CallableStrategy,
+    SpanGroupCache,
     SpanGroupingStrategy,
     loose_normalized_db_span_in_condition_strategy,
     normalized_db_span_in_condition_strategy,
@@ -18,7 +19,9 @@ class SpanGroupingConfig:
     id: str
     strategy: SpanGroupingStrategy
 
-    def execute_strategy(self, event_data: Any) -> SpanGroupingResults:
+    def execute_strategy(
+        self, event_data: Any, cache: Optional[SpanGroupCache] = None
+    ) -> SpanGroupingResults:
         # If there are hashes using the same grouping config stored
         # in the data, they should be reused. Otherwise, fall back to
         # generating new hashes using the data.
@@ -26,7 +29,7 @@ class SpanGroupingConfig:
         if grouping_results is not None and grouping_results.id == self.id:
             return grouping_results
 
-        results = self.strategy.execute(event_data)
+        results = self.strategy.execute(event_data, cache=cache)
         return SpanGroupingResults(self.id, results)
 
 
@@ -4,6 +4,7 @@ from django.db import DataError, IntegrityError, router, transaction
 from django.db.models import F
 
 from sentry import eventstream, similarity, tsdb
+from sentry.grouping.grouphash_cache import invalidate_grouphash_cache
 from sentry.tasks.base import instrumented_task, track_group_async_operation
 
 logger = logging.getLogger("sentry.merge")
@@ -104,6 +105,9 @@ def merge_groups(
             model_list, group, new_group, logger=logger, transaction_id=transaction_id
         )
 
+        # Grouphashes of the source group have (partially) moved.
+        invalidate_grouphash_cache(group.project_id)
+
         if not has_more:
             # There are no more objects to merge for *this* "from" group, remove it
             # from the list of "from" groups that are being merged, and finish the
@@ -1,3 +1,4 @@
+from collections import defaultdict
 from collections.abc import Callable
 from datetime import timedelta
 from enum import Enum
@@ -104,6 +105,77 @@ class TSDBModel(Enum):
     sentry_app_component_interacted = 801
 
 
+class TSDBWriteBatch:
+    """
+    Collects writes to a TSDB, so that they can be written together with
+    ``BaseTSDB.write_batch``.
+
+    The batch has the same write methods as the TSDB, and records every call
+    with its own arguments:
+
+    >>> batch = TSDBWriteBatch()
+    >>> batch.incr_multi([(TSDBModel.project, 1)], timestamp=..., environment_id=1)
+    >>> batch.record_multi([(TSDBModel.users_affected_by_project, 1, ["user"])])
+    >>> tsdb.write_batch(batch)
+    """
+
+    def __init__(self):
+        # (items, timestamp, count, environment_id)
+        self.incrs = []
+        # (items, timestamp, environment_id)
+        self.records = []
+        # (requests, timestamp, environment_id)
+        self.frequencies = []
+
+    def __bool__(self):
+        return bool(self.incrs or self.records or self.frequencies)
+
+    @property
+    def models(self):
+        models = set()
+        for items, _, _, _ in self.incrs:
+            models.update(item[0] for item in items)
+        for items, _, _ in self.records:
+            models.update(model for model, key, values in items)
+        for requests, _, _ in self.frequencies:
+            models.update(model for model, request in requests)
+        return models
+
+    def incr_multi(self, items, timestamp=None, count=1, environment_id=None):
+        self.incrs.append((list(items), timestamp, count, environment_id))
+
+    def record_multi(self, items, timestamp=None, environment_id=None):
+        self.records.append((list(items), timestamp, environment_id))
+
+    def record_frequency_multi(self, requests, timestamp=None, environment_id=None):
+        self.frequencies.append((list(requests), timestamp, environment_id))
+
+    def split(self, key_func):
+        """
+        Split the batch into one batch per value of ``key_func(model)``.
+        """
+        batches = defaultdict(TSDBWriteBatch)
+
+        def group(items):
+            # The model is the first element of all items and requests.
+            groups = defaultdict(list)
+            for item in items:
+                groups[key_func(item[0])].append(item)
+            return groups.items()
+
+        for items, timestamp, count, environment_id in self.incrs:
+            for key, group_items in group(items):
+                batches[key].incr_multi(group_items, timestamp, count, environment_id)
+        for items, timestamp, environment_id in self.records:
+            for key, group_items in group(items):
+                batches[key].record_multi(group_items, timestamp, environment_id)
+        for requests, timestamp, environment_id in self.frequencies:
+            for key, group_requests in group(requests):
+                batches[key].record_frequency_multi(group_requests, timestamp, environment_id)
+
+        return dict(batches)
+
+
 class BaseTSDB(Service):
     __read_methods__ = frozenset(
         [
@@ -132,6 +204,7 @@ class BaseTSDB(Service):
             "record_frequency_multi",
             "merge_frequencies",
             "delete_frequencies",
+            "write_batch",
             "flush",
         ]
     )
@@ -492,6 +565,21 @@ class BaseTSDB(Service):
         """
         raise NotImplementedError
 
+    def write_batch(self, batch):
+        """
+        Write all counters, distinct counters and frequency tables collected
+        in a ``TSDBWriteBatch``. Backends may override this to write the
+        whole batch at once.
+        """
+        for items, timestamp, count, environment_id in batch.incrs:
+            self.incr_multi(items, timestamp=timestamp, count=count, environment_id=environment_id)
+        for items, timestamp, environment_id in batch.records:
+            self.record_multi(items, timestamp=timestamp, environment_id=environment_id)
+        for requests, timestamp, environment_id in batch.frequencies:
+            self.record_frequency_multi(
+                requests, timestamp=timestamp, environment_id=environment_id
+            )
+
     def get_most_frequent(
         self, model, keys, start, end=None, rollup=None, limit=None, environment_id=None
     ):
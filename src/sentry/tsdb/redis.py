@@ -1,17 +1,24 @@
+import atexit
 import itertools
 import logging
+import os
 import random
+import threading
 import uuid
+import weakref
 from collections import defaultdict, namedtuple
-from functools import reduce
+from functools import partial, reduce
 from hashlib import md5
 from typing import Callable, ContextManager, TypeVar
 
+from celery.signals import worker_process_shutdown
+from django.core.signals import request_finished
 from django.utils import timezone
 from django.utils.encoding import force_bytes
 from pkg_resources import resource_string
 
-from sentry.tsdb.base import BaseTSDB
+from sentry.tsdb.base import BaseTSDB, TSDBWriteBatch
+from sentry.utils import metrics
 from sentry.utils.compat import crc32
 from sentry.utils.dates import to_datetime, to_timestamp
 from sentry.utils.redis import SentryScript, check_cluster_versions, get_cluster_from_options
@@ -52,6 +59,173 @@ class SuppressionWrapper:
         return True
 
 
+class BatchWrites:
+    """\
+    Writes of a ``TSDBWriteBatch`` to a single cluster, coalesced by the Redis
+    key (and hash field) they write to.
+
+    Commands are grouped by their routing key, which is the Redis key for
+    counters and the TSDB key for distinct counters and frequency tables, as
+    with the individual write methods.
+    """
+
+    def __init__(self):
+        # (hash_key, hash_field) -> count
+        self.counters = defaultdict(int)
+        # (routing_key, key) -> values
+        self.distinct_counters = defaultdict(set)
+        # (routing_key, keys) -> {member: score}
+        self.frequencies = defaultdict(lambda: defaultdict(int))
+        # (routing_key, key) -> max expiration encountered
+        self.expiries = {}
+
+    def __len__(self):
+        return len(self.counters) + len(self.distinct_counters) + len(self.frequencies)
+
+    def expire(self, routing_key, key, expiry):
+        if self.expiries.get((routing_key, key), 0) < expiry:
+            self.expiries[(routing_key, key)] = expiry
+
+    def merge(self, other):
+        for key, count in other.counters.items():
+            self.counters[key] += count
+
+        for key, values in other.distinct_counters.items():
+            self.distinct_counters[key].update(values)
+
+        for key, items in other.frequencies.items():
+            scores = self.frequencies[key]
+            for member, score in items.items():
+                scores[member] += score
+
+        for (routing_key, key), expiry in other.expiries.items():
+            self.expire(routing_key, key, expiry)
+
+    def get_commands(self, sketch_parameters):
+        commands = defaultdict(list)
+
+        for (hash_key, hash_field), count in self.counters.items():
+            commands[hash_key].append(("HINCRBY", hash_key, hash_field, count))
+
+        for (routing_key, key), values in self.distinct_counters.items():
+            commands[routing_key].append(("PFADD", key, *values))
+
+        for (routing_key, keys), items in self.frequencies.items():
+            arguments = ["INCR"] + list(sketch_parameters)
+            for member, score in items.items():
+                arguments.extend((score, member))
+            commands[routing_key].append((CountMinScript, list(keys), arguments))
+
+        for (routing_key, key), expiry in self.expiries.items():
+            commands[routing_key].append(("EXPIREAT", key, expiry))
+
+        return commands
+
+
+def _call_weak_method(ref):
+    method = ref()
+    if method is not None:
+        method()
+
+
+class LocalBuffer:
+    """\
+    Aggregates counter increments and distinct counter records in process and
+    writes them to Redis from a background thread.
+
+    Increments of the same hash field and records into the same distinct
+    counter are summed until the buffer is flushed, which happens every
+    ``interval`` seconds, as soon as more than ``max_size`` keys are pending,
+    at the end of every request, and when the process exits. Tasks are not
+    flushed individually, so that counters are aggregated across them.
+
+    Buffered writes are not visible to reads until they are flushed, and they
+    are lost if the process is killed before that. Errors are only logged, as
+    there is no caller left to raise them to.
+    """
+
+    def __init__(self, tsdb, interval=1.0, max_size=10000):
+        self.tsdb = tsdb
+        self.interval = interval
+        self.max_size = max_size
+
+        self.__lock = threading.Lock()
+        self.__wakeup = threading.Event()
+        self.__writes = defaultdict(BatchWrites)
+        self.__pid = None
+
+        # The hook can't be unregistered, so it must not keep the buffer alive.
+        os.register_at_fork(
+            after_in_child=partial(_call_weak_method, weakref.WeakMethod(self.__after_fork))
+        )
+
+    def __len__(self):
+        with self.__lock:
+            return sum(len(cluster_writes) for cluster_writes in self.__writes.values())
+
+    def __start(self):
+        pid = os.getpid()
+        with self.__lock:
+            if self.__pid == pid:
+                return
+
+            # A forked process inherits the exit hook, but not the flush thread.
+            if self.__pid is None:
+                atexit.register(self.flush)
+            self.__pid = pid
+
+        t = threading.Thread(target=self.__run, name="tsdb-local-buffer")
+        t.daemon = True
+        t.start()
+
+    def __after_fork(self):
+        # Only the forking thread survives in the child, so the lock may still
+        # be held by the flush thread of the parent. The parent is responsible
+        # for writing what it had buffered.
+        self.__lock = threading.Lock()
+        self.__wakeup = threading.Event()
+        self.__writes = defaultdict(BatchWrites)
+
+    def __run(self):
+        while True:
+            self.__wakeup.wait(self.interval)
+            self.__wakeup.clear()
+            self.flush()
+
+    def add(self, batch):
+        if self.__pid != os.getpid():
+            self.__start()
+
+        # Collect outside of the lock, which also validates the whole batch
+        # before any of it is buffered.
+        writes = defaultdict(BatchWrites)
+        self.tsdb.collect_writes(batch, writes)
+
+        with self.__lock:
+            for group, cluster_writes in writes.items():
+                self.__writes[group].merge(cluster_writes)
+            size = sum(len(cluster_writes) for cluster_writes in self.__writes.values())
+
+        if size > self.max_size:
+            self.__wakeup.set()
+
+    def flush(self):
+        with self.__lock:
+            writes, self.__writes = self.__writes, defaultdict(BatchWrites)
+
+        size = sum(len(cluster_writes) for cluster_writes in writes.values())
+        if not size:
+            return
+
+        metrics.gauge("tsdb.local_buffer.size", size)
+        with metrics.timer("tsdb.local_buffer.flush"):
+            try:
+                self.tsdb.execute_writes(writes)
+            except Exception:
+                metrics.incr("tsdb.local_buffer.dropped", amount=size)
+                logger.exception("Failed to flush TSDB local buffer")
+
+
 class RedisTSDB(BaseTSDB):
     """
     A time series storage backend for Redis.
@@ -105,6 +279,12 @@ class RedisTSDB(BaseTSDB):
     frequency table can be displayed as percentages of the whole data set.
     (Additional documentation and the bulk of the logic for implementing the
     frequency table API can be found in the ``cmsketch.lua`` script.)
+
+    Counters and distinct counters can be aggregated in process before they
+    are written by passing ``local_buffer`` options (``interval`` and
+    ``max_size``, see ``LocalBuffer``.) This trades the durability and read
+    consistency of these writes for far fewer Redis commands for frequently
+    written keys.
     """
 
     DEFAULT_SKETCH_PARAMETERS = SketchParameters(3, 128, 50)
@@ -114,8 +294,23 @@ class RedisTSDB(BaseTSDB):
         self.prefix = prefix
         self.vnodes = vnodes
         self.enable_frequency_sketches = options.pop("enable_frequency_sketches", False)
+
+        local_buffer = options.pop("local_buffer", None)
+        self.local_buffer = LocalBuffer(self, **local_buffer) if local_buffer else None
+        if self.local_buffer is not None:
+            request_finished.connect(self.flush_local_buffer)
+            # Celery exits its worker processes without running atexit hooks.
+            worker_process_shutdown.connect(self.flush_local_buffer)
+
         super().__init__(**options)
 
+    def flush_local_buffer(self, **kwargs):
+        """\
+        Write all counters and distinct counters held in the local buffer.
+        """
+        if self.local_buffer is not None:
+            self.local_buffer.flush()
+
     def validate(self):
         logger.debug("Validating Redis version...")
         version = Version((2, 8, 18)) if self.enable_frequency_sketches else Version((2, 8, 9))
@@ -214,6 +409,11 @@ class RedisTSDB(BaseTSDB):
         >>> incr_multi([(TimeSeriesModel.project, 1, {"timestamp": ...}),
         ...             (TimeSeriesModel.group, 5, {"timestamp": ...})])
         """
+        if self.local_buffer is not None:
+            batch = TSDBWriteBatch()
+            batch.incr_multi(items, timestamp, count, environment_id)
+            self.local_buffer.add(batch)
+            return
 
         default_timestamp = timestamp
         default_count = count
@@ -262,6 +462,132 @@ class RedisTSDB(BaseTSDB):
                     if key_expiries.get(hash_key):
                         client.expireat(hash_key, key_expiries.pop(hash_key))
 
+    def write_batch(self, batch):
+        """\
+        Write all counters, distinct counters and frequency tables of a
+        ``TSDBWriteBatch`` with a single round trip per Redis host.
+
+        Increments of the same hash field, as well as records into the same
+        distinct counter or frequency table, are coalesced into one command,
+        and every key only gets one expiration.
+
+        If the local buffer is enabled, counters and distinct counters are
+        added to the buffer instead and only frequency tables are written
+        immediately.
+        """
+        if self.local_buffer is not None:
+            buffered = TSDBWriteBatch()
+            buffered.incrs = batch.incrs
+            buffered.records = batch.records
+            self.local_buffer.add(buffered)
+
+            if not batch.frequencies:
+                return
+            unbuffered = TSDBWriteBatch()
+            unbuffered.frequencies = batch.frequencies
+            batch = unbuffered
+
+        # (cluster, durable) -> writes
+        writes = defaultdict(BatchWrites)
+        self.collect_writes(batch, writes)
+        self.execute_writes(writes)
+
+    def collect_writes(self, batch, writes):
+        """\
+        Add the commands needed to write a ``TSDBWriteBatch`` to ``writes``, a
+        mapping of ``(cluster, durable)`` to ``BatchWrites``.
+        """
+        for items, timestamp, default_count, environment_id in batch.incrs:
+            self.validate_arguments([item[0] for item in items], [environment_id])
+
+            if timestamp is None:
+                timestamp = timezone.now()
+
+            for group, environment_ids in self.get_cluster_groups({None, environment_id}):
+                cluster_writes = writes[group]
+                for rollup, max_values in self.rollups.items():
+                    for item in items:
+                        if len(item) == 2:
+                            model, key = item
+                            options = {}
+                        else:
+                            model, key, options = item
+
+                        count = options.get("count", default_count)
+                        item_timestamp = options.get("timestamp", timestamp)
+                        expiry = self.calculate_expiry(rollup, max_values, item_timestamp)
+
+                        for environment_id in environment_ids:
+                            hash_key, hash_field = self.make_counter_key(
+                                model, rollup, item_timestamp, key, environment_id
+                            )
+                            cluster_writes.counters[(hash_key, hash_field)] += count
+                            cluster_writes.expire(hash_key, hash_key, expiry)
+
+        for items, timestamp, environment_id in batch.records:
+            self.validate_arguments([model for model, key, values in items], [environment_id])
+
+            if timestamp is None:
+                timestamp = timezone.now()
+
+            ts = int(to_timestamp(timestamp))  # ``timestamp`` is not actually a timestamp :(
+
+            for group, environment_ids in self.get_cluster_groups({None, environment_id}):
+                cluster_writes = writes[group]
+                for model, key, values in items:
+                    for rollup, max_values in self.rollups.items():
+                        expiry = self.calculate_expiry(rollup, max_values, timestamp)
+                        for environment_id in environment_ids:
+                            k = self.make_key(model, rollup, ts, key, environment_id)
+                            cluster_writes.distinct_counters[(key, k)].update(values)
+                            cluster_writes.expire(key, k, expiry)
+
+        for requests, timestamp, environment_id in batch.frequencies:
+            self.validate_arguments([model for model, request in requests], [environment_id])
+
+            if not self.enable_frequency_sketches:
+                continue
+
+            if timestamp is None:
+                timestamp = timezone.now()
+
+            ts = int(to_timestamp(timestamp))  # ``timestamp`` is not actually a timestamp :(
+
+            for group, environment_ids in self.get_cluster_groups({None, environment_id}):
+                cluster_writes = writes[group]
+                for model, request in requests:
+                    for key, items in request.items():
+                        keys = []
+                        for rollup, max_values in self.rollups.items():
+                            chunk = []
+                            for environment_id in environment_ids:
+                                chunk = self.make_frequency_table_keys(
+                                    model, rollup, ts, key, environment_id
+                                )
+                                keys.extend(chunk)
+
+                            expiry = self.calculate_expiry(rollup, max_values, timestamp)
+                            for k in chunk:
+                                cluster_writes.expire(key, k, expiry)
+
+                        scores = cluster_writes.frequencies[(key, tuple(keys))]
+                        for member, score in items.items():
+                            scores[member] += score
+
+    def execute_writes(self, writes):
+        """\
+        Execute the commands collected by ``collect_writes`` with a single
+        round trip per Redis host. Errors are only raised for durable clusters.
+        """
+        for (cluster, durable), cluster_writes in writes.items():
+            try:
+                cluster.execute_commands(
+                    cluster_writes.get_commands(self.DEFAULT_SKETCH_PARAMETERS)
+                )
+            except Exception:
+                if durable:
+                    raise
+
     def get_range(
         self,
         model,
@@ -394,6 +720,12 @@ class RedisTSDB(BaseTSDB):
         """
         Record an occurrence of an item in a distinct counter.
         """
+        if self.local_buffer is not None:
+            batch = TSDBWriteBatch()
+            batch.record_multi(items, timestamp, environment_id)
+            self.local_buffer.add(batch)
+            return
+
         self.validate_arguments([model for model, key, values in items], [environment_id])
 
         if timestamp is None:
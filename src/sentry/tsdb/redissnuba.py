@@ -47,6 +47,7 @@ method_specifications = {
     ),
     "merge_frequencies": (WRITE, single_model_argument),
     "delete_frequencies": (WRITE, multiple_model_argument),
+    "write_batch": (WRITE, lambda callargs: callargs["batch"].models),
     "flush": (WRITE, dont_do_this),
 }
 
@@ -92,7 +93,8 @@ def make_method(key):
 class RedisSnubaTSDBMeta(type):
     def __new__(cls, name, bases, attrs):
         for key in method_specifications.keys():
-            attrs[key] = make_method(key)
+            # Methods defined on the class itself take precedence.
+            attrs.setdefault(key, make_method(key))
         return type.__new__(cls, name, bases, attrs)
 
 
@@ -121,3 +123,12 @@ class RedisSnubaTSDB(BaseTSDB, metaclass=RedisSnubaTSDBMeta):
             "snuba": SnubaTSDB(**options.pop("snuba", {})),
         }
         super().__init__(**options)
+
+    def write_batch(self, batch):
+        # Unlike other writes, a batch usually contains models that are
+        # written to different backends, so it is split by backend first.
+        batches = batch.split(
+            lambda model: selector_func("incr", {"model": model}, self.switchover_timestamp)
+        )
+        for backend, backend_batch in batches.items():
+            self.backends[backend].write_batch(backend_batch)
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+from bisect import bisect_right
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
 
 FREQUENCY_CONDITION_BUCKET_SIZE = timedelta(minutes=5)
 
@@ -28,3 +29,50 @@ def round_to_five_minute(time: datetime) -> datetime:
     return time - timedelta(
         minutes=time.minute % 5, seconds=time.second, microseconds=time.microsecond
     )
+
+
+class FrequencyBuckets:
+    """
+    Event counts of a group in buckets of `FREQUENCY_CONDITION_BUCKET_SIZE`
+    between `start` and `end`, indexed so that the count of any time range is
+    answered in O(log n).
+
+    Only buckets with events need to be provided, as `(time, count)` pairs
+    sorted by time.
+    """
+
+    def __init__(
+        self, start: datetime, end: datetime, bucket_counts: Sequence[Tuple[datetime, int]]
+    ) -> None:
+        self.start = round_to_five_minute(start)
+        self.end = round_to_five_minute(end)
+        self.__times: List[datetime] = []
+        self.__sums: List[int] = []
+        cumulative_sum = 0
+        for time, count in bucket_counts:
+            cumulative_sum += count
+            self.__times.append(time)
+            self.__sums.append(cumulative_sum)
+
+    def __iter__(self) -> Iterator[datetime]:
+        """
+        Iterates over the times of all buckets, including empty ones.
+        """
+        time = self.start
+        while time <= self.end:
+            yield time
+            time += FREQUENCY_CONDITION_BUCKET_SIZE
+
+    def cumulative_count(self, time: datetime) -> int:
+        """
+        Returns the count of all events up to and including the bucket of `time`.
+        """
+        index = bisect_right(self.__times, round_to_five_minute(time))
+        return self.__sums[index - 1] if index else 0
+
+    def count(self, start: datetime, end: datetime) -> int:
+        """
+        Returns the count of events after the bucket of `start`, up to and
+        including the bucket of `end`.
+        """
+        return self.cumulative_count(end) - self.cumulative_count(start)
@@ -31,6 +31,9 @@ class CacheKVStorage(KVStorage[Any, Any]):
     def get(self, key: Any) -> Optional[Any]:
         return self.backend.get(key)
 
+    def get_many(self, keys: Sequence[Any]) -> Iterator[Tuple[Any, Any]]:
+        return iter(self.backend.get_many(keys).items())
+
     def set(self, key: Any, value: Any, ttl: Optional[timedelta] = None) -> None:
         self.backend.set(key, value, timeout=int(ttl.total_seconds()) if ttl is not None else None)
 
@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A bounded, thread-safe, in-process LRU cache with optional per-entry TTL.
+
+    Once ``maxsize`` entries are stored, setting a new key evicts the least
+    recently used one. Expired entries are dropped lazily when read.
+
+    With ``sizeof``, ``maxsize`` bounds the total size of the stored values
+    instead of their number, for instance to bound the memory held by the
+    cache. Values larger than ``maxsize`` are not stored at all.
+
+    >>> cache = LRUCache(maxsize=2, ttl=60)
+    >>> cache.set("a", 1)
+    >>> cache.get("a")
+    1
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float] = None,
+        timer: Callable[[], float] = time.monotonic,
+        sizeof: Optional[Callable[[V], int]] = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.currsize = 0
+        self.__data: "OrderedDict[K, Tuple[V, Optional[float], int]]" = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__data)
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        with self.__lock:
+            try:
+                value, expires_at, _ = self.__data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            if expires_at is not None and expires_at <= self.timer():
+                self.__pop(key)
+                self.misses += 1
+                return default
+
+            self.__data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        if ttl is None:
+            ttl = self.ttl
+        expires_at = self.timer() + ttl if ttl is not None else None
+        size = self.sizeof(value) if self.sizeof is not None else 1
+
+        with self.__lock:
+            self.__pop(key)
+            if size > self.maxsize:
+                return
+
+            self.__data[key] = (value, expires_at, size)
+            self.currsize += size
+            while self.currsize > self.maxsize:
+                self.__pop(next(iter(self.__data)))
+
+    def delete(self, key: K) -> None:
+        with self.__lock:
+            self.__pop(key)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__data.clear()
+            self.currsize = 0
+
+    def __pop(self, key: K) -> None:
+        entry = self.__data.pop(key, None)
+        if entry is not None:
+            self.currsize -= entry[2]
@@ -6,7 +6,7 @@ import re
 from abc import ABC, abstractmethod
 from datetime import timedelta
 from enum import Enum
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence
 from urllib.parse import urlparse
 
 from sentry import options
@@ -23,6 +23,7 @@ from sentry.issues.grouptype import (
 )
 from sentry.models import Organization, Project
 
+from .span_view import SpanView
 from .types import PerformanceProblemsMap, Span
 
 
@@ -107,6 +108,37 @@ class PerformanceDetector(ABC):
     def settings_key(self) -> DetectorType:
         raise NotImplementedError
 
+    @property
+    def span_op_prefixes(self) -> Optional[Sequence[str]]:
+        """
+        Ops of the spans this detector is interested in, as prefixes. Other
+        spans are not visited, which must not change the outcome of the
+        detection. Detectors visit all spans by default.
+        """
+        return None
+
+    def _allowed_span_op_prefixes(self) -> Optional[Sequence[str]]:
+        """
+        The ``allowed_span_ops`` of all settings, or ``None`` if any of them
+        allows every op.
+        """
+        op_prefixes: List[str] = []
+        for setting in self.settings:
+            allowed_span_ops = setting.get("allowed_span_ops", [])
+            if not allowed_span_ops:
+                return None
+            op_prefixes.extend(allowed_span_ops)
+        return op_prefixes
+
+    def visit_spans(self, span_view: SpanView) -> None:
+        """
+        Visits the spans of the transaction that match ``span_op_prefixes``.
+        Detectors can override this to skip more spans based on the columns
+        of the view, as long as the outcome is the same as visiting all spans.
+        """
+        for span in span_view.spans_for_ops(self.span_op_prefixes):
+            self.visit_span(span)
+
     @abstractmethod
     def visit_span(self, span: Span) -> None:
         raise NotImplementedError
@@ -5,7 +5,7 @@ import os
 import random
 import re
 from datetime import timedelta
-from typing import Optional
+from typing import Optional, Sequence
 from urllib.parse import parse_qs, urlparse
 
 from sentry import features
@@ -20,6 +20,7 @@ from ..base import (
     get_url_from_span,
 )
 from ..performance_problem import PerformanceProblem
+from ..span_view import SpanView
 from ..types import PerformanceProblemsMap, Span
 
 URL_PARAMETER_REGEX = re.compile(
@@ -67,6 +68,17 @@ class NPlusOneAPICallsDetector(PerformanceDetector):
         self.stored_problems: PerformanceProblemsMap = {}
         self.spans: list[Span] = []
 
+    @property
+    def span_op_prefixes(self) -> Optional[Sequence[str]]:
+        return self.settings.get("allowed_span_ops", [])
+
+    def visit_spans(self, span_view: SpanView) -> None:
+        # Short spans are ignored without affecting the current sequence.
+        duration_threshold = timedelta(milliseconds=self.settings.get("duration_threshold"))
+        for index in span_view.indices_for_ops(self.span_op_prefixes):
+            if span_view.durations[index] >= duration_threshold:
+                self.visit_span(span_view.spans[index])
+
     def visit_span(self, span: Span) -> None:
         if not NPlusOneAPICallsDetector.is_span_eligible(span):
             return
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Optional, Sequence
+
 from sentry import features
 from sentry.issues.grouptype import PerformanceUncompressedAssetsGroupType
 from sentry.models import Organization, Project
@@ -23,6 +25,10 @@ class UncompressedAssetSpanDetector(PerformanceDetector):
         self.stored_problems = {}
         self.any_compression = False
 
+    @property
+    def span_op_prefixes(self) -> Optional[Sequence[str]]:
+        return self.settings.get("allowed_span_ops")
+
     def visit_span(self, span: Span) -> None:
         op = span.get("op", None)
         if not op:
@@ -5,7 +5,7 @@ import logging
 import random
 import re
 from abc import ABC, abstractmethod
-from collections import defaultdict, deque
+from collections import Counter, defaultdict, deque
 from datetime import timedelta
 from typing import Any, Dict, List, Optional, Sequence, Tuple, cast
 
@@ -39,6 +39,7 @@ from .base import (
 )
 from .detectors import NPlusOneAPICallsDetector, UncompressedAssetSpanDetector
 from .performance_problem import PerformanceProblem
+from .span_view import SpanView
 from .types import Span
 
 
@@ -267,8 +268,9 @@ def _detect_performance_problems(
         UncompressedAssetSpanDetector(detection_settings, data),
     ]
 
+    span_view = SpanView(data.get("spans") or [])
     for detector in detectors:
-        run_detector_on_data(detector, data)
+        run_detector_on_data(detector, data, span_view)
 
     # Metrics reporting only for detection, not created issues.
     report_metrics_for_detectors(data, event_id, detectors, sdk_span)
@@ -309,14 +311,14 @@ def _detect_performance_problems(
     return list(unique_problems)
 
 
-def run_detector_on_data(detector, data):
+def run_detector_on_data(detector, data, span_view: Optional[SpanView] = None):
     if not detector.is_event_eligible(data):
         return
 
-    spans = data.get("spans", [])
-    for span in spans:
-        detector.visit_span(span)
+    if span_view is None:
+        span_view = SpanView(data.get("spans") or [])
 
+    detector.visit_spans(span_view)
     detector.on_complete()
 
 
@@ -365,6 +367,20 @@ class SlowDBQueryDetector(PerformanceDetector):
     def init(self):
         self.stored_problems = {}
 
+    @property
+    def span_op_prefixes(self) -> Optional[Sequence[str]]:
+        return self._allowed_span_op_prefixes()
+
+    def visit_spans(self, span_view: SpanView) -> None:
+        # Spans faster than every threshold can't be slow, no matter which
+        # settings apply to them.
+        min_duration = min(
+            timedelta(milliseconds=setting.get("duration_threshold")) for setting in self.settings
+        )
+        for index in span_view.indices_for_ops(self.span_op_prefixes):
+            if span_view.durations[index] >= min_duration:
+                self.visit_span(span_view.spans[index])
+
     def visit_span(self, span: Span):
         settings_for_span = self.settings_for_span(span)
         if not settings_for_span:
@@ -435,6 +451,7 @@ class RenderBlockingAssetSpanDetector(PerformanceDetector):
     settings_key = DetectorType.RENDER_BLOCKING_ASSET_SPAN
 
     MAX_SIZE_BYTES = 1_000_000_000  # 1GB
+    SPAN_OPS = ("resource.link", "resource.script")
 
     def init(self):
         self.stored_problems = {}
@@ -467,12 +484,16 @@ class RenderBlockingAssetSpanDetector(PerformanceDetector):
     def is_creation_allowed_for_project(self, project: Project) -> bool:
         return True  # Detection always allowed by project for now
 
+    @property
+    def span_op_prefixes(self) -> Optional[Sequence[str]]:
+        return self.SPAN_OPS if self.fcp else ()
+
     def visit_span(self, span: Span):
         if not self.fcp:
             return
 
         op = span.get("op", None)
-        if op not in ["resource.link", "resource.script"]:
+        if op not in self.SPAN_OPS:
             return False
 
         if self._is_blocking_render(span):
@@ -541,6 +562,20 @@ class ConsecutiveDBSpanDetector(PerformanceDetector):
         self.consecutive_db_spans: list[Span] = []
         self.independent_db_spans: list[Span] = []
 
+    @property
+    def span_op_prefixes(self) -> Optional[Sequence[str]]:
+        return ("db",)
+
+    def visit_spans(self, span_view: SpanView) -> None:
+        # Any other span ends the current sequence, and every further one in
+        # a row wouldn't change anything. Only the first one needs a visit.
+        previous_index = -1
+        for index in span_view.indices_for_ops(self.span_op_prefixes):
+            if index > previous_index + 1:
+                self.visit_span(span_view.spans[previous_index + 1])
+            self.visit_span(span_view.spans[index])
+            previous_index = index
+
     def visit_span(self, span: Span) -> None:
         span_id = span.get("span_id", None)
 
@@ -756,6 +791,28 @@ class NPlusOneDBSpanDetector(PerformanceDetector):
     def is_creation_allowed_for_project(self, project: Optional[Project]) -> bool:
         return True  # This should probably use the `n_plus_one_db.problem-creation` option, which is currently not in use
 
+    @property
+    def span_op_prefixes(self) -> Optional[Sequence[str]]:
+        return ("db",)
+
+    def visit_spans(self, span_view: SpanView) -> None:
+        # Other spans matter as parents of DB spans, and because they break up
+        # N+1s. The latter only needs the first of them in a row that has an
+        # id and op, as the ones after it have nothing left to break up.
+        db_indices = span_view.indices_for_ops(self.span_op_prefixes)
+        parent_indices = {span_view.parent_indices[index] for index in db_indices}
+        parent_indices.discard(None)
+
+        previous_index = -1
+        for index in sorted(parent_indices.union(db_indices)):
+            for skipped_index in range(previous_index + 1, index):
+                skipped_span = span_view.spans[skipped_index]
+                if skipped_span.get("span_id", None) and skipped_span.get("op", None):
+                    self.visit_span(skipped_span)
+                    break
+            self.visit_span(span_view.spans[index])
+            previous_index = index
+
     def visit_span(self, span: Span) -> None:
         span_id = span.get("span_id", None)
         op = span.get("op", None)
@@ -1247,6 +1304,20 @@ class MNPlusOneDBSpanDetector(PerformanceDetector):
         self.stored_problems = {}
         self.state = SearchingForMNPlusOne(self.settings)
 
+    def visit_spans(self, span_view: SpanView) -> None:
+        # Patterns may contain spans of any op, so all spans are visited. But
+        # every pattern contains a DB span, so there is nothing to find unless
+        # some query repeats often enough.
+        query_counts = Counter(
+            (span_view.ops[index], span_view.description_hashes[index])
+            for index in span_view.indices_for_ops(("db",))
+        )
+        minimum_occurrences_of_pattern = self.settings["minimum_occurrences_of_pattern"]
+        if all(count < minimum_occurrences_of_pattern for count in query_counts.values()):
+            return
+
+        super().visit_spans(span_view)
+
     def visit_span(self, span):
         self.state, performance_problem = self.state.next(span)
         if performance_problem:
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .types import Span
+
+
+class SpanView:
+    """
+    Columnar view of the spans of a transaction, built in a single pass over
+    the spans and shared by all detectors that run on the transaction.
+
+    Most detectors only look at spans with certain ops. The view indexes spans
+    by op, which allows them to skip the spans they would ignore anyway, while
+    still seeing the spans they are interested in in their original order.
+
+    The columns hold the values detectors would otherwise derive from every
+    span on their own. They are aligned with ``spans``:
+
+    - ``ops``: the op of the span, or an empty string
+    - ``start_timestamps`` and ``end_timestamps``
+    - ``durations``: the same as ``get_span_duration``
+    - ``description_hashes``: the hash of the normalized description
+    - ``parent_indices``: the position of the parent span, if it is part of
+      the transaction
+    """
+
+    def __init__(self, spans: Sequence[Span]):
+        self.spans = spans
+        self.ops: List[str] = []
+        self.start_timestamps: List[timedelta] = []
+        self.end_timestamps: List[timedelta] = []
+        self.durations: List[timedelta] = []
+        self.description_hashes: List[Optional[str]] = []
+        self.parent_indices: List[Optional[int]] = []
+
+        self.__indices_by_op: Dict[str, List[int]] = defaultdict(list)
+        self.__indices_by_prefixes: Dict[Tuple[str, ...], List[int]] = {}
+
+        indices_by_span_id: Dict[str, int] = {}
+        for index, span in enumerate(spans):
+            op = span.get("op") or ""
+            start_timestamp = timedelta(seconds=span.get("start_timestamp") or 0)
+            end_timestamp = timedelta(seconds=span.get("timestamp") or 0)
+
+            self.ops.append(op)
+            self.start_timestamps.append(start_timestamp)
+            self.end_timestamps.append(end_timestamp)
+            self.durations.append(end_timestamp - start_timestamp)
+            self.description_hashes.append(span.get("hash"))
+            self.__indices_by_op[op].append(index)
+
+            span_id = span.get("span_id")
+            if span_id:
+                indices_by_span_id[span_id] = index
+
+        for span in spans:
+            parent_span_id = span.get("parent_span_id")
+            self.parent_indices.append(
+                indices_by_span_id.get(parent_span_id) if parent_span_id else None
+            )
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def indices_for_ops(self, op_prefixes: Optional[Sequence[str]]) -> Sequence[int]:
+        """
+        Positions of the spans whose op starts with any of the given prefixes,
+        in order. All spans are returned if no prefixes are given.
+        """
+        if op_prefixes is None:
+            return range(len(self.spans))
+
+        key = tuple(op_prefixes)
+        indices = self.__indices_by_prefixes.get(key)
+        if indices is None:
+            # There are far fewer distinct ops than spans, so the prefixes
+            # only need to be checked once per op.
+            indices = sorted(
+                index
+                for op, op_indices in self.__indices_by_op.items()
+                if op.startswith(key)
+                for index in op_indices
+            )
+            self.__indices_by_prefixes[key] = indices
+        return indices
+
+    def spans_for_ops(self, op_prefixes: Optional[Sequence[str]]) -> Sequence[Span]:
+        if op_prefixes is None:
+            return self.spans
+        return [self.spans[index] for index in self.indices_for_ops(op_prefixes)]
@@ -0,0 +1,46 @@
+import threading
+
+import pytest
+
+from sentry.api.serializers import loader
+from sentry.api.serializers.loader import ConcurrentLoader
+from sentry.testutils.helpers.options import override_options
+
+
+@pytest.fixture(autouse=True)
+def reset_executor(monkeypatch):
+    monkeypatch.setattr(loader, "_executor", None)
+
+
+def test_runs_in_calling_thread_by_default():
+    with ConcurrentLoader() as concurrent_loader:
+        future = concurrent_loader.submit(threading.get_ident)
+    assert future.result() == threading.get_ident()
+
+
+@override_options({"api.serializers.concurrent-loader-workers": 2})
+def test_runs_lookups_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    with ConcurrentLoader() as concurrent_loader:
+        first = concurrent_loader.submit(barrier.wait)
+        second = concurrent_loader.submit(barrier.wait)
+        error = concurrent_loader.submit(int, "not a number")
+
+    assert {first.result(), second.result()} == {0, 1}
+    with pytest.raises(ValueError):
+        error.result()
+
+
+@override_options({"api.serializers.concurrent-loader-workers": 1})
+def test_nested_lookups_run_in_worker():
+    def lookup():
+        with ConcurrentLoader() as concurrent_loader:
+            future = concurrent_loader.submit(threading.get_ident)
+        return threading.get_ident(), future.result()
+
+    with ConcurrentLoader() as concurrent_loader:
+        future = concurrent_loader.submit(lookup)
+
+    outer, inner = future.result()
+    assert outer == inner != threading.get_ident()
@@ -0,0 +1,82 @@
+import pickle
+from datetime import datetime
+
+import pytest
+from django.utils import timezone
+
+from sentry.buffer.codec import BufferValueCodec
+from sentry.buffer.redis import RedisBuffer
+from sentry.models import Group
+from sentry.testutils.helpers import override_options
+
+
+def benchmark_available():
+    try:
+        import pytest_benchmark  # NOQA
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+# What the event manager buffers for every event of an existing group
+FILTERS = {"id": 1234567}
+EXTRA = {
+    "last_seen": datetime(2017, 5, 3, 6, 6, 6, 123456, tzinfo=timezone.utc),
+    "data": {
+        "last_received": 1493791566.123456,
+        "type": "error",
+        "metadata": {"type": "ValueError", "value": "invalid literal", "filename": "app.py"},
+        "title": "ValueError: invalid literal",
+        "location": "app.py",
+    },
+}
+
+CODECS = {
+    "pickle": (pickle.dumps, pickle.loads),
+    "compact": (BufferValueCodec().encode, BufferValueCodec().decode),
+}
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("codec", sorted(CODECS))
+def test_benchmark_encode(codec, benchmark):
+    dumps, _ = CODECS[codec]
+
+    def encode():
+        dumps(FILTERS)
+        for value in EXTRA.values():
+            dumps(value)
+
+    benchmark(encode)
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("codec", sorted(CODECS))
+def test_benchmark_decode(codec, benchmark):
+    dumps, loads = CODECS[codec]
+    payloads = [dumps(FILTERS)] + [dumps(value) for value in EXTRA.values()]
+
+    def decode():
+        for payload in payloads:
+            loads(payload)
+
+    benchmark(decode)
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("compact", [False, True], ids=["pickle", "compact"])
+def test_benchmark_pending_key_memory(compact, benchmark):
+    buf = RedisBuffer()
+    client = buf.cluster.get_routing_client()
+    key = buf._make_key(Group, FILTERS)
+
+    def incr():
+        client.delete(key)
+        buf.incr(Group, {"times_seen": 1}, FILTERS, EXTRA)
+
+    with override_options({"buffer.compact-codec.enabled": compact}):
+        benchmark(incr)
+
+    benchmark.extra_info["redis_memory_usage"] = client.memory_usage(key)
+    benchmark.extra_info["payload_size"] = sum(len(v) for v in client.hgetall(key).values())
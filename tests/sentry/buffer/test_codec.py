@@ -0,0 +1,55 @@
+import pickle
+from datetime import datetime
+
+import pytest
+from django.utils import timezone
+
+from sentry.buffer.codec import HEADER, BufferValueCodec
+from sentry.models import Project
+
+now = datetime(2017, 5, 3, 6, 6, 6, 123456, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        {"pk": 1, "datetime": now},
+        now,
+        "bar",
+        1,
+        1.5,
+        None,
+        True,
+        {"data": {"tags": [("foo", "bar")], "metadata": {"title": "”"}}},
+    ],
+)
+def test_roundtrip(value):
+    codec = BufferValueCodec()
+    encoded = codec.encode(value)
+    assert encoded.startswith(HEADER)
+    assert codec.decode(encoded) == value
+
+
+def test_model_reference():
+    codec = BufferValueCodec()
+    decoded = codec.decode(codec.encode({"project": Project(id=1)}))
+    assert isinstance(decoded["project"], Project)
+    assert decoded["project"].id == 1
+
+
+def test_fallback_to_pickle():
+    value = datetime(2017, 5, 3, 6, 6, 6)
+    assert BufferValueCodec().encode(value) == pickle.dumps(value)
+    with pytest.raises(TypeError):
+        BufferValueCodec(fallback_to_pickle=False).encode(value)
+
+
+def test_decodes_pickle():
+    codec = BufferValueCodec()
+    assert codec.decode(pickle.dumps({"pk": 1, "datetime": now})) == {"pk": 1, "datetime": now}
+    assert codec.decode(b"(dp1\nS'pk'\np2\nI1\ns.") == {"pk": 1}
+
+
+def test_unknown_version():
+    with pytest.raises(ValueError):
+        BufferValueCodec().decode(HEADER[:-1] + b"\xff\x80")
@@ -6,9 +6,11 @@ from django.utils import timezone
 from django.utils.encoding import force_text
 from freezegun import freeze_time
 
+from sentry.buffer.codec import HEADER
 from sentry.buffer.redis import RedisBuffer
 from sentry.models import Group, Project
 from sentry.testutils import TestCase
+from sentry.testutils.helpers import override_options
 
 
 class RedisBufferTest(TestCase):
@@ -211,6 +213,68 @@ class RedisBufferTest(TestCase):
         self.buf.process("foo")
         process.assert_called_once_with(mock.Mock, {"times_seen": 1}, {"pk": 1}, {}, True)
 
+    @override_options({"buffer.compact-codec.enabled": True})
+    @mock.patch("sentry.buffer.base.Buffer.process")
+    def test_process_compact_codec(self, process):
+        now = datetime(2017, 5, 3, 6, 6, 6, tzinfo=timezone.utc)
+        filters = {"pk": 1, "datetime": now}
+        key = self.buf._make_key(Group, filters)
+        self.buf.incr(Group, {"times_seen": 1}, filters, extra={"foo": "bar", "datetime": now})
+
+        client = self.buf.cluster.get_routing_client()
+        assert client.hget(key, "f").startswith(HEADER)
+        assert client.hget(key, "e+datetime").startswith(HEADER)
+
+        self.buf.process(key)
+        process.assert_called_once_with(
+            Group, {"times_seen": 1}, filters, {"foo": "bar", "datetime": now}, None
+        )
+
+    @override_options({"buffer.bulk-flush.enabled": True, "buffer.bulk-flush.batch-size": 10})
+    @mock.patch("sentry.buffer.redis.process_incr")
+    def test_process_pending_bulk_flush_batch_size(self, process_incr):
+        with self.buf.cluster.map() as client:
+            client.zadd("b:p", {"foo": 1, "bar": 2, "baz": 3})
+        self.buf.process_pending()
+        assert len(process_incr.apply_async.mock_calls) == 1
+        process_incr.apply_async.assert_any_call(kwargs={"batch_keys": ["foo", "bar", "baz"]})
+
+    @freeze_time()
+    @override_options({"buffer.bulk-flush.enabled": True})
+    @mock.patch("sentry.buffer.base.Buffer.process")
+    def test_process_bulk_flush(self, process):
+        group2 = self.create_group(project=self.project)
+        orig_times_seen = Group.objects.get_from_cache(id=self.group.id).times_seen
+        now = timezone.now()
+        model = mock.Mock()
+        model.__name__ = "Mock"
+
+        self.buf.incr(Group, {"times_seen": 2}, {"id": self.group.id}, {"last_seen": now})
+        self.buf.incr(Group, {"times_seen": 3}, {"id": self.group.id}, {"last_seen": now})
+        self.buf.incr(Group, {"times_seen": 1}, {"id": group2.id}, {"last_seen": now})
+        self.buf.incr(model, {"times_seen": 1}, {"pk": 1})
+        keys = [
+            self.buf._make_key(Group, {"id": self.group.id}),
+            self.buf._make_key(Group, {"id": group2.id}),
+            self.buf._make_key(model, {"pk": 1}),
+            self.buf._make_key(Group, {"id": 0}),
+        ]
+
+        with self.assertNumQueries(2):
+            self.buf.process(batch_keys=keys)
+
+        # Only the other model goes through the regular processing
+        process.assert_called_once_with(mock.Mock, {"times_seen": 1}, {"pk": 1}, {}, None)
+
+        group = Group.objects.get_from_cache(id=self.group.id)
+        assert group.times_seen == orig_times_seen + 5
+        assert group.last_seen == now
+        assert Group.objects.get(id=group2.id).times_seen == group2.times_seen + 1
+
+        client = self.buf.cluster.get_routing_client()
+        assert client.zrange("b:p", 0, -1) == []
+        assert not any(client.exists(key) for key in keys)
+
 
 #    @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
 #    def test_incr_uses_signal_only(self):
@@ -1,11 +1,17 @@
 import contextlib
 import time
+from datetime import timedelta
 from threading import Thread
+from unittest import mock
 
 import pytest
+from django.utils import timezone
 
-from sentry.event_manager import _save_aggregate
+from sentry.event_manager import _bulk_get_or_create_grouphashes, _save_aggregate
 from sentry.eventstore.models import CalculatedHashes, Event
+from sentry.grouping.grouphash_cache import grouphash_cache, invalidate_grouphash_cache
+from sentry.models import Group, GroupHash, GroupStatus
+from sentry.testutils.helpers import override_options
 
 
 @pytest.mark.django_db(transaction=True)
@@ -87,3 +93,72 @@ def test_group_creation_race(monkeypatch, default_project, is_race_free):
         # assert many groups are new
         assert 1 < len({rv.group.id for rv in return_values}) <= CONCURRENCY
         assert 1 < sum(rv.is_new for rv in return_values) <= CONCURRENCY
+
+
+@pytest.mark.django_db
+def test_bulk_get_or_create_grouphashes(default_project, django_assert_num_queries):
+    existing = GroupHash.objects.create(project=default_project, hash="a" * 32)
+    GroupHash.objects.create(project=default_project, hash="c" * 32)
+
+    # One lookup, one bulk insert and one lookup of the created rows
+    with django_assert_num_queries(3):
+        grouphashes = _bulk_get_or_create_grouphashes(
+            default_project, ["a" * 32, "b" * 32], lookup_only_hashes=["c" * 32, "d" * 32]
+        )
+
+    assert set(grouphashes) == {"a" * 32, "b" * 32, "c" * 32}
+    assert grouphashes["a" * 32].id == existing.id
+    assert GroupHash.objects.filter(project=default_project, hash="b" * 32).exists()
+    assert not GroupHash.objects.filter(project=default_project, hash="d" * 32).exists()
+
+    # Everything exists now, so a single lookup is enough
+    with django_assert_num_queries(1):
+        assert _bulk_get_or_create_grouphashes(default_project, ["a" * 32, "b" * 32]) == {
+            "a" * 32: grouphashes["a" * 32],
+            "b" * 32: grouphashes["b" * 32],
+        }
+
+
+@pytest.mark.django_db
+def test_grouphash_cache(default_project):
+    def save_event():
+        return _save_aggregate(
+            Event(default_project.id, "89aeed6a472e4c5fb992d14df4d7e1b6", data={}),
+            hashes=CalculatedHashes(
+                hashes=["a" * 32, "b" * 32], hierarchical_hashes=[], tree_labels=[]
+            ),
+            release=None,
+            metadata={},
+            received_timestamp=time.time(),
+            level=10,
+            culprit="",
+        )
+
+    grouphash_cache.local.clear()
+    grouphash_cache.epochs.clear()
+    with override_options({"store.grouphash-cache.enabled": True}), mock.patch(
+        "sentry.event_manager._bulk_get_or_create_grouphashes",
+        wraps=_bulk_get_or_create_grouphashes,
+    ) as bulk_get:
+        # Creates the group, hashes are not cached before they're assigned
+        group_info = save_event()
+        assert group_info.is_new
+        save_event()
+        assert bulk_get.call_count == 2
+
+        # Served from the cache
+        assert save_event().group.id == group_info.group.id
+        assert bulk_get.call_count == 2
+
+        # The group is loaded on every hit, so status changes are seen
+        Group.objects.filter(id=group_info.group.id).update(
+            status=GroupStatus.RESOLVED, active_at=timezone.now() - timedelta(hours=1)
+        )
+        group_info = save_event()
+        assert group_info.is_regression
+        assert bulk_get.call_count == 2
+
+        # e.g. after a merge, all processes need to look up grouphashes again
+        invalidate_grouphash_cache(default_project.id)
+        assert save_event().group.id == group_info.group.id
+        assert bulk_get.call_count == 3
@@ -52,6 +52,17 @@ def test_basic(similarity):
     assert evt2_diff[msg_label] == 0.5
 
 
+def test_record_many(similarity):
+    evt1 = create_event({"message": "hello world"}, group_id=123)
+    evt2 = create_event({"message": "jello world"}, group_id=345)
+
+    similarity.record_many([evt1, evt2])
+
+    comparison = dict(similarity.compare(evt1.group))
+    assert set(comparison[evt1.group_id].values()) == {None, 1.0}
+    assert set(comparison[evt2.group_id].values()) == {None, 0.5}
+
+
 @with_grouping_input("grouping_input")
 def test_similarity_extract_grouping_input(grouping_input, insta_snapshot):
     similarity = sentry.similarity.features2
@@ -1,12 +1,15 @@
 import datetime
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock
 
 import pytest
 
 from sentry.event_manager import EventManager
 from sentry.ingest.ingest_consumer import (
+    IngestConsumerWorker,
     process_attachment_chunk,
     process_event,
     process_individual_attachment,
@@ -382,3 +385,52 @@ def test_individual_attachments_missing_chunks(default_project, factories, monke
     attachments = list(EventAttachment.objects.filter(project_id=project_id, event_id=event_id))
 
     assert not attachments
+
+
+@pytest.mark.django_db
+def test_partitioned_flush_batch(default_project, monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def record(message_type):
+        def inner(message, projects):
+            assert projects == {default_project.id: default_project}
+            with lock:
+                calls.append((message["event_id"], message_type, threading.get_ident()))
+
+        return inner
+
+    for message_type in ("attachment_chunk", "event", "individual_attachment", "userreport"):
+        monkeypatch.setattr(
+            f"sentry.ingest.ingest_consumer.process_{message_type}", record(message_type)
+        )
+
+    def message(type, event_id):
+        return {"type": type, "project_id": default_project.id, "event_id": event_id}
+
+    batch = [
+        message("event", "a"),
+        message("attachment_chunk", "a"),
+        message("event", "b"),
+        message("attachment", "a"),
+        message("attachment_chunk", "b"),
+        message("user_report", "a"),
+    ]
+
+    with ThreadPoolExecutor(2) as executor:
+        IngestConsumerWorker(partition_executor=executor).flush_batch(batch)
+
+    calls_a = [(event_id, message_type) for event_id, message_type, _ in calls if event_id == "a"]
+    calls_b = [(event_id, message_type) for event_id, message_type, _ in calls if event_id == "b"]
+
+    # Chunks are processed first, all other messages keep their order
+    assert calls_a == [
+        ("a", "attachment_chunk"),
+        ("a", "event"),
+        ("a", "individual_attachment"),
+        ("a", "userreport"),
+    ]
+    assert calls_b == [("b", "attachment_chunk"), ("b", "event")]
+
+    # Each partition is processed on a single thread
+    assert len({thread for event_id, _, thread in calls if event_id == "a"}) == 1
@@ -5,11 +5,15 @@ from freezegun import freeze_time
 
 from sentry.ingest.transaction_clusterer.base import ReplacementRule
 from sentry.ingest.transaction_clusterer.datasource.redis import (
+    _get_all_keys,
     _store_transaction_name,
     clear_transaction_names,
     get_active_projects,
+    get_clusterer_snapshot,
     get_transaction_names,
+    pop_transaction_names,
     record_transaction_name,
+    store_clusterer_snapshot,
 )
 from sentry.ingest.transaction_clusterer.rules import (
     ProjectOptionRuleStore,
@@ -18,14 +22,15 @@ from sentry.ingest.transaction_clusterer.rules import (
     update_rules,
 )
 from sentry.ingest.transaction_clusterer.tasks import cluster_projects, spawn_clusterers
-from sentry.ingest.transaction_clusterer.tree import TreeClusterer
+from sentry.ingest.transaction_clusterer.tree import CompactTreeClusterer, TreeClusterer
 from sentry.models.project import Project
 from sentry.relay.config import get_project_config
-from sentry.testutils.helpers import Feature
+from sentry.testutils.helpers import Feature, override_options
 
 
-def test_multi_fanout():
-    clusterer = TreeClusterer(merge_threshold=3)
+@pytest.mark.parametrize("clusterer_cls", [TreeClusterer, CompactTreeClusterer])
+def test_multi_fanout(clusterer_cls):
+    clusterer = clusterer_cls(merge_threshold=3)
     transaction_names = [
         "/a/b0/c/d0/e",
         "/a/b0/c/d1/e",
@@ -42,8 +47,9 @@ def test_multi_fanout():
     assert clusterer.get_rules() == ["/a/*/c/*/**", "/a/*/**"]
 
 
-def test_single_leaf():
-    clusterer = TreeClusterer(merge_threshold=2)
+@pytest.mark.parametrize("clusterer_cls", [TreeClusterer, CompactTreeClusterer])
+def test_single_leaf(clusterer_cls):
+    clusterer = clusterer_cls(merge_threshold=2)
     transaction_names = [
         "/a/b1/c/",
         "/a/b2/c/",
@@ -52,6 +58,45 @@ def test_single_leaf():
     assert clusterer.get_rules() == ["/a/*/**"]
 
 
+def test_compact_tree_clusterer_matches_tree_clusterer():
+    transaction_names = [
+        f"/org/{org}/projects/{project}/{page}"
+        for org in range(12)
+        for project in range(org % 4 + 1)
+        for page in ("", "issues", "settings/", f"events/{org * project}")
+    ]
+
+    for merge_threshold in (2, 3, 4, 10):
+        expected = TreeClusterer(merge_threshold=merge_threshold)
+        expected.add_input(transaction_names)
+        clusterer = CompactTreeClusterer(merge_threshold=merge_threshold)
+        clusterer.add_input(transaction_names)
+        assert clusterer.get_rules() == expected.get_rules()
+
+
+def test_compact_tree_clusterer_incremental():
+    clusterer = CompactTreeClusterer(merge_threshold=3)
+    clusterer.add_input(["/a/b0/c", "/a/b1/c", "/a/b2/c", "/x/y0"])
+    assert clusterer.get_rules() == ["/a/*/**"]
+
+    # Only rules affected by new names are returned.
+    clusterer = CompactTreeClusterer.loads(clusterer.dumps())
+    clusterer.add_input(["/x/y1", "/x/y2/z"])
+    assert clusterer.get_rules() == ["/x/*/**"]
+
+    # New names below merged nodes are added to the merged node.
+    clusterer = CompactTreeClusterer.loads(clusterer.dumps())
+    clusterer.add_input(["/a/b3/c0", "/a/b4/c1"])
+    assert clusterer.get_rules() == ["/a/*/*/**", "/a/*/**"]
+
+    expected = CompactTreeClusterer(merge_threshold=3)
+    expected.add_input(
+        ["/a/b0/c", "/a/b1/c", "/a/b2/c", "/x/y0", "/x/y1", "/x/y2/z", "/a/b3/c0", "/a/b4/c1"]
+    )
+    assert expected.get_rules() == ["/a/*/*/**", "/a/*/**", "/x/*/**"]
+    assert expected.dumps() == clusterer.dumps()
+
+
 @mock.patch("sentry.ingest.transaction_clusterer.datasource.redis.MAX_SET_SIZE", 5)
 def test_collection():
     project1 = Project(id=101, name="p1", organization_id=1)
@@ -75,6 +120,25 @@ def test_collection():
     assert set() == set(get_transaction_names(project3))
 
 
+def test_pop_transaction_names():
+    project = Project(id=101, name="p1", organization_id=1)
+    _store_transaction_name(project, "foo")
+    _store_transaction_name(project, "bar")
+    assert set(pop_transaction_names(project)) == {"foo", "bar"}
+    assert set(get_transaction_names(project)) == set()
+    assert list(pop_transaction_names(project)) == []
+
+
+def test_clusterer_snapshot():
+    project = Project(id=101, name="p1", organization_id=1)
+    assert get_clusterer_snapshot(project) is None
+    store_clusterer_snapshot(project, b"\x00snapshot")
+    assert get_clusterer_snapshot(project) == b"\x00snapshot"
+
+    # Snapshots don't make projects active
+    assert list(_get_all_keys()) == []
+
+
 def test_clear_redis():
     project = Project(id=101, name="p1", organization_id=1)
     _store_transaction_name(project, "foo")
@@ -228,6 +292,33 @@ def test_run_clusterer_task(cluster_projects_delay, default_organization):
         }
 
 
+@mock.patch("django.conf.settings.SENTRY_TRANSACTION_CLUSTERER_RUN", True)
+@mock.patch("sentry.ingest.transaction_clusterer.tasks.MERGE_THRESHOLD", 5)
+@mock.patch(
+    "sentry.ingest.transaction_clusterer.tasks.cluster_projects.delay",
+    wraps=cluster_projects,  # call immediately
+)
+@override_options({"txnames.clusterer.incremental": True})
+@pytest.mark.django_db
+def test_run_clusterer_task_incremental(cluster_projects_delay, default_organization):
+    with Feature({"organizations:transaction-name-clusterer": True}):
+        project = Project(id=123, name="project1", organization_id=default_organization.id)
+        project.save()
+        for i in range(3):
+            _store_transaction_name(project, f"/user/tx-{i}")
+
+        spawn_clusterers()
+        assert _get_rules(project) == {}
+
+        # The names of the first run are still taken into account.
+        for i in range(3, 5):
+            _store_transaction_name(project, f"/user/tx-{i}")
+
+        spawn_clusterers()
+        assert set(_get_rules(project).keys()) == {"/user/*/**"}
+        assert set(get_transaction_names(project)) == set()
+
+
 @pytest.mark.django_db
 def test_get_deleted_project():
     deleted_project = Project(pk=666)
@@ -0,0 +1,62 @@
+import random
+import tracemalloc
+
+import pytest
+
+from sentry.ingest.transaction_clusterer.tree import CompactTreeClusterer, TreeClusterer
+
+
+def benchmark_available():
+    try:
+        import pytest_benchmark  # NOQA
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+CLUSTERERS = {
+    "tree": TreeClusterer,
+    "compact_tree": CompactTreeClusterer,
+}
+
+CORPUS_SIZE = 1_000_000
+
+
+def generate_transaction_names(count):
+    """URL-like names with identifiers of different cardinality."""
+    rnd = random.Random(0)
+    for i in range(count):
+        org = f"org-{rnd.randrange(20000)}"
+        project = rnd.choice(["backend", "frontend", "mobile", f"project-{rnd.randrange(5000)}"])
+        tail = rnd.choice(
+            ["", "settings/", f"issues/{i}/", f"issues/{i}/events/{rnd.getrandbits(32):x}"]
+        )
+        yield f"/organizations/{org}/projects/{project}/{tail}"
+
+
+@pytest.fixture(scope="module")
+def transaction_names():
+    return list(generate_transaction_names(CORPUS_SIZE))
+
+
+def cluster(clusterer_cls, transaction_names):
+    clusterer = clusterer_cls(merge_threshold=100)
+    clusterer.add_input(transaction_names)
+    return clusterer.get_rules()
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("clusterer", sorted(CLUSTERERS))
+def test_benchmark_clusterer(clusterer, transaction_names, benchmark):
+    clusterer_cls = CLUSTERERS[clusterer]
+
+    # Peak memory is measured in a separate run, tracing slows down execution.
+    tracemalloc.start()
+    try:
+        rules = cluster(clusterer_cls, transaction_names)
+        benchmark.extra_info["peak_memory"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert benchmark.pedantic(cluster, args=(clusterer_cls, transaction_names), rounds=1) == rules
@@ -1,6 +1,8 @@
 from unittest import TestCase
+from unittest.mock import Mock
 
-from sentry.lang.javascript.cache import SourceCache
+from sentry.lang.javascript.cache import ArtifactViewCache, SourceCache
+from sentry.testutils.helpers.options import override_options
 
 
 class BasicCacheTest(TestCase):
@@ -34,3 +36,43 @@ class BasicCacheTest(TestCase):
         # fall back to utf-8
         cache.add(url, "foobar".encode("utf-32"), encoding="utf-32")
         assert cache.get(url)[0] == "foobar"
+
+
+class ArtifactViewCacheTest(TestCase):
+    def test_get_or_parse(self):
+        cache = ArtifactViewCache("sourcemap")
+        release = Mock(id=1)
+        url = "http://example.com/foo.js.map"
+        parse_fn = Mock(side_effect=lambda: object())
+
+        with override_options({"processing.javascript-view-cache-size": 10}):
+            view = cache.get_or_parse(release, None, url, (b"foo", b"bar"), parse_fn)
+            assert cache.get_or_parse(release, None, url, (b"foo", b"bar"), parse_fn) is view
+            assert parse_fn.call_count == 1
+
+            # different contents, release or url are parsed again
+            assert cache.get_or_parse(release, None, url, (b"foob", b"ar"), parse_fn) is not view
+            assert cache.get_or_parse(Mock(id=2), None, url, (b"foo", b"bar"), parse_fn) is not view
+            assert (
+                cache.get_or_parse(release, None, url + "x", (b"foo", b"bar"), parse_fn) is not view
+            )
+            assert parse_fn.call_count == 4
+
+            # only the most recently used entry fits into the cache
+            assert len(cache) == 1
+
+            # contents larger than the cache are not stored
+            cache.get_or_parse(release, None, url, (b"x" * 11,), parse_fn)
+            cache.get_or_parse(release, None, url, (b"x" * 11,), parse_fn)
+            assert parse_fn.call_count == 6
+
+    def test_disabled(self):
+        cache = ArtifactViewCache("sourcemap")
+        parse_fn = Mock(side_effect=lambda: object())
+
+        with override_options({"processing.javascript-view-cache-size": 0}):
+            cache.get_or_parse(None, None, "foo.js.map", (b"foo",), parse_fn)
+            cache.get_or_parse(None, None, "foo.js.map", (b"foo",), parse_fn)
+
+        assert parse_fn.call_count == 2
+        assert len(cache) == 0
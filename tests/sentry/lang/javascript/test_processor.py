@@ -16,6 +16,7 @@ from sentry.lang.javascript.errormapping import REACT_MAPPING_URL, rewrite_excep
 from sentry.lang.javascript.processor import (
     CACHE_CONTROL_MAX,
     CACHE_CONTROL_MIN,
+    ArtifactIndexLookup,
     JavaScriptStacktraceProcessor,
     UnparseableSourcemap,
     cache,
@@ -36,7 +37,7 @@ from sentry.lang.javascript.processor import (
 from sentry.models import EventError, File, Release, ReleaseFile
 from sentry.models.releasefile import ARTIFACT_INDEX_FILENAME, update_artifact_index
 from sentry.stacktraces.processing import ProcessableFrame, find_stacktraces_in_data
-from sentry.testutils import TestCase
+from sentry.testutils import TestCase, TransactionTestCase
 from sentry.testutils.helpers.features import with_feature
 from sentry.testutils.helpers.options import override_options
 from sentry.utils import json
@@ -778,6 +779,24 @@ class FetchFileTest(TestCase):
         cache_get.reset_mock()
         cache_set.reset_mock()
 
+    @patch("sentry.lang.javascript.processor.cache.get", side_effect=cache.get)
+    def test_archive_index_lookup_caching(self, cache_get):
+        release = Release.objects.create(version="1", organization_id=self.project.organization_id)
+        self._create_archive(release, "foo")
+
+        def index_calls():
+            return [call for call in cache_get.mock_calls if call.args[0].startswith("artifact")]
+
+        with override_options({"processing.artifact-index-lookup-ttl": 60}):
+            for url in ("foo", "foo", "bar"):
+                result = fetch_release_archive_for_url(release, dist=None, url=url)
+                assert (result is not None) == (url == "foo")
+                if result is not None:
+                    result.close()
+
+        # The index is only loaded once for all URLs
+        assert len(index_calls()) == 1
+
     @patch("sentry.lang.javascript.processor.CACHE_MAX_VALUE_SIZE", 9)
     @patch("sentry.lang.javascript.processor.cache.set", side_effect=cache.set)
     def test_archive_too_large_for_mem_cache(self, cache_set):
@@ -897,6 +916,30 @@ class FetchFileTest(TestCase):
         assert exc.value.data["url"] == url
 
 
+class ArtifactIndexLookupTest(unittest.TestCase):
+    def test_get_archive_ident(self):
+        lookup = ArtifactIndexLookup(
+            {
+                "files": {
+                    "http://example.com/app.js?v=1": {"archive_ident": "a"},
+                    "~/app.js": {"archive_ident": "b"},
+                    "~/vendor.js": {"archive_ident": "a"},
+                }
+            }
+        )
+
+        assert len(lookup) == 3
+        assert lookup.get_archive_ident("http://example.com/app.js?v=1") == "a"
+        assert lookup.get_archive_ident("http://example.com/app.js?v=2") == "b"
+        assert lookup.get_archive_ident("http://example.org/vendor.js#foo") == "a"
+        assert lookup.get_archive_ident("http://example.com/other.js") is None
+
+    def test_no_index(self):
+        lookup = ArtifactIndexLookup(None)
+        assert len(lookup) == 0
+        assert lookup.get_archive_ident("http://example.com/app.js") is None
+
+
 class CacheControlTest(unittest.TestCase):
     def test_simple(self):
         headers = {"content-type": "application/json", "cache-control": "max-age=120"}
@@ -1537,3 +1580,104 @@ class CacheSourceTest(TestCase):
         # now we have an error
         assert len(processor.cache.get_errors(abs_path)) == 1
         assert processor.cache.get_errors(abs_path)[0] == {"url": map_url, "type": "js_no_source"}
+
+    def _fetch_sources(self, filenames, prefetch, max_fetches=None):
+        project = self.create_project()
+        processor = JavaScriptStacktraceProcessor(data={}, stacktrace_infos=None, project=project)
+        if max_fetches is not None:
+            processor.max_fetches = max_fetches
+
+        if prefetch:
+            processor.prefetch_sources(filenames, concurrency=4)
+        else:
+            for filename in filenames:
+                processor.cache_source(filename)
+
+        return processor
+
+    @patch("sentry.lang.javascript.processor.fetch_sourcemap")
+    @patch("sentry.lang.javascript.processor.fetch_file")
+    def test_prefetch_sources_matches_cache_source(self, mock_fetch_file, mock_fetch_sourcemap):
+        def fetch_file(url, **kwargs):
+            if url == "app:///missing.js":
+                raise http.BadSource({"type": EventError.JS_MISSING_SOURCE, "url": url})
+            sourcemap_url = "broken.js.map" if url == "app:///broken.js" else "shared.js.map"
+            body = b"console.log(1);\n//# sourceMappingURL=" + sourcemap_url.encode()
+            return http.UrlResult(url, {}, body, 200, None)
+
+        def fetch_sourcemap(url, source=b"", **kwargs):
+            if url == "app:///broken.js.map":
+                raise UnparseableSourcemap({"url": url})
+            return f"view of {url}"
+
+        mock_fetch_file.side_effect = fetch_file
+        mock_fetch_sourcemap.side_effect = fetch_sourcemap
+
+        filenames = ["app:///a.js", "app:///missing.js", "app:///b.js", "app:///broken.js"]
+        processor = self._fetch_sources(filenames, prefetch=False)
+        mock_fetch_sourcemap.reset_mock()
+        prefetched = self._fetch_sources(filenames, prefetch=True)
+
+        for filename in filenames:
+            assert bool(prefetched.cache.get(filename)) == bool(processor.cache.get(filename))
+            assert prefetched.cache.get_errors(filename) == processor.cache.get_errors(filename)
+            assert prefetched.sourcemaps.get_link(filename) == processor.sourcemaps.get_link(
+                filename
+            )
+
+        assert prefetched.sourcemaps.get_link("app:///b.js") == (
+            "app:///shared.js.map",
+            "view of app:///shared.js.map",
+        )
+        assert prefetched.cache.get_errors("app:///missing.js") == [
+            {"type": EventError.JS_MISSING_SOURCE, "url": "app:///missing.js"}
+        ]
+        assert prefetched.cache.get_errors("app:///broken.js") == [
+            {"type": EventError.JS_INVALID_SOURCEMAP, "url": "app:///broken.js.map"}
+        ]
+        # the shared source map is only fetched once
+        assert mock_fetch_sourcemap.call_count == 2
+
+    @patch("sentry.lang.javascript.processor.fetch_file")
+    def test_prefetch_sources_max_fetches(self, mock_fetch_file):
+        mock_fetch_file.side_effect = lambda url, **kwargs: http.UrlResult(
+            url, {}, b"console.log(1);", 200, None
+        )
+
+        filenames = ["app:///a.js", "app:///b.js", "app:///c.js"]
+        processor = self._fetch_sources(filenames, prefetch=True, max_fetches=2)
+
+        assert mock_fetch_file.call_count == 2
+        assert processor.cache.get("app:///a.js")
+        assert processor.cache.get("app:///b.js")
+        assert processor.cache.get_errors("app:///c.js") == [
+            {"type": EventError.JS_TOO_MANY_REMOTE_SOURCES}
+        ]
+
+
+class PrefetchSourcesTest(TransactionTestCase):
+    def test_prefetch_release_files(self):
+        # Release files are loaded from the database by the fetching threads,
+        # so the rows need to be committed.
+        project = self.create_project()
+        release = self.create_release(project=project, version="12.31.12")
+
+        filenames = ["app:///a.js", "app:///b.js", "app:///c.js"]
+        for filename in filenames:
+            file = self.create_file(
+                name=filename,
+                type="release.file",
+                headers={"Content-Type": "application/javascript"},
+            )
+            file.putfile(BytesIO(b"console.log(1);"))
+            self.create_release_file(release_id=release.id, file=file, name=filename)
+
+        processor = JavaScriptStacktraceProcessor(
+            data={"release": release.version}, stacktrace_infos=None, project=project
+        )
+        processor.release = release
+        processor.prefetch_sources(filenames, concurrency=2)
+
+        for filename in filenames:
+            assert processor.cache.get(filename)
+            assert processor.cache.get_errors(filename) == []
@@ -8,6 +8,7 @@ from django.utils import timezone
 from sentry.nodestore.base import json_dumps
 from sentry.nodestore.django.backend import DjangoNodeStorage
 from sentry.nodestore.django.models import Node
+from sentry.testutils.helpers import override_options
 from sentry.utils.strings import compress
 
 
@@ -132,3 +133,10 @@ class TestDjangoNodeStorage:
             self.ns.get("node_4")
             self.ns.get("node_4")
             assert mock_get.call_count == 2
+
+    def test_set_zstd(self):
+        with override_options({"nodestore.codec": "zstd"}):
+            self.ns.set("d2502ebbd7df41ceba8d3275595cac33", {"foo": "bar"})
+
+        assert Node.objects.get(id="d2502ebbd7df41ceba8d3275595cac33").data.startswith("zstd:")
+        assert self.ns.get("d2502ebbd7df41ceba8d3275595cac33") == {"foo": "bar"}
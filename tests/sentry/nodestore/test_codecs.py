@@ -0,0 +1,63 @@
+import zstandard
+
+from sentry.nodestore.codecs import NodeCodecs, ZstdDictionaryStore, ZstdNodeCodec
+from sentry.testutils.helpers import override_options
+from sentry.utils.strings import compress
+
+PAYLOAD = b'{"exception":{"values":[{"type":"ValueError"}]},"platform":"python"}'
+
+
+class InMemoryDictionaryStore(ZstdDictionaryStore):
+    def __init__(self, dictionaries):
+        super().__init__()
+        self.dictionaries = dictionaries
+
+    def _load(self, dict_id):
+        return self.dictionaries[dict_id]
+
+
+def test_legacy_zlib_roundtrip():
+    codecs = NodeCodecs()
+    with override_options({"nodestore.codec": "zlib"}):
+        encoded = codecs.encode(PAYLOAD)
+
+    # zlib payloads are written in the legacy format without a codec id
+    assert encoded == compress(PAYLOAD)
+    assert codecs.decode(encoded) == PAYLOAD
+
+
+def test_zstd_roundtrip():
+    codecs = NodeCodecs()
+    with override_options({"nodestore.codec": "zstd", "nodestore.zstd-dictionaries": {}}):
+        encoded = codecs.encode(PAYLOAD, platform="python")
+
+    assert encoded.startswith("zstd:")
+    assert codecs.decode(encoded) == PAYLOAD
+
+    # Reading does not depend on the configured codec
+    with override_options({"nodestore.codec": "zlib"}):
+        assert codecs.decode(encoded) == PAYLOAD
+        assert codecs.decode(compress(PAYLOAD)) == PAYLOAD
+
+
+def test_zstd_dictionary():
+    samples = [
+        b'{"exception":{"values":[{"type":"Error%d"}]},"platform":"python","n":%d}' % (i, i)
+        for i in range(1000)
+    ]
+    dictionary = zstandard.train_dictionary(1024, samples)
+    dict_id = dictionary.dict_id()
+    store = InMemoryDictionaryStore({dict_id: dictionary})
+
+    codecs = NodeCodecs()
+    codecs.codecs = {"zstd": ZstdNodeCodec(dictionaries=store)}
+
+    with override_options(
+        {"nodestore.codec": "zstd", "nodestore.zstd-dictionaries": {"python": dict_id}}
+    ):
+        with_dictionary = codecs.encode(PAYLOAD, platform="python")
+        without_dictionary = codecs.encode(PAYLOAD, platform="javascript")
+
+    assert len(with_dictionary) < len(without_dictionary)
+    assert codecs.decode(with_dictionary) == PAYLOAD
+    assert codecs.decode(without_dictionary) == PAYLOAD
@@ -7,6 +7,7 @@ from contextlib import nullcontext
 import pytest
 
 from sentry.nodestore.django.backend import DjangoNodeStorage
+from sentry.testutils.helpers import override_options
 from tests.sentry.nodestore.bigtable.test_backend import (
     MockedBigtableNodeStorage,
     get_temporary_bigtable_nodestorage,
@@ -91,3 +92,41 @@ def test_set_subkeys(ns):
     ns.delete("node_1")
     assert ns.get("node_1") is None
     assert ns.get("node_1", subkey="other") is None
+
+
+def test_set_multi(ns):
+    nodes = {"node_1": {"foo": "a"}, "node_2": {"foo": "b"}}
+
+    ns.set_multi(nodes)
+    assert ns.get_multi(list(nodes)) == nodes
+
+
+def test_set_subkeys_multi(ns):
+    ns.set_subkeys_multi(
+        {
+            "node_1": {None: {"foo": "a"}, "other": {"foo": "b"}},
+            "node_2": {None: {"foo": "c"}},
+        }
+    )
+    assert ns.get("node_1") == {"foo": "a"}
+    assert ns.get("node_1", subkey="other") == {"foo": "b"}
+    assert ns.get("node_2") == {"foo": "c"}
+    assert ns.get("node_2", subkey="other") is None
+
+    # Overwriting a node through a batched write also drops its subkeys.
+    ns.set_multi({"node_1": {"foo": "d"}})
+    assert ns.get("node_1") == {"foo": "d"}
+    assert ns.get("node_1", subkey="other") is None
+
+
+@pytest.mark.parametrize("write_indexed", [False, True])
+def test_set_subkeys_indexed_format(ns, write_indexed):
+    with override_options({"nodestore.write-indexed-subkeys": write_indexed}):
+        ns.set_subkeys("node_1", {None: {"foo": "a"}, "other": {"foo": "b"}, "third": {"foo": "c"}})
+
+    # Both formats are readable regardless of the option
+    assert ns.get("node_1") == {"foo": "a"}
+    assert ns.get("node_1", subkey="other") == {"foo": "b"}
+    assert ns.get("node_1", subkey="third") == {"foo": "c"}
+    assert ns.get("node_1", subkey="missing") is None
+    assert ns.get_multi(["node_1"], subkey="other") == {"node_1": {"foo": "b"}}
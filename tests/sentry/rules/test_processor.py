@@ -6,6 +6,7 @@ from django.core.cache import cache
 from django.db import DEFAULT_DB_ALIAS, connections
 from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+from freezegun import freeze_time
 
 from sentry.models import (
     GroupRelease,
@@ -22,6 +23,7 @@ from sentry.rules.conditions import EventCondition
 from sentry.rules.filters.base import EventFilter
 from sentry.rules.processor import RuleProcessor
 from sentry.testutils import TestCase
+from sentry.testutils.helpers import override_options
 
 EMAIL_ACTION_DATA = {
     "id": "sentry.mail.actions.NotifyEmailAction",
@@ -223,6 +225,52 @@ class RuleProcessorTest(TestCase):
         # mock condition first.
         assert passes.call_count == 0
 
+    @patch(
+        "sentry.constants._SENTRY_RULES",
+        [
+            "sentry.mail.actions.NotifyEmailAction",
+            "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+        ],
+    )
+    def test_frequency_conditions_share_queries(self):
+        condition = {
+            "id": "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+            "interval": "1h",
+        }
+        self.rule.update(
+            data={"conditions": [{**condition, "value": 10}], "actions": [EMAIL_ACTION_DATA]}
+        )
+        Rule.objects.create(
+            project=self.group_event.project,
+            data={"conditions": [{**condition, "value": 20}], "actions": [EMAIL_ACTION_DATA]},
+        )
+
+        def apply():
+            rp = RuleProcessor(
+                self.group_event,
+                is_new=True,
+                is_regression=True,
+                is_new_group_environment=True,
+                has_reappeared=True,
+            )
+            return list(rp.apply())
+
+        with patch("sentry.rules.processor.rules", init_registry()), patch(
+            "sentry.rules.conditions.event_frequency.EventFrequencyCondition.query_hook",
+            return_value=0,
+        ) as query_hook:
+            assert apply() == []
+            assert query_hook.call_count == 1
+
+            # Without the shared cache every evaluation queries again
+            assert apply() == []
+            assert query_hook.call_count == 2
+
+            with override_options({"rules.event-frequency.cache-ttl": 60}), freeze_time():
+                assert apply() == []
+                assert apply() == []
+            assert query_hook.call_count == 3
+
 
 class MockFilterTrue(EventFilter):
     id = "tests.sentry.rules.test_processor.MockFilterTrue"
@@ -3,6 +3,7 @@ from django.conf import settings
 
 from sentry.sentry_metrics.configuration import UseCaseKey
 from sentry.sentry_metrics.indexer.cache import StringIndexerCache
+from sentry.testutils.helpers.options import override_options
 from sentry.utils.cache import cache
 from sentry.utils.hashlib import md5_text
 
@@ -71,3 +72,48 @@ def test_separate_namespacing() -> None:
     indexer_cache.set("a", 2, UseCaseKey.PERFORMANCE.value)
     assert indexer_cache.get("a", UseCaseKey.RELEASE_HEALTH.value) == 1
     assert indexer_cache.get("a", UseCaseKey.PERFORMANCE.value) == 2
+
+
+def test_local_cache(use_case_id: str) -> None:
+    cache.clear()
+    local_cache = StringIndexerCache(
+        **settings.SENTRY_STRING_INDEXER_CACHE_OPTIONS, partition_key=_PARTITION_KEY
+    )
+
+    with override_options({"sentry-metrics.indexer.local-cache-size": 10}):
+        local_cache.set_many({"hello": 2, "bye": 3}, use_case_id)
+        assert len(local_cache.local) == 2
+
+        # Served from the local tier, even once the shared cache lost them
+        cache.clear()
+        assert local_cache.get_many(["hello", "bye", "new"], use_case_id) == {
+            "hello": 2,
+            "bye": 3,
+            "new": None,
+        }
+        assert local_cache.get("hello", use_case_id) == 2
+
+        # Hits of the shared cache are cached locally
+        indexer_cache.set("new", 4, use_case_id)
+        assert local_cache.get_many(["new"], use_case_id) == {"new": 4}
+        cache.clear()
+        assert local_cache.get("new", use_case_id) == 4
+
+        local_cache.delete_many(["hello", "new"], use_case_id)
+        assert local_cache.get_many(["hello", "bye", "new"], use_case_id) == {
+            "hello": None,
+            "bye": 3,
+            "new": None,
+        }
+
+    # Disabling the local tier drops its entries
+    assert local_cache.get("bye", use_case_id) is None
+    assert len(local_cache.local) == 0
+
+
+def test_local_cache_ttl_jitter() -> None:
+    with override_options({"sentry-metrics.indexer.local-cache-ttl": 100}):
+        ttls = {indexer_cache.local_randomized_ttl for _ in range(10)}
+
+    assert all(100 <= ttl <= 125 for ttl in ttls)
+    assert len(ttls) > 1
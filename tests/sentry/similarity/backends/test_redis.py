@@ -45,6 +45,29 @@ class RedisScriptMinHashIndexBackendTestCase(TestCase):
         result = self.index.export("example", [("index", 2)], timestamp=timestamp)
         assert len(result) == 1
 
+    def test_record_many(self):
+        timestamp = int(time.time())
+        self.index.record_many(
+            [
+                ("example", "1", [("index", "hello world")], timestamp),
+                ("example", "2", [("index", "hello world")], timestamp - 60),
+                ("example", "3", [], None),
+                ("other", "1", [("index", "jello world")], None),
+            ]
+        )
+
+        results = self.index.compare("example", "1", [("index", 0)])
+        assert results == [("1", [1.0]), ("2", [1.0])]
+
+        results = self.index.compare("other", "1", [("index", 0)])
+        assert results == [("1", [1.0])]
+
+        # Records are equivalent to separate calls to `record`.
+        self.index.record("example", "4", [("index", "hello world")], timestamp=timestamp)
+        r1 = msgpack.unpackb(self.index.export("example", [("index", 1)], timestamp=timestamp)[0])
+        r4 = msgpack.unpackb(self.index.export("example", [("index", 4)], timestamp=timestamp)[0])
+        assert r1[0] == r4[0]
+
     def test_basic(self):
         self.index.record("example", "1", [("index", "hello world")])
         self.index.record("example", "2", [("index", "hello world")])
@@ -0,0 +1,28 @@
+import pytest
+
+from sentry.similarity.signatures import MinHashSignatureBuilder, VectorizedMinHashSignatureBuilder
+
+
+def benchmark_available():
+    try:
+        import pytest_benchmark  # NOQA
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+BUILDERS = {
+    "python": MinHashSignatureBuilder(16, 0xFFFF),
+    "vectorized": VectorizedMinHashSignatureBuilder(16, 0xFFFF),
+    "vectorized_compatible": VectorizedMinHashSignatureBuilder(16, 0xFFFF, compatible=True),
+}
+
+# About the number of character shingles and frame chunks of a large stacktrace
+FEATURES = [f"frame:{i}:module.function" for i in range(2000)]
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("builder", sorted(BUILDERS))
+def test_benchmark_signature_builder(builder, benchmark):
+    benchmark(BUILDERS[builder], FEATURES)
@@ -1,14 +1,21 @@
 from collections import Counter
 from unittest import TestCase
 
-from sentry.similarity.signatures import MinHashSignatureBuilder
+import mmh3
+from django.test import override_settings
+
+from sentry.similarity import _make_index_backend
+from sentry.similarity.signatures import MinHashSignatureBuilder, VectorizedMinHashSignatureBuilder
+from sentry.utils import redis
 
 
 class MinHashSignatureBuilderTestCase(TestCase):
+    builder_cls = MinHashSignatureBuilder
+
     def test_signatures(self):
         n = 32
         r = 0xFFFF
-        get_signature = MinHashSignatureBuilder(n, r)
+        get_signature = self.builder_cls(n, r)
         assert get_signature({"foo", "bar", "baz"}) == get_signature({"foo", "bar", "baz"})
 
         assert len(get_signature("hello world")) == n
@@ -28,3 +35,35 @@ class MinHashSignatureBuilderTestCase(TestCase):
         self.assertAlmostEqual(
             similarity, estimation, delta=0.1  # totally made up constant, seems reasonable
         )
+
+
+class VectorizedMinHashSignatureBuilderTestCase(MinHashSignatureBuilderTestCase):
+    builder_cls = VectorizedMinHashSignatureBuilder
+
+    def test_compatible(self):
+        features = [f"feature-{i}" for i in range(100)]
+        assert VectorizedMinHashSignatureBuilder(16, 0xFFFF, compatible=True)(
+            features
+        ) == MinHashSignatureBuilder(16, 0xFFFF)(features)
+
+    def test_universal_hashing(self):
+        features = [f"feature-{i}" for i in range(100)]
+        builder = VectorizedMinHashSignatureBuilder(16, 0xFFFF)
+        hashes = [mmh3.hash64(feature, signed=False)[0] for feature in features]
+        assert builder(features) == [
+            min((((h * a + b) & 0xFFFFFFFFFFFFFFFF) >> 32) % 0xFFFF for h in hashes)
+            for a, b in zip(builder.multipliers, builder.offsets)
+        ]
+
+
+def test_index_backend_signature_builder():
+    cluster = redis.redis_clusters.get("default")
+
+    backend = _make_index_backend(cluster, namespace="sim:1")
+    assert backend.namespace == "sim:1"
+    assert isinstance(backend.signature_builder, MinHashSignatureBuilder)
+
+    with override_settings(SENTRY_SIMILARITY_VECTORIZED_SIGNATURES=True):
+        backend = _make_index_backend(cluster, namespace="sim:1")
+    assert backend.namespace == "sim:1:vectorized"
+    assert isinstance(backend.signature_builder, VectorizedMinHashSignatureBuilder)
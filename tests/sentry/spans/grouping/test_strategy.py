@@ -571,3 +571,39 @@ def test_default_2022_10_27_strategy(spans: List[Span], expected: Mapping[str, L
         key: hash_values(values)
         for key, values in {**expected, "a" * 16: ["transaction name"]}.items()
     }
+
+
+def test_span_group_cache() -> None:
+    calls: List[Span] = []
+
+    def strategy(span: Span) -> Optional[List[str]]:
+        calls.append(span)
+        return None
+
+    def create_event(span_id: str) -> Mapping[str, object]:
+        return {
+            "transaction": "transaction name",
+            "contexts": {"trace": {"span_id": "a" * 16}},
+            "spans": [
+                SpanBuilder().with_span_id(span_id).with_description("hi").build(),
+                SpanBuilder().with_span_id(span_id[:-1] + "0").with_description("bye").build(),
+            ],
+        }
+
+    span_grouping = SpanGroupingStrategy("cached-strategy", [strategy])
+    first = span_grouping.execute(create_event("b" * 16))
+    assert len(calls) == 2
+
+    # Spans repeating in another transaction are taken from the cache.
+    cache = span_grouping.get_cache()
+    second = span_grouping.execute(create_event("c" * 16), cache=cache)
+    assert len(calls) == 2
+    assert cache.hits == 2
+    assert cache.misses == 0
+    assert list(first.values())[:2] == list(second.values())[:2]
+    assert second["c" * 16] == hash_values(["hi"])
+
+    # Spans with values that can't be used as cache keys are still grouped.
+    span = SpanBuilder().with_description("hi").build()
+    span["op"] = ["db"]  # type: ignore
+    assert span_grouping.get_span_group(span, cache=cache) == hash_values(["hi"])
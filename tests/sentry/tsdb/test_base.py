@@ -5,7 +5,7 @@ from unittest import TestCase
 import pytz
 from freezegun import freeze_time
 
-from sentry.tsdb.base import ONE_DAY, ONE_HOUR, ONE_MINUTE, BaseTSDB
+from sentry.tsdb.base import ONE_DAY, ONE_HOUR, ONE_MINUTE, BaseTSDB, TSDBModel, TSDBWriteBatch
 from sentry.utils.dates import to_timestamp
 
 
@@ -128,3 +128,31 @@ class BaseTSDBTest(TestCase):
         assert self.tsdb.make_series(0, start) == [
             (to_timestamp(start + timedelta(hours=24) * i), 0) for i in range(8)
         ]
+
+
+class TSDBWriteBatchTest(TestCase):
+    def test_split(self):
+        now = datetime(2013, 5, 18, 15, 13, 58, tzinfo=pytz.UTC)
+
+        batch = TSDBWriteBatch()
+        assert not batch
+
+        batch.incr_multi([(TSDBModel.project, 1), (TSDBModel.group, 2)], timestamp=now)
+        batch.record_multi([(TSDBModel.users_affected_by_group, 2, ["a"])], environment_id=1)
+        batch.record_frequency_multi(
+            [(TSDBModel.frequent_environments_by_group, {2: {3: 1}})], timestamp=now
+        )
+        assert batch
+        assert batch.models == {
+            TSDBModel.project,
+            TSDBModel.group,
+            TSDBModel.users_affected_by_group,
+            TSDBModel.frequent_environments_by_group,
+        }
+
+        batches = batch.split(lambda model: model == TSDBModel.project)
+        assert batches[True].incrs == [([(TSDBModel.project, 1)], now, 1, None)]
+        assert not batches[True].records and not batches[True].frequencies
+        assert batches[False].incrs == [([(TSDBModel.group, 2)], now, 1, None)]
+        assert batches[False].records == batch.records
+        assert batches[False].frequencies == batch.frequencies
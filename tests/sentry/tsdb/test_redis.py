@@ -1,13 +1,18 @@
+import os
+import signal
+import threading
 from contextlib import contextmanager
 from datetime import datetime, timedelta
+from unittest import mock
 
 import pytest
 import pytz
+from celery.signals import task_postrun, worker_process_shutdown
 from django.test import override_settings
 
 from sentry.testutils import TestCase
-from sentry.tsdb.base import ONE_DAY, ONE_HOUR, ONE_MINUTE, TSDBModel
-from sentry.tsdb.redis import CountMinScript, RedisTSDB, SuppressionWrapper
+from sentry.tsdb.base import ONE_DAY, ONE_HOUR, ONE_MINUTE, TSDBModel, TSDBWriteBatch
+from sentry.tsdb.redis import CountMinScript, LocalBuffer, RedisTSDB, SuppressionWrapper
 from sentry.utils.dates import to_datetime, to_timestamp
 
 
@@ -593,6 +598,160 @@ class RedisTSDBTest(TestCase):
             model, ("organization:1", "organization:2"), now, environment_id=1
         ) == {"organization:1": [], "organization:2": []}
 
+    def test_write_batch(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        rollup = 3600
+
+        batch = TSDBWriteBatch()
+        batch.incr_multi(
+            [(TSDBModel.project, 1), (TSDBModel.project, 1), (TSDBModel.group, 2)],
+            timestamp=now,
+            environment_id=1,
+        )
+        batch.incr_multi([(TSDBModel.project, 1, {"count": 3})], timestamp=now)
+        batch.record_multi(
+            [(TSDBModel.users_affected_by_group, 2, ["a", "b"])], timestamp=now, environment_id=1
+        )
+        batch.record_multi([(TSDBModel.users_affected_by_group, 2, ["b", "c"])], timestamp=now)
+        for _ in range(2):
+            batch.record_frequency_multi(
+                [(TSDBModel.frequent_environments_by_group, {2: {"production": 1}})],
+                timestamp=now,
+            )
+        batch.record_frequency_multi(
+            [(TSDBModel.frequent_environments_by_group, {2: {"staging": 1}})], timestamp=now
+        )
+        self.db.write_batch(batch)
+
+        assert self.db.get_sums(TSDBModel.project, [1], now, now, rollup=rollup) == {1: 5}
+        assert self.db.get_sums(
+            TSDBModel.project, [1], now, now, rollup=rollup, environment_id=1
+        ) == {1: 2}
+        assert self.db.get_sums(TSDBModel.group, [2], now, now, rollup=rollup) == {2: 1}
+
+        assert self.db.get_distinct_counts_totals(
+            TSDBModel.users_affected_by_group, [2], now, now, rollup=rollup
+        ) == {2: 3}
+        assert self.db.get_distinct_counts_totals(
+            TSDBModel.users_affected_by_group, [2], now, now, rollup=rollup, environment_id=1
+        ) == {2: 2}
+
+        assert self.db.get_most_frequent(
+            TSDBModel.frequent_environments_by_group, [2], now, rollup=rollup
+        ) == {2: [("production", 2.0), ("staging", 1.0)]}
+
+    def test_local_buffer(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        rollup = 3600
+        self.db.local_buffer = LocalBuffer(self.db, interval=3600)
+
+        self.db.incr(TSDBModel.project, 1, now)
+        self.db.incr_multi(
+            [(TSDBModel.project, 1), (TSDBModel.group, 2)], timestamp=now, environment_id=1
+        )
+        self.db.record(TSDBModel.users_affected_by_group, 2, ["a", "b"], now)
+
+        batch = TSDBWriteBatch()
+        batch.incr_multi([(TSDBModel.project, 1, {"count": 3})], timestamp=now)
+        batch.record_multi([(TSDBModel.users_affected_by_group, 2, ["b", "c"])], timestamp=now)
+        batch.record_frequency_multi(
+            [(TSDBModel.frequent_environments_by_group, {2: {"production": 1}})], timestamp=now
+        )
+        self.db.write_batch(batch)
+
+        # Only frequency tables are written immediately.
+        assert len(self.db.local_buffer) > 0
+        assert self.db.get_sums(TSDBModel.project, [1], now, now, rollup=rollup) == {1: 0}
+        assert self.db.get_distinct_counts_totals(
+            TSDBModel.users_affected_by_group, [2], now, now, rollup=rollup
+        ) == {2: 0}
+        assert self.db.get_most_frequent(
+            TSDBModel.frequent_environments_by_group, [2], now, rollup=rollup
+        ) == {2: [("production", 1.0)]}
+
+        self.db.flush_local_buffer()
+
+        assert len(self.db.local_buffer) == 0
+        assert self.db.get_sums(TSDBModel.project, [1], now, now, rollup=rollup) == {1: 5}
+        assert self.db.get_sums(
+            TSDBModel.project, [1], now, now, rollup=rollup, environment_id=1
+        ) == {1: 1}
+        assert self.db.get_sums(TSDBModel.group, [2], now, now, rollup=rollup) == {2: 1}
+        assert self.db.get_distinct_counts_totals(
+            TSDBModel.users_affected_by_group, [2], now, now, rollup=rollup
+        ) == {2: 3}
+
+    def test_local_buffer_aggregates_across_tasks(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        db = RedisTSDB(
+            rollups=((10, 30), (ONE_HOUR, 24)),
+            vnodes=64,
+            cluster="tsdb",
+            local_buffer={"interval": 3600},
+        )
+
+        with mock.patch.object(
+            db.cluster, "execute_commands", wraps=db.cluster.execute_commands
+        ) as execute_commands:
+            db.incr(TSDBModel.project, 1, now)
+            task_postrun.send(sender=None)
+            db.incr(TSDBModel.project, 1, now)
+            task_postrun.send(sender=None)
+            assert not execute_commands.called
+
+            worker_process_shutdown.send(sender=None)
+            assert execute_commands.call_count == 1
+
+        (commands,) = execute_commands.call_args[0]
+        increments = [
+            command
+            for key_commands in commands.values()
+            for command in key_commands
+            if command[0] == "HINCRBY"
+        ]
+        # A single increment by 2 for each rollup.
+        assert len(increments) == 2
+        assert [command[3] for command in increments] == [2, 2]
+
+    def test_local_buffer_after_fork(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        local_buffer = LocalBuffer(self.db, interval=3600)
+        self.db.local_buffer = local_buffer
+        self.db.incr(TSDBModel.project, 1, now)
+        size = len(local_buffer)
+
+        # The parent's flush thread holds the lock while the process forks.
+        locked = threading.Event()
+        release = threading.Event()
+
+        def flush():
+            with local_buffer._LocalBuffer__lock:
+                locked.set()
+                release.wait()
+
+        thread = threading.Thread(target=flush)
+        thread.start()
+        locked.wait()
+
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                # Fail instead of hanging should the child deadlock.
+                signal.alarm(5)
+                self.db.incr(TSDBModel.group, 2, now)
+                # Only the writes of the child are buffered.
+                if len(local_buffer) == size:
+                    exit_code = 0
+            finally:
+                os._exit(exit_code)
+
+        release.set()
+        thread.join()
+        _, status = os.waitpid(pid, 0)
+        assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+        assert len(local_buffer) == size
+
     def test_frequency_table_import_export_no_estimators(self):
         client = self.db.cluster.get_local_client_for_key("key")
 
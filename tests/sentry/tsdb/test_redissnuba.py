@@ -1,4 +1,4 @@
-from sentry.tsdb.base import TSDBModel
+from sentry.tsdb.base import TSDBModel, TSDBWriteBatch
 from sentry.tsdb.redissnuba import READ, method_specifications, selector_func
 from sentry.tsdb.snuba import SnubaTSDB
 
@@ -7,11 +7,14 @@ def get_callargs(model):
     """
     Represents for all possible ways that a model could be passed to ``selector_func`` through the callargs
     """
+    batch = TSDBWriteBatch()
+    batch.incr_multi([(model, "key")])
     return {
         "model": model,
         "models": [model],
         "items": [(model, "key", ["values"])],
         "requests": [(model, "data")],
+        "batch": batch,
     }
 
 
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+from sentry.types.condition_activity import FrequencyBuckets
+
+start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+
+def test_frequency_buckets():
+    buckets = FrequencyBuckets(
+        start,
+        start + timedelta(hours=1, minutes=2),
+        [(start + timedelta(minutes=10), 3), (start + timedelta(minutes=30), 5)],
+    )
+
+    assert list(buckets) == [start + timedelta(minutes=5 * i) for i in range(13)]
+
+    assert buckets.cumulative_count(start) == 0
+    assert buckets.cumulative_count(start + timedelta(minutes=14)) == 3
+    assert buckets.cumulative_count(start + timedelta(minutes=30)) == 8
+    # times outside of the range are clamped
+    assert buckets.cumulative_count(start - timedelta(days=1)) == 0
+    assert buckets.cumulative_count(start + timedelta(days=1)) == 8
+
+    assert buckets.count(start, start + timedelta(minutes=10)) == 3
+    assert buckets.count(start + timedelta(minutes=10), start + timedelta(minutes=30)) == 5
+    assert buckets.count(start + timedelta(minutes=31), start + timedelta(hours=1)) == 0
+
+
+def test_frequency_buckets_empty():
+    buckets = FrequencyBuckets(start, start + timedelta(minutes=5), [])
+    assert list(buckets) == [start, start + timedelta(minutes=5)]
+    assert buckets.count(start, start + timedelta(minutes=5)) == 0
@@ -71,6 +71,15 @@ class NPlusOneAPICallsDetectorTest(TestCase):
 
         assert self.find_problems(event) == []
 
+    def test_detects_blocking_spans_of_any_op(self):
+        event = get_event("file-io-on-main-thread")
+        event["spans"][0]["op"] = "db.sql.room"
+
+        problems = self.find_problems(event)
+        assert len(problems) == 1
+        assert problems[0].op == "db.sql.room"
+        assert problems[0].offender_span_ids == ["054ba3a374d543eb"]
+
     def test_gives_problem_correct_title(self):
         event = get_event("file-io-on-main-thread")
         event["spans"][0]["data"]["blocked_main_thread"] = True
@@ -0,0 +1,126 @@
+import copy
+import unittest
+from datetime import timedelta
+
+import pytest
+
+from sentry.testutils.performance_issues.event_generators import EVENTS, create_span, get_event
+from sentry.testutils.silo import region_silo_test
+from sentry.utils.performance_issues.base import DetectorType
+from sentry.utils.performance_issues.detectors import (
+    NPlusOneAPICallsDetector,
+    UncompressedAssetSpanDetector,
+)
+from sentry.utils.performance_issues.performance_detection import (
+    ConsecutiveDBSpanDetector,
+    FileIOMainThreadDetector,
+    MNPlusOneDBSpanDetector,
+    NPlusOneDBSpanDetector,
+    NPlusOneDBSpanDetectorExtended,
+    RenderBlockingAssetSpanDetector,
+    SlowDBQueryDetector,
+    get_detection_settings,
+    run_detector_on_data,
+)
+from sentry.utils.performance_issues.span_view import SpanView
+
+DETECTORS = [
+    ConsecutiveDBSpanDetector,
+    SlowDBQueryDetector,
+    RenderBlockingAssetSpanDetector,
+    NPlusOneDBSpanDetector,
+    NPlusOneDBSpanDetectorExtended,
+    FileIOMainThreadDetector,
+    NPlusOneAPICallsDetector,
+    MNPlusOneDBSpanDetector,
+    UncompressedAssetSpanDetector,
+]
+
+# The ops detectors were restricted to by their settings before spans were
+# skipped based on them. Visiting all spans with these settings is the
+# reference detection must not deviate from.
+BASELINE_ALLOWED_SPAN_OPS = {
+    DetectorType.SLOW_DB_QUERY: ["db"],
+    DetectorType.N_PLUS_ONE_API_CALLS: ["http.client"],
+    DetectorType.UNCOMPRESSED_ASSETS: ["resource.css", "resource.script"],
+}
+
+
+def get_baseline_settings(settings):
+    baseline_settings = copy.deepcopy(settings)
+    for detector_type, detector_settings in baseline_settings.items():
+        if not isinstance(detector_settings, list):
+            detector_settings = [detector_settings]
+        for setting in detector_settings:
+            setting.pop("allowed_span_ops", None)
+            if detector_type in BASELINE_ALLOWED_SPAN_OPS:
+                setting["allowed_span_ops"] = BASELINE_ALLOWED_SPAN_OPS[detector_type]
+    return baseline_settings
+
+
+class SpanViewTest(unittest.TestCase):
+    def test_spans_for_ops(self):
+        spans = [
+            create_span("db"),
+            create_span("http.client"),
+            create_span("db.sql.query"),
+            create_span("db.redis"),
+            create_span(None),
+        ]
+        view = SpanView(spans)
+
+        assert len(view) == 5
+        assert view.spans_for_ops(None) == spans
+        assert view.spans_for_ops(["db"]) == [spans[0], spans[2], spans[3]]
+        assert view.spans_for_ops(["db.sql", "http"]) == [spans[1], spans[2]]
+        assert view.spans_for_ops(["resource"]) == []
+        assert view.spans_for_ops([]) == []
+
+    def test_columns(self):
+        spans = [
+            create_span("db", duration=100.0, hash="a"),
+            create_span("http.client", duration=50.0),
+            create_span(None),
+        ]
+        for index, span in enumerate(spans):
+            span["span_id"] = str(index) * 16
+        spans[1]["parent_span_id"] = "0" * 16
+        view = SpanView(spans)
+
+        assert view.ops == ["db", "http.client", ""]
+        assert view.durations == [
+            timedelta(milliseconds=100),
+            timedelta(milliseconds=50),
+            timedelta(milliseconds=100),
+        ]
+        assert view.end_timestamps[1] - view.start_timestamps[1] == timedelta(milliseconds=50)
+        assert view.description_hashes == ["a", "", ""]
+        assert view.parent_indices == [None, 0, None]
+
+
+@region_silo_test
+@pytest.mark.django_db
+class SpanViewDetectionTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.settings = get_detection_settings()
+        self.baseline_settings = get_baseline_settings(self.settings)
+
+    def test_same_problems_as_visiting_all_spans(self):
+        for event_name in EVENTS:
+            event = get_event(event_name)
+            view = SpanView(event.get("spans") or [])
+            for detector_cls in DETECTORS:
+                expected = detector_cls(self.baseline_settings, event)
+                if expected.is_event_eligible(event):
+                    for span in event.get("spans") or []:
+                        expected.visit_span(span)
+                    expected.on_complete()
+
+                detector = detector_cls(self.settings, event)
+                run_detector_on_data(detector, event, view)
+
+                assert detector.stored_problems == expected.stored_problems, (
+                    event_name,
+                    detector_cls,
+                )
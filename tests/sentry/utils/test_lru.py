@@ -0,0 +1,76 @@
+from sentry.utils.lru import LRUCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_set():
+    cache = LRUCache(maxsize=10)
+    assert cache.get("a") is None
+    assert cache.get("a", 1) == 1
+
+    cache.set("a", 2)
+    assert cache.get("a") == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    cache.delete("a")
+    assert cache.get("a") is None
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # touching "a" makes "b" the least recently used entry
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl():
+    timer = FakeTimer()
+    cache = LRUCache(maxsize=10, ttl=10, timer=timer)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=20)
+
+    timer.now = 10
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert len(cache) == 1
+
+    timer.now = 20
+    assert cache.get("b") is None
+
+
+def test_sizeof():
+    cache = LRUCache(maxsize=10, sizeof=len)
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    assert cache.currsize == 8
+
+    # evicts "a" to make room
+    cache.set("c", "cccc")
+    assert cache.get("a") is None
+    assert cache.currsize == 8
+
+    # replacing a value updates its size
+    cache.set("b", "b")
+    assert cache.currsize == 5
+
+    # values larger than the cache are not stored
+    cache.set("d", "d" * 11)
+    assert cache.get("d") is None
+    assert cache.get("b") == "b"
+    assert cache.currsize == 5
+
+    cache.clear()
+    assert cache.currsize == 0
@@ -27,6 +27,7 @@ from sentry.testutils.helpers.datetime import before_now, iso_format
 from sentry.testutils.performance_issues.store_transaction import PerfIssueTransactionTestMixin
 from sentry.testutils.silo import region_silo_test
 from sentry.types.integrations import ExternalProviders
+from sentry.utils.snuba import aliased_query
 from tests.sentry.issues.test_utils import SearchIssueTestMixin
 
 
@@ -429,6 +430,41 @@ class GroupSerializerSnubaTest(APITestCase, SnubaTestCase):
         assert iso_format(result["firstSeen"]) == iso_format(self.week_ago)
         assert result["count"] == "1"
 
+    def test_seen_stats_cache(self):
+        event = self.store_event(
+            data={"fingerprint": ["put-me-in-group1"], "timestamp": iso_format(self.min_ago)},
+            project_id=self.project.id,
+        )
+        environment = self.create_environment(project=self.project)
+        end = timezone.now().replace(minute=0, second=1, microsecond=0) + timedelta(hours=1)
+
+        with self.options(
+            {
+                "api.serializers.seen-stats-cache-ttl": 60,
+                "api.serializers.seen-stats-cache-bucket": 3600,
+            }
+        ), patch("sentry.api.serializers.models.group.aliased_query", wraps=aliased_query) as query:
+            results = [
+                serialize(
+                    event.group,
+                    serializer=GroupSerializerSnuba(
+                        start=end - timedelta(days=1), end=end + timedelta(seconds=seconds)
+                    ),
+                )
+                for seconds in range(3)
+            ]
+            # the time ranges round to the same bucket
+            assert query.call_count == 1
+            assert results[0]["count"] == results[1]["count"] == results[2]["count"] == "1"
+
+            serialize(
+                event.group,
+                serializer=GroupSerializerSnuba(
+                    environment_ids=[environment.id], start=end - timedelta(days=1), end=end
+                ),
+            )
+            assert query.call_count == 2
+
     def test_get_start_from_seen_stats(self):
         for days, expected in [(None, 30), (0, 14), (1000, 90)]:
             last_seen = None if days is None else before_now(days=days).replace(tzinfo=pytz.UTC)
@@ -5,6 +5,7 @@ from unittest import mock
 
 import pytest
 import pytz
+from django.core.cache import cache
 from django.utils import timezone
 
 from sentry import options
@@ -33,7 +34,7 @@ from sentry.search.snuba.backend import (
     CdcEventsDatasetSnubaSearchBackend,
     EventsDatasetSnubaSearchBackend,
 )
-from sentry.search.snuba.executors import InvalidQueryForExecutor
+from sentry.search.snuba.executors import InvalidQueryForExecutor, SearchChunkPlanner
 from sentry.testutils import SnubaTestCase, TestCase, xfail_if_not_postgres
 from sentry.testutils.helpers import Feature
 from sentry.testutils.helpers.datetime import before_now, iso_format
@@ -1342,6 +1343,25 @@ class EventsSnubaSearchTest(SharedSnubaTest):
         finally:
             options.set("snuba.search.max-pre-snuba-candidates", prev_max_pre)
 
+    def test_adaptive_and_prefetched_chunks(self):
+        with self.options(
+            {
+                "snuba.search.max-pre-snuba-candidates": 1,
+                "snuba.search.adaptive-chunk-size": True,
+                "snuba.search.prefetch-chunks": True,
+            }
+        ):
+            # too many candidates, skip pre-filter, requires >1 postfilter queries
+            results = self.make_query(sort_by="freq", limit=1)
+            assert list(results) == [self.group1]
+            results = self.make_query(sort_by="freq")
+            assert list(results) == [self.group1, self.group2]
+
+            # the hit ratio is remembered for the next searches of the project
+            assert cache.get(f"search:chunk-hit-ratio:{self.project.id}") is not None
+            results = self.make_query(sort_by="freq")
+            assert list(results) == [self.group1, self.group2]
+
     def test_optimizer_enabled(self):
         prev_optimizer_enabled = options.get("snuba.search.pre-snuba-candidates-optimizer")
         options.set("snuba.search.pre-snuba-candidates-optimizer", True)
@@ -2027,6 +2047,37 @@ class EventsSnubaSearchTest(SharedSnubaTest):
         assert list(results) == list(results2)
 
 
+class SearchChunkPlannerTest(TestCase):
+    def test_chunk_limits(self):
+        with self.options(
+            {"snuba.search.chunk-growth-rate": 1.5, "snuba.search.max-chunk-size": 2000}
+        ):
+            planner = SearchChunkPlanner([self.project.id], 100, adaptive=False)
+            planner.record(150, 15)
+            assert [planner.next_chunk_limit(0) for _ in range(3)] == [150, 225, 337]
+
+            planner = SearchChunkPlanner([self.project.id], 100, adaptive=True)
+            assert planner.next_chunk_limit(0) == 150
+            # 10% of the results pass the filters, 85 results are missing
+            planner.record(150, 15)
+            assert planner.next_chunk_limit(15) == 1275
+            planner.save()
+
+            # later searches start from the remembered hit ratio
+            planner = SearchChunkPlanner([self.project.id], 100, adaptive=True)
+            assert planner.next_chunk_limit(0) == 1500
+            planner.record(1500, 1500)
+            planner.save()
+
+            planner = SearchChunkPlanner([self.project.id], 100, adaptive=True)
+            assert planner.next_chunk_limit(0) == 273
+
+            # chunks are capped by the max chunk size
+            planner = SearchChunkPlanner([self.project.id], 100, adaptive=True)
+            planner.record(1000, 0)
+            assert planner.next_chunk_limit(0) == 2000
+
+
 class EventsTransactionsSnubaSearchTest(SharedSnubaTest):
     @property
     def backend(self):